@@ -0,0 +1,184 @@
+"""Static asset pipeline (fingerprinted URLs, precompressed variants, long-lived caching)."""
+
+import gzip
+import hashlib
+import re
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.middleware.compression import parse_accept_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL_PREFIX = "/static"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+# Precompressed variants in order of preference: (encoding, file suffix)
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".map"}
+
+# e.g. "css/app.3fa2b1c4d5e6.css" -> ("css/app", "3fa2b1c4d5e6", ".css")
+FINGERPRINT_PATTERN = re.compile(
+    r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<suffix>\.[^./]+)$"
+)
+
+
+class AssetManifest:
+    """Map logical asset paths to content-hashed (fingerprinted) paths."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.digests: dict[str, str] = {}
+        self.built = False
+
+    def build(self) -> int:
+        """
+        Hash every asset in the static directory.
+
+        Returns:
+            Number of assets fingerprinted
+        """
+        digests = {}
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.suffix in (".gz", ".br"):
+                continue
+            logical = path.relative_to(self.directory).as_posix()
+            digests[logical] = hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+        self.digests = digests
+        self.built = True
+        return len(digests)
+
+    def fingerprinted_path(self, logical: str) -> str:
+        """Return the hashed path for a logical asset (unchanged if unknown)."""
+        if not self.built:
+            self.build()
+        digest = self.digests.get(logical)
+        if digest is None:
+            return logical
+        stem, dot, suffix = logical.rpartition(".")
+        if not dot or "/" in suffix:
+            return logical
+        return f"{stem}.{digest}.{suffix}"
+
+    def url(self, logical: str) -> str:
+        """Return the public URL for a logical asset (template helper)."""
+        return f"{STATIC_URL_PREFIX}/{self.fingerprinted_path(logical.lstrip('/'))}"
+
+    def resolve(self, path: str) -> tuple[str, bool]:
+        """
+        Map a requested path back to its logical asset.
+
+        Returns:
+            (logical path, whether the fingerprint matches the current content)
+        """
+        if not self.built:
+            self.build()
+        match = FINGERPRINT_PATTERN.match(path)
+        if not match:
+            return path, False
+        logical = match.group("stem") + match.group("suffix")
+        digest = self.digests.get(logical)
+        if digest is None:
+            return path, False
+        return logical, digest == match.group("digest")
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles serving fingerprinted URLs with immutable caching and precompressed variants."""
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical, immutable = self.manifest.resolve(path)
+
+        response = self.precompressed_response(logical, scope)
+        if response is None:
+            response = await super().get_response(logical, scope)
+
+        # A stale fingerprint (e.g. during a rolling deploy) is served, but never cached for long
+        response.headers["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        )
+        if Path(logical).suffix in COMPRESSIBLE_SUFFIXES:
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def precompressed_response(self, logical: str, scope: Scope) -> Response | None:
+        """Serve a .br/.gz sibling of the asset if the client accepts it and it is up to date."""
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        if not any(encoding in accepted for encoding, _ in PRECOMPRESSED_ENCODINGS):
+            return None
+        _, source_stat = self.lookup_path(logical)
+        if source_stat is None:
+            return None
+
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = self.lookup_path(logical + suffix)
+            # A sibling older than the source was not rebuilt: serving it would pin
+            # stale content under the new fingerprint (immutable caching)
+            if stat_result is None or stat_result.st_mtime < source_stat.st_mtime:
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["Content-Encoding"] = encoding
+            return response
+        return None
+
+
+def precompress_assets(directory: Path = STATIC_DIR) -> int:
+    """
+    Write .gz (and .br when brotli is installed) siblings for compressible assets.
+
+    Run at build/deploy time via ``python -m app.assets``.
+
+    Returns:
+        Number of files written
+    """
+    written = 0
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(data):
+                continue
+            path.with_name(path.name + suffix).write_bytes(compressed)
+            written += 1
+    return written
+
+
+asset_manifest = AssetManifest(STATIC_DIR)
+
+
+if __name__ == "__main__":
+    # Build step: precompress assets and report fingerprints
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    build_logger = logging.getLogger("app.assets")
+    count = precompress_assets()
+    asset_manifest.build()
+    build_logger.info("Precompressed %d files", count)
+    for logical in asset_manifest.digests:
+        build_logger.info("  %s -> %s", logical, asset_manifest.url(logical))
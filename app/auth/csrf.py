@@ -1,23 +1,82 @@
-"""CSRF protection."""
-from typing import Optional
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-from fastapi import Request, HTTPException, status
+"""
+CSRF protection.
+
+Two modes (CSRF_MODE):
+
+- signed: the token is a timestamped signature over the session cookie, so
+  it is bound to the session without any server-side storage. Pages embed a
+  token whose timestamp is rounded down to `token_refresh` seconds, so a
+  page renders identically (and revalidates with 304) for that long.
+- double_submit: a random token is set in its own cookie at login and the
+  request must echo it back; verification is a constant-time comparison
+  with no signature check at all.
+"""
+import hmac
+import secrets
+import time
+from functools import cached_property
+
+from fastapi import HTTPException, Request, Response, status
+from itsdangerous import BadSignature, SignatureExpired
+
+from app.auth.signing import RotatingSerializer
 from app.config import config
 
+SIGNED = "signed"
+DOUBLE_SUBMIT = "double_submit"
+
+
+def session_binding(session_cookie: str) -> str:
+    """
+    Part of the session cookie a signed CSRF token is bound to.
+
+    The signature is left out so tokens in open pages stay valid when the
+    cookie is re-signed after a secret rotation (payload and timestamp do
+    not change).
+    """
+    return session_cookie.rsplit(".", 1)[0]
+
 
 class CSRFProtection:
     """CSRF token generation and verification."""
 
     def __init__(self):
+        self.token_max_age = 3600  # 1 hour
+        self.token_refresh = 600  # page tokens stay valid for 50-60 minutes
+        self.clock = time.time
+        self.mode = config.CSRF_MODE
+        self.cookie_name = config.CSRF_COOKIE_NAME
+
+    def warm_up(self) -> None:
+        """
+        Build the serializer and derive its signing key now rather than on the first request.
+
+        Raises:
+            ValueError: If SESSION_SECRET is not configured
+        """
+        self.serializer.dumps("warm-up")
+
+    @cached_property
+    def serializer(self) -> RotatingSerializer:
+        """
+        Token serializer, created on first use (or during lifespan startup).
+
+        Raises:
+            ValueError: If SESSION_SECRET is not configured
+        """
         if not config.SESSION_SECRET:
             raise ValueError("SESSION_SECRET is required")
-        self.serializer = URLSafeTimedSerializer(config.SESSION_SECRET, salt="csrf")
-        self.token_max_age = 3600  # 1 hour
+        return RotatingSerializer(config.SESSION_SECRET, config.SESSION_SECRET_FALLBACKS, salt="csrf")
 
     def generate_token(self, session_id: str) -> str:
         """Generate a CSRF token."""
         return self.serializer.dumps(session_id)
 
+    def stable_token(self, session_id: str) -> str:
+        """Generate a CSRF token that only changes every `token_refresh` seconds."""
+        now = int(self.clock())
+        return self.serializer.dumps_at(session_id, now - now % self.token_refresh)
+
     def verify_token(self, token: str, session_id: str) -> bool:
         """Verify a CSRF token."""
         try:
@@ -26,21 +85,61 @@ class CSRFProtection:
         except (BadSignature, SignatureExpired):
             return False
 
-    def get_token_from_request(self, request: Request) -> Optional[str]:
-        """Extract CSRF token from request (header or form data)."""
-        # Check header first
+    def token_for(self, session_cookie: str, csrf_cookie: str | None) -> str:
+        """Token to embed in pages for a session ("" if there is none to use)."""
+        if self.mode == DOUBLE_SUBMIT:
+            return csrf_cookie or ""
+        return self.stable_token(session_binding(session_cookie))
+
+    def verify_request_token(self, token: str, session_cookie: str, csrf_cookie: str | None) -> bool:
+        """Verify a submitted token according to CSRF_MODE."""
+        if self.mode == DOUBLE_SUBMIT:
+            return bool(csrf_cookie) and hmac.compare_digest(token.encode(), csrf_cookie.encode())
+        return self.verify_token(token, session_binding(session_cookie))
+
+    def issue_cookie(self, response: Response) -> None:
+        """Set a fresh double-submit cookie (no-op in signed mode)."""
+        if self.mode != DOUBLE_SUBMIT:
+            return
+        response.set_cookie(
+            key=self.cookie_name,
+            value=secrets.token_urlsafe(32),
+            max_age=config.SESSION_MAX_AGE,
+            # Pages get the token from the server-rendered template, so JS never reads the cookie
+            httponly=True,
+            secure=config.SESSION_COOKIE_SECURE,
+            samesite=config.SESSION_COOKIE_SAMESITE,
+        )
+
+    def clear_cookie(self, response: Response) -> None:
+        """Remove the double-submit cookie (no-op in signed mode)."""
+        if self.mode == DOUBLE_SUBMIT:
+            response.delete_cookie(key=self.cookie_name)
+
+    def get_token_from_request(self, request: Request) -> str | None:
+        """
+        Extract CSRF token from request (header or form data).
+
+        The body is never parsed here: CSRFMiddleware scans form bodies as
+        they stream in and leaves the token in request.state.
+        """
         token = request.headers.get("X-CSRF-Token")
         if token:
             return token
-
-        # Check form data (for non-JSON requests)
-        # Note: This is a placeholder - actual form parsing happens in route
-        return None
+        return request.scope.get("state", {}).get("csrf_token")
 
 
 csrf_protection = CSRFProtection()
 
 
+def csrf_token_for_request(request: Request) -> str:
+    """CSRF token bound to the request's session cookie ("" if not logged in)."""
+    session_cookie = request.cookies.get(config.SESSION_COOKIE_NAME)
+    if not session_cookie:
+        return ""
+    return csrf_protection.token_for(session_cookie, request.cookies.get(csrf_protection.cookie_name))
+
+
 async def verify_csrf_token(request: Request) -> None:
     """Dependency to verify CSRF token on POST/PUT/PATCH/DELETE requests."""
     if request.method in ["POST", "PUT", "PATCH", "DELETE"]:
@@ -52,13 +151,8 @@ async def verify_csrf_token(request: Request) -> None:
                 detail="Invalid session"
             )
 
-        # Get CSRF token from request
-        csrf_token = request.headers.get("X-CSRF-Token")
-        if not csrf_token:
-            # Try to get from form data
-            form = await request.form()
-            csrf_token = form.get("csrf_token")
-
+        # Header, or the form field found by CSRFMiddleware (no body parsing here)
+        csrf_token = csrf_protection.get_token_from_request(request)
         if not csrf_token:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -66,7 +160,8 @@ async def verify_csrf_token(request: Request) -> None:
             )
 
         # Verify token
-        if not csrf_protection.verify_token(csrf_token, session_cookie):
+        csrf_cookie = request.cookies.get(csrf_protection.cookie_name)
+        if not csrf_protection.verify_request_token(csrf_token, session_cookie, csrf_cookie):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid CSRF token"
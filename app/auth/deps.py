@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import User
 from app.auth.session import session_manager
+from app.observability.log import bind_log_context
+from app.observability.tracing import tracer
 
 
 async def get_current_user(
@@ -16,7 +18,10 @@ async def get_current_user(
     if not user_id:
         return None
 
-    user = db.query(User).filter(User.id == user_id).first()
+    with tracer.span("db.select_user"):
+        user = db.query(User).filter(User.id == user_id).first()
+    if user:
+        bind_log_context(user_id=user.id)
     return user
 
 
@@ -0,0 +1,161 @@
+"""
+Failure tracking for login lockouts in fixed memory.
+
+Failures are counted in a count-min sketch: `depth` rows of `width` one-byte
+counters, indexed by a keyed hash of the account or IP. Memory does not grow
+with the number of keys, so an attacker spraying millions of emails or
+addresses cannot exhaust it; the worst they can do is raise the counts of
+colliding keys, and the per-process hash key keeps them from choosing which.
+
+The sketch never undercounts a key on its own (conservative update), so a
+guessing attack is always caught; collisions can only make a key lock
+early. Counts live in two generations of half a window each, so a failure is
+forgotten between window/2 and window seconds after it happened.
+
+Lockouts are rare (a key needs `threshold` failures first) and are kept
+exactly, in a bounded LRU keyed by the hash digest rather than the key
+itself. Each lockout of a key doubles the next one, up to `max_duration`;
+the escalation is forgotten after a success or `max_duration` of calm.
+"""
+
+import hashlib
+import os
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable
+
+COUNTER_MAX = 255
+
+
+class FailureTracker:
+    """Recent failures per key (count-min sketch) and exponential lockouts."""
+
+    def __init__(
+        self,
+        threshold: int,
+        window: float,
+        duration: float,
+        max_duration: float,
+        width: int,
+        max_locked: int,
+        depth: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < threshold <= COUNTER_MAX:
+            raise ValueError(f"threshold must be between 1 and {COUNTER_MAX}")
+        if width <= 0 or width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.threshold = threshold
+        self.duration = duration
+        self.max_duration = max_duration
+        self.width = width
+        self.depth = depth
+        self.max_locked = max_locked
+        self.clock = clock
+        self._generation_seconds = window / 2
+        self._unpack = struct.Struct(f"<{depth}I").unpack
+        self._hash_key = os.urandom(32)
+        self._generation = self._generation_at(clock())
+        self._current = self._empty()
+        self._previous = self._empty()
+        # hash digest -> [locked until, lockouts so far]
+        self._locked: OrderedDict[bytes, list] = OrderedDict()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the counters (fixed; the lockout table is bounded separately)."""
+        return 2 * self.depth * self.width
+
+    def _empty(self) -> array:
+        return array("B", bytes(self.depth * self.width))
+
+    def _generation_at(self, now: float) -> int:
+        return int(now // self._generation_seconds)
+
+    def _rotate(self, now: float) -> None:
+        generation = self._generation_at(now)
+        if generation == self._generation:
+            return
+        if generation == self._generation + 1:
+            self._previous, self._current = self._current, self._empty()
+        else:
+            self._previous, self._current = self._empty(), self._empty()
+        self._generation = generation
+
+    def _digest(self, key: str) -> bytes:
+        return hashlib.blake2b(
+            key.encode(), digest_size=4 * self.depth, key=self._hash_key
+        ).digest()
+
+    def _cells(self, digest: bytes) -> list[int]:
+        mask = self.width - 1
+        return [
+            row * self.width + (value & mask)
+            for row, value in enumerate(self._unpack(digest))
+        ]
+
+    def _estimate(self, cells: list[int]) -> int:
+        current, previous = self._current, self._previous
+        return min(current[cell] + previous[cell] for cell in cells)
+
+    def failures(self, key: str) -> int:
+        """Estimated failures for the key within the window (never below the true count)."""
+        self._rotate(self.clock())
+        return self._estimate(self._cells(self._digest(key)))
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until the key may try again (0.0 if not locked)."""
+        entry = self._locked.get(self._digest(key))
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[0] - self.clock())
+
+    def record_failure(self, key: str) -> None:
+        """Count a failure; lock the key once it reaches the threshold."""
+        now = self.clock()
+        self._rotate(now)
+        digest = self._digest(key)
+        cells = self._cells(digest)
+        estimate = self._estimate(cells) + 1
+        current, previous = self._current, self._previous
+        for cell in cells:
+            # Conservative update: raise each counter only as far as the new estimate needs
+            current[cell] = min(
+                COUNTER_MAX, max(current[cell], estimate - previous[cell])
+            )
+        if estimate >= self.threshold:
+            self._lock(digest, now)
+            self._forget(cells, estimate)
+
+    def record_success(self, key: str) -> None:
+        """Clear the key's failures and lockout escalation."""
+        self._rotate(self.clock())
+        digest = self._digest(key)
+        self._locked.pop(digest, None)
+        cells = self._cells(digest)
+        self._forget(cells, self._estimate(cells))
+
+    def _lock(self, digest: bytes, now: float) -> None:
+        entry = self._locked.pop(digest, None)
+        lockouts = (
+            entry[1] if entry is not None and now < entry[0] + self.max_duration else 0
+        )
+        duration = min(self.duration * 2**lockouts, self.max_duration)
+        self._locked[digest] = [now + duration, lockouts + 1]
+        while len(self._locked) > self.max_locked:
+            self._locked.popitem(last=False)
+
+    def _forget(self, cells: list[int], count: int) -> None:
+        # Colliding keys may lose up to `count` failures; they are undercounted, never locked by this
+        current, previous = self._current, self._previous
+        for cell in cells:
+            from_current = min(current[cell], count)
+            current[cell] -= from_current
+            previous[cell] -= min(previous[cell], count - from_current)
+
+    def clear(self) -> None:
+        self._current = self._empty()
+        self._previous = self._empty()
+        self._locked.clear()
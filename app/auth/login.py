@@ -0,0 +1,286 @@
+"""
+Staged login pipeline.
+
+Each stage rejects what it can before the next, more expensive one runs:
+
+1. syntax     malformed email, or a password length no account can have
+2. lockout    account with LOGIN_LOCKOUT_THRESHOLD recent failures from this
+              client IP, account with LOGIN_ACCOUNT_LOCKOUT_THRESHOLD failures
+              from any IP (unless this IP has logged into it before), or
+              client IP with LOGIN_IP_LOCKOUT_THRESHOLD (failures on any
+              account)
+3. coalesce   the exact (email, password) pair that just failed, or that
+              another request is checking right now
+4. unknown    email recently found not to be registered (negative cache)
+5. verify     SELECT the user (case-insensitively) and run argon2
+
+One address guessing at an account is stopped by the per-IP account lock;
+guessing from many addresses by the account-wide lock, whose higher threshold
+and known-client bypass keep strangers from locking the owner out. Stages 1-3
+cost neither a query nor a hash. Unknown emails (stage 4 and a
+lookup miss in stage 5) still run one argon2 verification against a dummy
+hash, so response time does not reveal whether an email is registered; like
+real verifications it runs on the bounded argon2 pool.
+
+State is per worker and bounded: failures are counted in fixed-memory
+sketches (app/auth/lockout.py), so spraying emails or addresses cannot grow
+it. Failed pairs and known clients are kept as keyed HMACs, never as
+passwords or addresses. A newly registered email may be reported unknown by
+other workers for up to LOGIN_UNKNOWN_EMAIL_TTL seconds.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.auth.lockout import FailureTracker
+from app.auth.password import dummy_verify_async, verify_password_async
+from app.config import config
+from app.models import User
+from app.observability.metrics import LOGIN_ATTEMPTS
+
+INVALID_CREDENTIALS = "Invalid credentials"
+
+
+def account_key(email: str) -> str:
+    """Canonical form of an email: stored at registration, matched at login, counted on failure."""
+    return email.strip().lower()
+
+
+def lock_key(key: str, client_ip: str) -> str:
+    """Key under which an account's failures from one client IP are counted."""
+    return f"{key}\0{client_ip}"
+
+
+def is_plausible(email: str, password: str) -> bool:
+    """Whether the credentials could belong to any account (no I/O)."""
+    if (
+        not 3 <= len(email) <= 254
+        or "@" not in email[1:-1]
+        or any(char.isspace() for char in email)
+    ):
+        return False
+    return config.PASSWORD_MIN_LENGTH <= len(password) <= config.PASSWORD_MAX_LENGTH
+
+
+class ExpiringKeys:
+    """Bounded set of keys that expire after a fixed TTL (oldest evicted first)."""
+
+    def __init__(
+        self, ttl: float, max_entries: int, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._expires: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires = self._expires.get(key)
+        if expires is None:
+            return False
+        if expires <= self.clock():
+            del self._expires[key]
+            return False
+        return True
+
+    def add(self, key: Hashable) -> None:
+        self._expires[key] = self.clock() + self.ttl
+        self._expires.move_to_end(key)
+        while len(self._expires) > self.max_entries:
+            self._expires.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._expires.pop(key, None)
+
+    def clear(self) -> None:
+        self._expires.clear()
+
+
+class LoginPipeline:
+    """Authenticate credentials, rejecting as early (cheaply) as possible."""
+
+    def __init__(
+        self,
+        lockout: FailureTracker,
+        account_lockout: FailureTracker,
+        ip_lockout: FailureTracker,
+        unknown_emails: ExpiringKeys,
+        recent_failures: ExpiringKeys,
+        known_clients: ExpiringKeys,
+    ):
+        self.lockout = lockout
+        self.account_lockout = account_lockout
+        self.ip_lockout = ip_lockout
+        self.unknown_emails = unknown_emails
+        self.recent_failures = recent_failures
+        self.known_clients = known_clients
+        self._inflight: dict[bytes, asyncio.Future] = {}
+        self._fingerprint_key = os.urandom(32)
+
+    def reset(self) -> None:
+        self.lockout.clear()
+        self.account_lockout.clear()
+        self.ip_lockout.clear()
+        self.unknown_emails.clear()
+        self.recent_failures.clear()
+        self.known_clients.clear()
+
+    def registered(self, email: str, password: str) -> None:
+        """The email was just registered: forget it was unknown and that this pair failed."""
+        key = account_key(email)
+        self.unknown_emails.discard(key)
+        self.recent_failures.discard(self._fingerprint(key, password))
+
+    def _fingerprint(self, key: str, password: str) -> bytes:
+        return hmac.new(
+            self._fingerprint_key, f"{key}\0{password}".encode(), hashlib.sha256
+        ).digest()
+
+    def _client_fingerprint(self, key: str, client_ip: str) -> bytes:
+        return hmac.new(
+            self._fingerprint_key,
+            f"client\0{lock_key(key, client_ip)}".encode(),
+            hashlib.sha256,
+        ).digest()
+
+    @staticmethod
+    def _reject(stage: str) -> HTTPException:
+        LOGIN_ATTEMPTS.labels(stage).inc()
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_CREDENTIALS
+        )
+
+    @staticmethod
+    def _locked(stage: str, retry_after: float) -> HTTPException:
+        LOGIN_ATTEMPTS.labels(stage).inc()
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+    async def authenticate(
+        self, db: Session, email: str, password: str, client_ip: str = "unknown"
+    ) -> User:
+        """
+        Return the user for valid credentials.
+
+        Raises:
+            HTTPException: 401 for invalid credentials, 429 while the account or client IP is locked
+        """
+        if not is_plausible(email, password):
+            raise self._reject("syntax")
+
+        key = account_key(email)
+        retry_after = self.lockout.retry_after(lock_key(key, client_ip))
+        if retry_after:
+            raise self._locked("locked", retry_after)
+        if self._client_fingerprint(key, client_ip) not in self.known_clients:
+            retry_after = self.account_lockout.retry_after(key)
+            if retry_after:
+                raise self._locked("account_locked", retry_after)
+        retry_after = self.ip_lockout.retry_after(client_ip)
+        if retry_after:
+            raise self._locked("ip_locked", retry_after)
+
+        fingerprint = self._fingerprint(key, password)
+        if fingerprint in self.recent_failures:
+            raise self._reject("coalesced")
+        leader = self._inflight.get(fingerprint)
+        if leader is not None:
+            # The same pair is being checked right now: share a failure, re-check after a success
+            if not await asyncio.shield(leader):
+                raise self._reject("coalesced")
+            return await self._verify(db, password, key, fingerprint, client_ip)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[fingerprint] = future
+        succeeded = True  # on unexpected errors, waiters check for themselves
+        try:
+            user = await self._verify(db, password, key, fingerprint, client_ip)
+        except HTTPException:
+            succeeded = False
+            raise
+        finally:
+            del self._inflight[fingerprint]
+            future.set_result(succeeded)
+        return user
+
+    async def _verify(
+        self, db: Session, password: str, key: str, fingerprint: bytes, client_ip: str
+    ) -> User:
+        if key in self.unknown_emails:
+            await dummy_verify_async()
+            self._record_failure(key, fingerprint, client_ip)
+            raise self._reject("unknown")
+
+        # Case-insensitive like the caches above (rows from before normalisation may be mixed case)
+        user = db.query(User).filter(func.lower(User.email) == key).first()
+        if user is None:
+            # Same cost as a wrong password (enumeration protection)
+            await dummy_verify_async()
+            self.unknown_emails.add(key)
+            self._record_failure(key, fingerprint, client_ip)
+            raise self._reject("unknown")
+
+        if not await verify_password_async(password, user.password_hash):
+            self._record_failure(key, fingerprint, client_ip)
+            raise self._reject("password")
+
+        self.lockout.record_success(lock_key(key, client_ip))
+        self.account_lockout.record_success(key)
+        self.known_clients.add(self._client_fingerprint(key, client_ip))
+        LOGIN_ATTEMPTS.labels("success").inc()
+        return user
+
+    def _record_failure(self, key: str, fingerprint: bytes, client_ip: str) -> None:
+        self.lockout.record_failure(lock_key(key, client_ip))
+        self.account_lockout.record_failure(key)
+        # Never cleared by a success: an attacker could log into their own account in between
+        self.ip_lockout.record_failure(client_ip)
+        self.recent_failures.add(fingerprint)
+
+
+login_pipeline = LoginPipeline(
+    lockout=FailureTracker(
+        threshold=config.LOGIN_LOCKOUT_THRESHOLD,
+        window=config.LOGIN_LOCKOUT_WINDOW,
+        duration=config.LOGIN_LOCKOUT_DURATION,
+        max_duration=config.LOGIN_LOCKOUT_MAX_DURATION,
+        width=config.LOGIN_FAILURE_SKETCH_WIDTH,
+        max_locked=config.LOGIN_TRACKED_KEYS,
+    ),
+    account_lockout=FailureTracker(
+        threshold=config.LOGIN_ACCOUNT_LOCKOUT_THRESHOLD,
+        window=config.LOGIN_LOCKOUT_WINDOW,
+        duration=config.LOGIN_LOCKOUT_DURATION,
+        max_duration=config.LOGIN_LOCKOUT_MAX_DURATION,
+        width=config.LOGIN_FAILURE_SKETCH_WIDTH,
+        max_locked=config.LOGIN_TRACKED_KEYS,
+    ),
+    ip_lockout=FailureTracker(
+        threshold=config.LOGIN_IP_LOCKOUT_THRESHOLD,
+        window=config.LOGIN_LOCKOUT_WINDOW,
+        duration=config.LOGIN_LOCKOUT_DURATION,
+        max_duration=config.LOGIN_LOCKOUT_MAX_DURATION,
+        width=config.LOGIN_FAILURE_SKETCH_WIDTH,
+        max_locked=config.LOGIN_TRACKED_KEYS,
+    ),
+    unknown_emails=ExpiringKeys(
+        ttl=config.LOGIN_UNKNOWN_EMAIL_TTL, max_entries=config.LOGIN_TRACKED_KEYS
+    ),
+    recent_failures=ExpiringKeys(
+        ttl=config.LOGIN_FAILURE_COALESCE_TTL, max_entries=config.LOGIN_TRACKED_KEYS
+    ),
+    known_clients=ExpiringKeys(
+        ttl=config.LOGIN_KNOWN_CLIENT_TTL, max_entries=config.LOGIN_TRACKED_KEYS
+    ),
+)
@@ -1,15 +1,112 @@
 """Password hashing and verification."""
-from passlib.context import CryptContext
 
-# Use argon2 for password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import TypeVar
+
+from app.config import config
+from app.observability.metrics import PASSWORD_HASH_DURATION
+
+T = TypeVar("T")
+
+
+@cache
+def get_pwd_context():
+    """
+    argon2 CryptContext, built on first use.
+
+    passlib is imported here rather than at module level so that importing the
+    app (cold start) does not pay for loading the hash backends.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["argon2"], deprecated="auto")
+
+
+def warm_up_password_hashing() -> None:
+    """
+    Load the argon2 backend and run one verification so the first login is not slow.
+
+    Blocking (one argon2 operation); the lifespan runs it in a worker thread.
+    """
+    get_pwd_context().dummy_verify()
 
 
 def hash_password(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    with PASSWORD_HASH_DURATION.labels("hash").time():
+        return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with PASSWORD_HASH_DURATION.labels("verify").time():
+        return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def dummy_verify() -> None:
+    """One verification against a dummy hash (same cost as a real one; for unknown accounts)."""
+    with PASSWORD_HASH_DURATION.labels("verify").time():
+        get_pwd_context().dummy_verify()
+
+
+class PasswordHashPool:
+    """
+    Dedicated threads for argon2 so hashing never blocks the event loop.
+
+    The pool is bounded: argon2 is CPU and memory heavy, and a small fixed
+    number of workers keeps a login burst from starving the rest of the app.
+    `in_flight` (running + queued) is exposed for readiness checks.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.in_flight = 0
+        self._executor = None
+
+    @property
+    def saturation(self) -> float:
+        """Outstanding operations per worker (>1 means requests are queueing)."""
+        return self.in_flight / self.workers
+
+    def reset(self) -> None:
+        """Forget the executor (its threads do not survive a fork); a new one starts on first use."""
+        self.in_flight = 0
+        self._executor = None
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="argon2"
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            self.in_flight -= 1
+
+
+password_hash_pool = PasswordHashPool(workers=config.PASSWORD_HASH_WORKERS)
+os.register_at_fork(after_in_child=password_hash_pool.reset)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the argon2 pool."""
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the argon2 pool."""
+    return await password_hash_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def dummy_verify_async() -> None:
+    """Run a dummy verification on the argon2 pool."""
+    await password_hash_pool.run(dummy_verify)
@@ -1,26 +1,49 @@
 """Session management using signed cookies."""
 from datetime import datetime
+from functools import cached_property
 from typing import Optional
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from itsdangerous import BadSignature, SignatureExpired
 from fastapi import Request, Response
+from app.auth.signing import RotatingSerializer
 from app.config import config
+from app.observability.tracing import tracer
 
 
 class SessionManager:
     """Manage user sessions with signed cookies."""
 
     def __init__(self):
-        if not config.SESSION_SECRET:
-            raise ValueError("SESSION_SECRET is required")
-        self.serializer = URLSafeTimedSerializer(config.SESSION_SECRET)
         self.cookie_name = config.SESSION_COOKIE_NAME
         self.max_age = config.SESSION_MAX_AGE
 
+    def warm_up(self) -> None:
+        """
+        Build the serializer and derive its signing key now rather than on the first request.
+
+        Raises:
+            ValueError: If SESSION_SECRET is not configured
+        """
+        self.serializer.dumps("warm-up")
+
+    @cached_property
+    def serializer(self) -> RotatingSerializer:
+        """
+        Cookie serializer, created on first use (or during lifespan startup).
+
+        Raises:
+            ValueError: If SESSION_SECRET is not configured
+        """
+        if not config.SESSION_SECRET:
+            raise ValueError("SESSION_SECRET is required")
+        return RotatingSerializer(config.SESSION_SECRET, config.SESSION_SECRET_FALLBACKS)
+
     def create_session(self, response: Response, user_id: int) -> None:
         """Create a new session for a user."""
         session_data = {"user_id": user_id, "created_at": datetime.utcnow().isoformat()}
-        token = self.serializer.dumps(session_data)
+        self.set_cookie(response, self.serializer.dumps(session_data))
 
+    def set_cookie(self, response: Response, token: str) -> None:
+        """Set the session cookie on a response."""
         response.set_cookie(
             key=self.cookie_name,
             value=token,
@@ -30,17 +53,32 @@ class SessionManager:
             samesite=config.SESSION_COOKIE_SAMESITE,
         )
 
+    def cookie_header(self, token: str) -> bytes:
+        """Raw Set-Cookie header value for a session token (for ASGI middleware)."""
+        response = Response()
+        self.set_cookie(response, token)
+        return response.headers["set-cookie"].encode("latin-1")
+
     def get_user_id(self, request: Request) -> Optional[int]:
-        """Get user ID from session cookie."""
+        """
+        Get user ID from session cookie.
+
+        A cookie signed with a previous secret (SESSION_SECRET_FALLBACKS) is
+        accepted, and its re-signed value is left in request.state for
+        SessionRefreshMiddleware to send back.
+        """
         token = request.cookies.get(self.cookie_name)
         if not token:
             return None
 
-        try:
-            session_data = self.serializer.loads(token, max_age=self.max_age)
-            return session_data.get("user_id")
-        except (BadSignature, SignatureExpired):
-            return None
+        with tracer.span("session.decode"):
+            try:
+                session_data, resigned = self.serializer.loads_rotating(token, max_age=self.max_age)
+            except (BadSignature, SignatureExpired):
+                return None
+        if resigned is not None:
+            request.state.refreshed_session_cookie = resigned
+        return session_data.get("user_id")
 
     def delete_session(self, response: Response) -> None:
         """Delete a session."""
@@ -0,0 +1,142 @@
+"""
+itsdangerous serializers with cached key material.
+
+Stock itsdangerous builds a new Signer for every dumps()/loads(), re-derives
+the signing key from the secret (a SHA-1 over salt + secret) and HMAC-keys it
+again for every signature. Sessions and CSRF tokens are checked on most
+requests, so the key derivation and the HMAC key setup are done once per
+secret here and only the message is hashed per call.
+
+Tokens are byte-for-byte compatible with URLSafeTimedSerializer, so existing
+cookies stay valid.
+"""
+
+import hmac
+from collections.abc import Sequence
+from typing import Any
+
+from itsdangerous import (
+    BadSignature,
+    SignatureExpired,
+    Signer,
+    TimestampSigner,
+    URLSafeTimedSerializer,
+)
+from itsdangerous.encoding import base64_encode, int_to_bytes, want_bytes
+from itsdangerous.signer import SigningAlgorithm
+
+
+class PrekeyedHMACAlgorithm(SigningAlgorithm):
+    """HMAC that keeps a keyed hash per key and copies it for each message."""
+
+    def __init__(self, digest_method: Any):
+        self.digest_method = digest_method
+        self._keyed: dict[bytes, Any] = {}
+
+    def get_signature(self, key: bytes, value: bytes) -> bytes:
+        keyed = self._keyed.get(key)
+        if keyed is None:
+            keyed = self._keyed[key] = hmac.new(key, digestmod=self.digest_method)
+        mac = keyed.copy()
+        mac.update(value)
+        return mac.digest()
+
+
+class CachedKeyTimestampSigner(TimestampSigner):
+    """TimestampSigner that derives each secret's key only once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.algorithm = PrekeyedHMACAlgorithm(self.digest_method)
+        self._derived: dict[bytes, bytes] = {}
+
+    def derive_key(self, secret_key=None) -> bytes:
+        cache_key = self.secret_keys[-1] if secret_key is None else secret_key
+        key = self._derived.get(cache_key)
+        if key is None:
+            key = self._derived[cache_key] = super().derive_key(secret_key)
+        return key
+
+
+class CachedURLSafeTimedSerializer(URLSafeTimedSerializer):
+    """URLSafeTimedSerializer that reuses one cached-key signer per salt."""
+
+    default_signer = CachedKeyTimestampSigner
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._signers: dict[Any, Signer] = {}
+
+    def make_signer(self, salt=None) -> Signer:
+        if salt is None:
+            salt = self.salt
+        signer = self._signers.get(salt)
+        if signer is None:
+            signer = self._signers[salt] = super().make_signer(salt)
+        return signer
+
+
+class RotatingSerializer:
+    """
+    Sign with the active secret; also accept tokens signed with previous secrets.
+
+    Rotating SESSION_SECRET then no longer logs everybody out: old tokens stay
+    valid and are re-signed with the active secret as users come back (see
+    loads_rotating()), keeping their original timestamp so re-signing never
+    extends a token's lifetime.
+    """
+
+    def __init__(self, secret: str, previous_secrets: Sequence[str] = (), **kwargs):
+        self.active = CachedURLSafeTimedSerializer(secret, **kwargs)
+        self.previous = (
+            CachedURLSafeTimedSerializer(list(previous_secrets), **kwargs)
+            if previous_secrets
+            else None
+        )
+
+    def dumps(self, obj: Any) -> str:
+        return self.active.dumps(obj)
+
+    def dumps_at(self, obj: Any, timestamp: int) -> str:
+        """dumps() with a given timestamp instead of the current time."""
+        signer = self.active.make_signer()
+        value = (
+            want_bytes(self.active.dump_payload(obj))
+            + want_bytes(signer.sep)
+            + base64_encode(int_to_bytes(timestamp))
+        )
+        return Signer.sign(signer, value).decode("ascii")
+
+    def loads(self, token: str, max_age: int | None = None) -> Any:
+        return self.loads_rotating(token, max_age)[0]
+
+    def loads_rotating(
+        self, token: str, max_age: int | None = None
+    ) -> tuple[Any, str | None]:
+        """
+        Verify a token against the active and then the previous secrets.
+
+        Returns:
+            (payload, re-signed token) - the second item is None when the
+            token was already signed with the active secret
+
+        Raises:
+            BadSignature: If no secret matches
+            SignatureExpired: If the token is older than max_age
+        """
+        try:
+            return self.active.loads(token, max_age=max_age), None
+        except SignatureExpired:
+            raise
+        except BadSignature:
+            if self.previous is None:
+                raise
+        payload = self.previous.loads(token, max_age=max_age)
+        return payload, self.resign(token)
+
+    def resign(self, token: str) -> str:
+        """Replace a (verified) token's signature with the active secret's, keeping payload and timestamp."""
+        signer = self.active.make_signer()
+        value = want_bytes(token).rsplit(signer.sep, 1)[0]
+        # Signer.sign (not TimestampSigner.sign) so no new timestamp is added
+        return Signer.sign(signer, value).decode("ascii")
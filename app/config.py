@@ -1,9 +1,12 @@
 """Application configuration."""
 import os
-from typing import List
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+# Load .env from the repository root (skipped, including the dotenv import, when absent)
+DOTENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+if DOTENV_PATH.is_file():
+    from dotenv import load_dotenv
+    load_dotenv(DOTENV_PATH)
 
 
 class Config:
@@ -18,20 +21,138 @@ class Config:
 
     # Session
     SESSION_SECRET: str = os.getenv("SESSION_SECRET", "")
+    # Previous secrets, still accepted for verification after a rotation (comma-separated)
+    SESSION_SECRET_FALLBACKS: list[str] = [
+        secret.strip()
+        for secret in os.getenv("SESSION_SECRET_FALLBACKS", "").split(",")
+        if secret.strip()
+    ]
     SESSION_COOKIE_NAME: str = "session"
     SESSION_COOKIE_HTTPONLY: bool = True
     SESSION_COOKIE_SAMESITE: str = "lax"
     SESSION_COOKIE_SECURE: bool = APP_ENV == "production"
     SESSION_MAX_AGE: int = 86400  # 24 hours
 
+    # CSRF: "signed" (token signed over the session cookie) or "double_submit" (random token cookie)
+    CSRF_MODE: str = os.getenv("CSRF_MODE", "signed")
+    CSRF_COOKIE_NAME: str = "csrf_token"
+    CSRF_FORM_FIELD: str = "csrf_token"
+    CSRF_FORM_SCAN_LIMIT: int = 16384  # bytes of a urlencoded body searched for the form field
+
     # Omni Embed - Standard SSO (manual generation)
     OMNI_BASE_URL: str = os.getenv("OMNI_BASE_URL", "")
     OMNI_SECRET: str = os.getenv("OMNI_SECRET", "")
-    OMNI_CONTENT_PATH_ALLOWLIST: List[str] = [
+    OMNI_CONTENT_PATH_ALLOWLIST: list[str] = [
         path.strip()
         for path in os.getenv("OMNI_CONTENT_PATH_ALLOWLIST", "").split(",")
         if path.strip()
     ]
+    # Optional JSON file with default and per-customer entries, re-read when it changes
+    OMNI_ALLOWLIST_FILE: str = os.getenv("OMNI_ALLOWLIST_FILE", "")
+    OMNI_ALLOWLIST_RELOAD_INTERVAL: float = 5.0  # seconds between mtime checks
+    # Per-customer entitlements (entitlements table), cached per worker
+    ENTITLEMENT_CACHE_TTL: float = float(os.getenv("ENTITLEMENT_CACHE_TTL", "60"))  # bound on cross-worker staleness
+    ENTITLEMENT_CACHE_MAX_CUSTOMERS: int = 10000
+    # Dashboard catalog (titles / thumbnails): source "file" or "" (disabled)
+    CATALOG_SOURCE: str = os.getenv("CATALOG_SOURCE", "")
+    CATALOG_FILE: str = os.getenv("CATALOG_FILE", "./data/catalog.json")
+    CATALOG_REFRESH_INTERVAL: float = float(os.getenv("CATALOG_REFRESH_INTERVAL", "300"))
+
+    # Omni HTTP client (shared keep-alive pool)
+    OMNI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("OMNI_HTTP_MAX_CONNECTIONS", "20"))
+    OMNI_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    OMNI_WARMUP_TIMEOUT: float = 3.0
+    OMNI_CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before failing fast
+    OMNI_CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds before a trial call
+    # Outbound quota (token bucket shared by all workers through OMNI_QUOTA_FILE; rate 0 = only honour 429s)
+    OMNI_QUOTA_RATE: float = float(os.getenv("OMNI_QUOTA_RATE", "0"))  # calls per second, whole host
+    OMNI_QUOTA_BURST: float = float(os.getenv("OMNI_QUOTA_BURST", "10"))
+    OMNI_QUOTA_FILE: str = os.getenv("OMNI_QUOTA_FILE", "")  # set by app.server for multi-worker runs
+    OMNI_QUOTA_MAX_WAIT: float = 2.0  # seconds an interactive call may wait for a token
+    OMNI_QUOTA_BACKGROUND_RESERVE: float = 0.5  # fraction of the burst only interactive calls may use
+    OMNI_QUOTA_RECOVERY_SECONDS: float = 60.0  # time to recover the full rate after a 429
+    OMNI_QUOTA_DEFAULT_RETRY_AFTER: float = 1.0  # pause when a 429 has no Retry-After
+    # Priority queue in front of Omni: worker coroutines and the longest queue wait per class (seconds)
+    OMNI_SCHEDULER_WORKERS: int = int(os.getenv("OMNI_SCHEDULER_WORKERS", str(OMNI_HTTP_MAX_CONNECTIONS)))
+    OMNI_SCHEDULER_MAX_QUEUE_WAIT: dict[str, float] = {
+        "interactive": 5.0,
+        "prefetch": 1.0,  # stale soon after /me renders
+    }
+
+    # Embed URL cache / speculative prefetch (URLs are single-use: a cached URL is handed out once)
+    EMBED_URL_CACHE_TTL: float = float(os.getenv("EMBED_URL_CACHE_TTL", "60"))  # keep well below Omni's URL lifetime
+    EMBED_PREFETCH: bool = os.getenv("EMBED_PREFETCH", "false").lower() == "true"
+    EMBED_PREFETCH_TOP_N: int = int(os.getenv("EMBED_PREFETCH_TOP_N", "3"))
+    EMBED_PREFETCH_HISTORY_DAYS: int = 30
+    EMBED_PREFETCH_SHARE: float = float(os.getenv("EMBED_PREFETCH_SHARE", "0.2"))  # of OMNI_HTTP_MAX_CONNECTIONS
+
+    # Startup warm-up: DB pool, Omni keep-alive connection and argon2 (disable for tests)
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+    # Templates
+    TEMPLATE_AUTO_RELOAD: bool = DEBUG  # mtime checks on every render (dev only)
+    TEMPLATE_BYTECODE_CACHE_DIR: str = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "./data/jinja_cache")
+
+    # Middleware fast path: these paths skip CSRF, rate limiting, request IDs, timing, metrics, tracing, access logs and ETags
+    MIDDLEWARE_EXEMPT_PATHS: tuple[str, ...] = ("/healthz", "/livez", "/readyz", "/metrics", "/static")
+
+    # Logging (JSON lines on stdout, written from a background thread)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))  # fraction of INFO access logs kept
+    LOG_SLOW_REQUEST_MS: float = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+    LOG_SLOW_QUERY_MS: float = float(os.getenv("LOG_SLOW_QUERY_MS", "100"))
+    LOG_SQL: bool = os.getenv("LOG_SQL", "true" if DEBUG else "false").lower() == "true"
+
+    # Prometheus scrapes must send "Authorization: Bearer <token>"; /metrics is not served without one
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # Profiling (routes and middleware are only installed when the token is set)
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_MAX_SECONDS: float = 30.0
+    PROFILING_SAMPLE_INTERVAL: float = 0.005  # seconds between stack samples
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./data/profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))  # oldest per-request profiles are deleted
+
+    # Tracing (exporter: "none", "file" or "memory")
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none")
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "./data/traces.jsonl")
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # 0.0 - 1.0, for new traces
+
+    # Response compression (brotli is used when installed, gzip otherwise)
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "500"))  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Health checks (/readyz)
+    HEALTH_CACHE_TTL: float = 2.0  # seconds a readiness result is reused
+    HEALTH_DB_TIMEOUT: float = 1.0
+    HEALTH_MAX_LOOP_LAG_MS: float = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "500"))
+    HEALTH_MAX_PASSWORD_SATURATION: float = 4.0  # queued argon2 operations per worker
+
+    # Blocking-call detector: logs the stack of callbacks that hold the event loop (debug tool)
+    LOOP_BLOCKING_DETECTOR: bool = os.getenv("LOOP_BLOCKING_DETECTOR", "true" if DEBUG else "false").lower() == "true"
+    LOOP_BLOCKING_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCKING_THRESHOLD_MS", "100"))
+
+    # Password hashing (argon2 runs on a dedicated thread pool)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+    # Passwords (registration and the login syntax check)
+    PASSWORD_MIN_LENGTH: int = 8
+    PASSWORD_MAX_LENGTH: int = 1024  # bounds argon2 input
+
+    # Login pipeline (per worker): account/IP lockout, unknown-email negative cache, failed-pair coalescing
+    LOGIN_LOCKOUT_THRESHOLD: int = int(os.getenv("LOGIN_LOCKOUT_THRESHOLD", "10"))  # per account and IP, within the window
+    # Per account from any IP (IPs that logged into it before are exempt)
+    LOGIN_ACCOUNT_LOCKOUT_THRESHOLD: int = int(os.getenv("LOGIN_ACCOUNT_LOCKOUT_THRESHOLD", "50"))
+    LOGIN_IP_LOCKOUT_THRESHOLD: int = int(os.getenv("LOGIN_IP_LOCKOUT_THRESHOLD", "12"))  # reachable under RATE_LIMIT_LOGIN
+    LOGIN_LOCKOUT_WINDOW: float = 900.0
+    LOGIN_LOCKOUT_DURATION: float = float(os.getenv("LOGIN_LOCKOUT_DURATION", "900"))  # doubles per lockout
+    LOGIN_LOCKOUT_MAX_DURATION: float = float(os.getenv("LOGIN_LOCKOUT_MAX_DURATION", "86400"))
+    LOGIN_FAILURE_SKETCH_WIDTH: int = int(os.getenv("LOGIN_FAILURE_SKETCH_WIDTH", str(2 ** 18)))  # 2 MB per tracker
+    LOGIN_UNKNOWN_EMAIL_TTL: float = 60.0  # bound on cross-worker staleness after a registration
+    LOGIN_FAILURE_COALESCE_TTL: float = 30.0
+    LOGIN_KNOWN_CLIENT_TTL: float = 30 * 86400.0  # how long a successful IP stays exempt from the account lock
+    LOGIN_TRACKED_KEYS: int = 100000  # entries per store
 
     # Rate Limiting (simple in-memory)
     RATE_LIMIT_LOGIN: int = 5  # attempts per window
@@ -45,14 +166,25 @@ class Config:
         if not cls.SESSION_SECRET or len(cls.SESSION_SECRET) < 32:
             errors.append("SESSION_SECRET must be at least 32 characters")
 
+        if any(len(secret) < 32 for secret in cls.SESSION_SECRET_FALLBACKS):
+            errors.append("SESSION_SECRET_FALLBACKS entries must be at least 32 characters")
+
+        if cls.CSRF_MODE not in ("signed", "double_submit"):
+            errors.append("CSRF_MODE must be 'signed' or 'double_submit'")
+
         if not cls.OMNI_BASE_URL:
             errors.append("OMNI_BASE_URL is required")
 
         if not cls.OMNI_SECRET:
             errors.append("OMNI_SECRET is required")
 
-        if not cls.OMNI_CONTENT_PATH_ALLOWLIST:
-            errors.append("OMNI_CONTENT_PATH_ALLOWLIST is required")
+        # RateLimitMiddleware caps login attempts per IP; a per-IP threshold above that never fires
+        reachable = cls.RATE_LIMIT_LOGIN * cls.LOGIN_LOCKOUT_WINDOW / cls.RATE_LIMIT_WINDOW
+        if max(cls.LOGIN_LOCKOUT_THRESHOLD, cls.LOGIN_IP_LOCKOUT_THRESHOLD) > reachable:
+            errors.append(
+                f"LOGIN_LOCKOUT_THRESHOLD and LOGIN_IP_LOCKOUT_THRESHOLD must be at most {int(reachable)} "
+                "(login attempts RATE_LIMIT_LOGIN allows per IP within the lockout window)"
+            )
 
         if errors:
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
@@ -1,27 +1,59 @@
 """Database setup and session management."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session, DeclarativeBase
+import os
+from functools import cache
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+
+# Register query metrics and slow-query logging listeners on every Engine
+import app.observability.metrics  # noqa: F401
 from app.config import config
 
-# Create engine
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {},
-    echo=config.DEBUG
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@cache
+def get_engine() -> Engine:
+    """Create the engine on first use (lifespan startup or the first request)."""
+    return create_engine(
+        config.DATABASE_URL,
+        connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {},
+        # SQL logging goes through the queued JSON logger instead (LOG_SQL)
+        echo=False
+    )
+
+
+def _reset_engine_after_fork() -> None:
+    """
+    Drop pooled connections inherited from the parent process.
+
+    A pre-forking server (e.g. gunicorn --preload) would otherwise share the
+    parent's sockets between workers; close=False leaves them open for the
+    parent and the child creates its own engine on next use.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+        get_engine.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_engine_after_fork)
+
+
+def warm_up_database() -> None:
+    """Open a pooled connection and run a trivial query (called from the app lifespan)."""
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+# Session factory (bound to the engine when a session is opened)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 
 class Base(DeclarativeBase):
     """Base class for all models."""
-    pass
 
 
 def get_db() -> Session:
     """Dependency to get database session."""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
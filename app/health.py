@@ -0,0 +1,130 @@
+"""
+Worker readiness and dependency health.
+
+/livez only proves the process and its event loop respond. /readyz combines
+the lifecycle state (warm-up done, not shutting down) with dependency checks,
+cached for HEALTH_CACHE_TTL seconds so frequent load balancer probes stay cheap.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.auth.password import password_hash_pool
+from app.config import config
+from app.db import warm_up_database
+from app.observability.log import logger
+from app.observability.loop import loop_lag_monitor
+from app.omni.circuit_breaker import CircuitBreaker
+from app.omni.client import omni_client
+
+OK = "ok"
+DEGRADED = "degraded"  # reported, but the worker stays in rotation
+FAIL = "fail"  # take the worker out of rotation
+
+
+class Readiness:
+    """
+    Tracks whether this worker should receive traffic.
+
+    A worker becomes ready once lifespan warm-up has finished and stops being
+    ready as soon as shutdown begins, so load balancers drain it first.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.reason = "starting"
+
+    def mark_ready(self) -> None:
+        """Warm-up finished."""
+        self.ready = True
+        self.reason = "ready"
+
+    def mark_not_ready(self, reason: str) -> None:
+        """Stop accepting new traffic (e.g. "shutting down")."""
+        self.ready = False
+        self.reason = reason
+
+
+readiness = Readiness()
+
+
+async def check_database() -> dict[str, Any]:
+    """A pooled connection can run SELECT 1 within the timeout."""
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(warm_up_database), config.HEALTH_DB_TIMEOUT
+        )
+    except (TimeoutError, SQLAlchemyError) as e:
+        # Type only: driver messages can include connection details
+        logger.warning("Readiness database check failed: %s", type(e).__name__)
+        return {"status": FAIL, "error": type(e).__name__}
+    return {"status": OK}
+
+
+def check_omni() -> dict[str, Any]:
+    """
+    Omni circuit breaker state.
+
+    An open circuit affects every worker equally, so it is reported as
+    degraded rather than failing readiness (pages and login still work).
+    """
+    state = omni_client.circuit_breaker.state
+    return {
+        "status": OK if state == CircuitBreaker.CLOSED else DEGRADED,
+        "circuit": state,
+    }
+
+
+def check_event_loop() -> dict[str, Any]:
+    """Recent event loop lag is below the threshold."""
+    lag_ms = loop_lag_monitor.lag * 1000
+    status = FAIL if lag_ms > config.HEALTH_MAX_LOOP_LAG_MS else OK
+    return {"status": status, "lag_ms": round(lag_ms, 2)}
+
+
+def check_password_hashing() -> dict[str, Any]:
+    """The argon2 pool is not backed up (backpressure for login bursts)."""
+    saturation = password_hash_pool.saturation
+    status = FAIL if saturation > config.HEALTH_MAX_PASSWORD_SATURATION else OK
+    return {
+        "status": status,
+        "in_flight": password_hash_pool.in_flight,
+        "workers": password_hash_pool.workers,
+    }
+
+
+class HealthChecker:
+    """Run dependency checks, caching the combined result for `ttl` seconds."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._result: dict[str, Any] | None = None
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        self._result = None
+
+    async def check(self) -> dict[str, Any]:
+        """Combined check result: {"ready": bool, "checks": {...}}."""
+        now = time.monotonic()
+        if self._result is not None and now - self._checked_at < self.ttl:
+            return self._result
+
+        checks = {
+            "database": await check_database(),
+            "omni": check_omni(),
+            "event_loop": check_event_loop(),
+            "password_hashing": check_password_hashing(),
+        }
+        self._result = {
+            "ready": all(check["status"] != FAIL for check in checks.values()),
+            "checks": checks,
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+
+health_checker = HealthChecker(ttl=config.HEALTH_CACHE_TTL)
@@ -1,51 +1,181 @@
 """FastAPI application."""
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles  # noqa: F401 - Reserved for future use
+from app.assets import STATIC_DIR, FingerprintedStaticFiles, asset_manifest
+from app.auth.csrf import csrf_protection
+from app.auth.password import warm_up_password_hashing
+from app.auth.session import session_manager
 from app.config import config
+from app.db import warm_up_database
+from app.health import health_checker, readiness
+from app.middleware.stack import install_middleware
+from app.observability.log import configure_logging, logger, shutdown_logging
+from app.observability.loop import blocking_call_detector, loop_lag_monitor
+from app.observability.metrics import is_scrape_authorized, mark_worker_dead, metrics_response
+from app.observability.tracing import tracer
+from app.omni.allowlist import content_allowlist
+from app.omni.catalog import catalog_index
+from app.omni.client import omni_client
+from app.omni.scheduler import omni_scheduler
+from app.responses import FastJSONResponse
 from app.routes import api, pages
+from app.templating import warm_up_templates
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan (startup / shutdown).
+
+    uvicorn only starts accepting connections once startup has finished, so
+    everything a first request would otherwise pay for is done here.
+    """
+    configure_logging()
+
+    # Validate configuration (but allow startup even if Omni is not configured)
+    try:
+        config.validate()
+    except ValueError as e:
+        logger.warning("Configuration incomplete - Omni features may not work: %s", e)
+
+    # Singletons are built here rather than at import time; a missing
+    # SESSION_SECRET still fails startup (ValueError) before serving traffic
+    session_manager.warm_up()
+    csrf_protection.warm_up()
+
+    await warm_up()
+    loop_lag_monitor.start()
+    omni_scheduler.start()
+    if config.LOOP_BLOCKING_DETECTOR:
+        blocking_call_detector.threshold = config.LOOP_BLOCKING_THRESHOLD_MS / 1000
+        blocking_call_detector.start()
+    health_checker.invalidate()
+    readiness.mark_ready()
+
+    yield
+
+    readiness.mark_not_ready("shutting down")
+    await loop_lag_monitor.stop()
+    await catalog_index.stop()
+    await content_allowlist.stop()
+    blocking_call_detector.stop()
+    await omni_scheduler.stop()
+    await omni_client.aclose()
+    # Multiprocess mode: let the other workers stop reporting this worker's gauges
+    mark_worker_dead()
+    tracer.shutdown()
+    shutdown_logging()
+
+
+async def warm_up() -> None:
+    """Open pools and fill caches so the first requests are not slow."""
+    started = asyncio.get_running_loop().time()
+
+    # Fingerprint static assets and precompile templates
+    asset_manifest.build()
+    warm_up_templates()
+    # Allowlist file and dashboard catalog: first load now, then refreshed in the background
+    await content_allowlist.start()
+    await catalog_index.start()
+
+    if config.STARTUP_WARMUP:
+        # Blocking work runs in threads, concurrently with the Omni handshake
+        await omni_client.start()
+        await asyncio.gather(
+            asyncio.to_thread(warm_up_database),
+            asyncio.to_thread(warm_up_password_hashing),
+            omni_client.warm_up(),
+        )
+
+    logger.info(
+        "Warm-up complete",
+        extra={"duration_ms": round((asyncio.get_running_loop().time() - started) * 1000, 2)}
+    )
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Omni Embed Demo App",
     description="会員向け購買分析レポート閲覧アプリ",
     version="0.1.0",
-    debug=config.DEBUG
+    debug=config.DEBUG,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
-# Mount static files (if needed)
-# app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Middleware (pure ASGI; see app/middleware/stack.py for ordering)
+install_middleware(app)
+
+# Mount static files (fingerprinted URLs are cached as immutable)
+app.mount(
+    "/static",
+    FingerprintedStaticFiles(directory=STATIC_DIR, manifest=asset_manifest),
+    name="static"
+)
 
 # Include routers
 app.include_router(api.router)
 app.include_router(pages.router)
+if config.PROFILING_TOKEN:
+    # Rarely enabled; keep cProfile/pstats out of the default import graph
+    from app.routes import profiling
+    app.include_router(profiling.router)
 
 
 @app.get("/healthz")
 async def healthz():
-    """Health check endpoint."""
+    """Health check endpoint (kept for existing probes; same as /livez)."""
     return {"status": "ok"}
 
 
+@app.get("/livez")
+async def livez():
+    """Liveness: the process and its event loop respond. No dependency checks."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: warm-up finished, not shutting down and dependencies healthy.
+
+    Returns 503 so the load balancer sheds traffic from this worker while it
+    is starting, draining, blocked (event loop lag) or backed up (argon2 pool).
+    """
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not ready", "reason": readiness.reason}
+        )
+
+    result = await health_checker.check()
+    if not result["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not ready", "reason": "dependency check failed", "checks": result["checks"]}
+        )
+    return {"status": "ready", "checks": result["checks"]}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (bearer METRICS_TOKEN; not served when the token is unset)."""
+    if not config.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_scrape_authorized(request.headers.get("authorization")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return metrics_response()
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
-    # In production, use proper logging
-    if config.DEBUG:
-        print(f"Error: {exc}")
+    logger.exception("Unhandled error", exc_info=exc, extra={"method": request.method})
 
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Startup event."""
-    # Validate configuration (but allow startup even if Omni is not configured)
-    try:
-        config.validate()
-    except ValueError as e:
-        print(f"Warning: Configuration incomplete - {e}")
-        print("Application will start but Omni features may not work")
@@ -0,0 +1,46 @@
+"""Access log middleware."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import PathSet
+from app.observability.log import log_request, new_log_context
+
+# Requests that matched no route share one route value (bounded log / metric cardinality)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class AccessLogMiddleware:
+    """Start the per-request log context and emit one structured line per request."""
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        context = new_log_context(request_id=scope.get("state", {}).get("request_id"))
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            context["route"] = route
+            log_request(
+                scope["method"],
+                route,
+                status_code,
+                (time.perf_counter() - start) * 1000,
+            )
@@ -0,0 +1,88 @@
+"""
+Shared helpers for pure ASGI middleware.
+
+ASGI header names are lowercase bytes, so the helpers below scan the raw
+header list directly instead of building starlette Headers objects (which
+re-encode and lowercase on every lookup) on the hot path.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from starlette.responses import JSONResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config import config
+
+RawHeaders = list[tuple[bytes, bytes]]
+
+
+class PathSet:
+    """Exact-or-subpath path matcher used for middleware opt-out."""
+
+    def __init__(self, paths: Iterable[str]):
+        paths = tuple(paths)
+        self.exact = frozenset(paths)
+        self.prefixes = tuple(path.rstrip("/") + "/" for path in paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.exact or path.startswith(self.prefixes)
+
+
+def get_header(headers: RawHeaders, name: bytes) -> bytes | None:
+    """Return the first value of a header from raw ASGI headers."""
+    for key, value in headers:
+        if key == name:
+            return value
+    return None
+
+
+def set_header(headers: RawHeaders, name: bytes, value: bytes) -> None:
+    """Replace (or add) a header in raw ASGI headers."""
+    headers[:] = [(key, val) for key, val in headers if key != name]
+    headers.append((name, value))
+
+
+def add_vary(headers: RawHeaders, field: bytes) -> None:
+    """Append a field to the Vary header if not already present."""
+    for index, (key, value) in enumerate(headers):
+        if key == b"vary":
+            if field.lower() not in [
+                item.strip().lower() for item in value.split(b",")
+            ]:
+                headers[index] = (key, value + b", " + field)
+            return
+    headers.append((b"vary", field))
+
+
+def get_session_cookie(headers: RawHeaders) -> str | None:
+    """Extract the session cookie without parsing every cookie."""
+    return get_cookie(headers, config.SESSION_COOKIE_NAME)
+
+
+def get_cookie(headers: RawHeaders, name: str) -> str | None:
+    """Extract one cookie without parsing every cookie."""
+    cookie_header = get_header(headers, b"cookie")
+    if not cookie_header:
+        return None
+    prefix = f"{name}=".encode("latin-1")
+    for part in cookie_header.split(b";"):
+        part = part.strip()
+        if part.startswith(prefix):
+            return part[len(prefix) :].decode("latin-1")
+    return None
+
+
+async def send_json_error(
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    status_code: int,
+    detail: Any,
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Short-circuit a request with a FastAPI-style {"detail": ...} error."""
+    response = JSONResponse(
+        status_code=status_code, content={"detail": detail}, headers=headers
+    )
+    await response(scope, receive, send)
@@ -0,0 +1,193 @@
+"""Response compression middleware (brotli / gzip)."""
+
+import zlib
+from functools import lru_cache
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import add_vary, get_header, set_header
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    b"text/",
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"image/svg+xml",
+)
+EXCLUDED_CONTENT_TYPES = (b"text/event-stream",)
+
+
+@lru_cache(maxsize=256)
+def parse_accept_encoding(value: str) -> frozenset[str]:
+    """Return the encodings accepted by the client (q=0 entries excluded).
+
+    Browsers send a handful of distinct header values, so results are memoized.
+    """
+    accepted = set()
+    for token in value.split(","):
+        coding, *params = token.split(";")
+        coding = coding.strip().lower()
+        if coding and quality(params) > 0:
+            accepted.add(coding)
+    return frozenset(accepted)
+
+
+def quality(params: list[str]) -> float:
+    """Return the q value of an Accept-Encoding entry (1.0 if absent, 0.0 if malformed)."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+class GzipCompressor:
+    """Incremental gzip compressor."""
+
+    encoding = b"gzip"
+
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    """Incremental brotli compressor."""
+
+    encoding = b"br"
+
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress compressible responses above a size threshold.
+
+    Brotli is preferred when installed and accepted by the client, gzip
+    otherwise. Responses that already carry a Content-Encoding (e.g.
+    precompressed static assets) are passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def select_encoding(self, scope: Scope) -> bytes | None:
+        """Pick a content coding for the request (None if the client accepts neither)."""
+        accept_encoding = get_header(scope["headers"], b"accept-encoding")
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding.decode("latin-1"))
+        if brotli is not None and "br" in accepted:
+            return BrotliCompressor.encoding
+        if "gzip" in accepted:
+            return GzipCompressor.encoding
+        return None
+
+    def create_compressor(self, encoding: bytes):
+        """Create a compressor (deferred until a response is actually compressed)."""
+        if encoding == BrotliCompressor.encoding:
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(scope)
+        compressor = None
+        start_message: Message | None = None
+        # None = undecided, True = compressing, False = passing through
+        compressing: bool | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressing, compressor
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = message["headers"] = list(message.get("headers", ()))
+                content_type = get_header(headers, b"content-type") or b""
+                compressible = (
+                    content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+                    and not content_type.startswith(EXCLUDED_CONTENT_TYPES)
+                    and get_header(headers, b"content-encoding") is None
+                    and message["status"] not in (204, 206, 304)
+                )
+                if compressible:
+                    add_vary(headers, b"Accept-Encoding")
+                if not compressible or encoding is None:
+                    compressing = False
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or compressing is False:
+                if compressing is None and start_message is not None:
+                    compressing = False
+                    await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressing is None:
+                if not more_body and len(body) < self.minimum_size:
+                    compressing = False
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressing = True
+                compressor = self.create_compressor(encoding)
+                headers = start_message["headers"]
+                set_header(headers, b"content-encoding", encoding)
+                if more_body:
+                    headers[:] = [
+                        item for item in headers if item[0] != b"content-length"
+                    ]
+                    await send(start_message)
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    set_header(
+                        headers, b"content-length", str(len(body)).encode("latin-1")
+                    )
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,123 @@
+"""CSRF protection middleware."""
+
+from urllib.parse import unquote_plus
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.csrf import csrf_protection
+from app.config import config
+from app.middleware.base import (
+    PathSet,
+    get_cookie,
+    get_header,
+    get_session_cookie,
+    send_json_error,
+)
+
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Endpoints that establish a session have no session to protect yet
+CSRF_EXEMPT_PATHS = ("/api/login", "/api/register")
+FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+
+class FormTokenScanner:
+    """
+    Find one field of an application/x-www-form-urlencoded body as it streams in.
+
+    Only the current incomplete field is carried between chunks, and scanning
+    gives up after `limit` bytes, so a large body is never parsed (or held)
+    just to find the token. Put the token field first in HTML forms.
+    """
+
+    def __init__(self, field: str, limit: int):
+        self.prefix = field.encode("latin-1") + b"="
+        self.limit = limit
+        self.seen = 0
+        self.done = False
+        self._pending = b""
+
+    def feed(self, chunk: bytes, more_body: bool) -> str | None:
+        """Consume a body chunk; returns the decoded token once found."""
+        self.seen += len(chunk)
+        fields = (self._pending + chunk).split(b"&")
+        self._pending = fields.pop() if more_body else b""
+        for field in fields:
+            if field.startswith(self.prefix):
+                self.done = True
+                return unquote_plus(field[len(self.prefix) :].decode("latin-1"))
+        if not more_body or self.seen >= self.limit:
+            self.done = True
+        return None
+
+
+async def read_form_token(receive: Receive) -> tuple[str | None, Receive]:
+    """
+    Scan the start of a form body for the CSRF field.
+
+    Returns the token (or None) and a receive callable that replays the
+    messages read so far before continuing with the original stream.
+    """
+    scanner = FormTokenScanner(config.CSRF_FORM_FIELD, config.CSRF_FORM_SCAN_LIMIT)
+    buffered: list[Message] = []
+    token = None
+    while not scanner.done:
+        message = await receive()
+        buffered.append(message)
+        if message["type"] != "http.request":
+            break
+        token = scanner.feed(message.get("body", b""), message.get("more_body", False))
+
+    async def replay() -> Message:
+        if buffered:
+            return buffered.pop(0)
+        return await receive()
+
+    return token, replay
+
+
+class CSRFMiddleware:
+    """
+    Require a valid CSRF token on state-changing requests with a session.
+
+    The token is taken from the X-CSRF-Token header or, for urlencoded form
+    posts, from the `csrf_token` field found by streaming the start of the
+    body. Requests without a session cookie pass through; the route's own
+    authentication rejects them if required.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths + CSRF_EXEMPT_PATHS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in UNSAFE_METHODS
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        session_cookie = get_session_cookie(headers)
+        if session_cookie:
+            header_token = get_header(headers, b"x-csrf-token")
+            csrf_token = header_token.decode("latin-1") if header_token else None
+            if csrf_token is None and (
+                get_header(headers, b"content-type") or b""
+            ).startswith(FORM_CONTENT_TYPE):
+                csrf_token, receive = await read_form_token(receive)
+                if csrf_token:
+                    # For the verify_csrf_token dependency (request.state.csrf_token)
+                    scope.setdefault("state", {})["csrf_token"] = csrf_token
+            if not csrf_token:
+                await send_json_error(scope, receive, send, 403, "CSRF token missing")
+                return
+            csrf_cookie = get_cookie(headers, csrf_protection.cookie_name)
+            if not csrf_protection.verify_request_token(
+                csrf_token, session_cookie, csrf_cookie
+            ):
+                await send_json_error(scope, receive, send, 403, "Invalid CSRF token")
+                return
+
+        await self.app(scope, receive, send)
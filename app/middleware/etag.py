@@ -0,0 +1,164 @@
+"""Conditional GET middleware (weak ETags and 304 Not Modified)."""
+
+import hashlib
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import (
+    PathSet,
+    add_vary,
+    get_header,
+    get_session_cookie,
+    set_header,
+)
+
+CACHEABLE_CONTENT_TYPES = (b"text/html", b"application/json")
+# Headers a 304 response must repeat (RFC 9110 section 15.4.5)
+NOT_MODIFIED_HEADERS = {
+    b"etag",
+    b"cache-control",
+    b"vary",
+    b"expires",
+    b"date",
+    b"content-location",
+}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ETagMiddleware:
+    """
+    Add weak ETags to cacheable GET responses and answer If-None-Match with 304.
+
+    Pages and API responses depend on the session cookie, so the ETag mixes in
+    the cookie for authenticated requests and every response varies on Cookie.
+    Authenticated responses are marked private so shared caches never store them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: int = 1024 * 1024,
+        exempt_paths: tuple[str, ...] = ("/static",),
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.exempt_paths = PathSet(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = get_header(scope["headers"], b"if-none-match")
+        session_cookie = get_session_cookie(scope["headers"])
+
+        start_message: Message | None = None
+        chunks: list[bytes] = []
+        buffered = 0
+        # None = buffering, False = passing through
+        buffering: bool | None = None
+
+        async def flush_buffer() -> None:
+            await send(start_message)
+            if chunks:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"".join(chunks),
+                        "more_body": True,
+                    }
+                )
+                chunks.clear()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, buffered, buffering
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                message["headers"] = list(message.get("headers", ()))
+                if not self.is_cacheable(message):
+                    buffering = False
+                    await send(message)
+                return
+
+            if buffering is False or message["type"] != "http.response.body":
+                if buffering is None and start_message is not None:
+                    buffering = False
+                    await flush_buffer()
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            buffered += len(chunks[-1])
+            if message.get("more_body", False):
+                if buffered > self.max_body_size:
+                    # Too large to hash in memory; stream it unmodified
+                    buffering = False
+                    await flush_buffer()
+                return
+
+            body = b"".join(chunks)
+            etag = self.compute_etag(body, session_cookie)
+            headers = start_message["headers"]
+            set_header(headers, b"etag", etag.encode("latin-1"))
+            add_vary(headers, b"Cookie")
+            if get_header(headers, b"cache-control") is None:
+                headers.append(
+                    (
+                        b"cache-control",
+                        b"private, no-cache" if session_cookie else b"no-cache",
+                    )
+                )
+
+            if if_none_match and etag_matches(if_none_match.decode("latin-1"), etag):
+                start_message["status"] = 304
+                start_message["headers"] = [
+                    (name, value)
+                    for name, value in headers
+                    if name in NOT_MODIFIED_HEADERS
+                ]
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def is_cacheable(message: Message) -> bool:
+        """Whether a response may carry a validator."""
+        if message["status"] != 200:
+            return False
+        headers = message["headers"]
+        return (
+            (get_header(headers, b"content-type") or b"").startswith(
+                CACHEABLE_CONTENT_TYPES
+            )
+            and get_header(headers, b"etag") is None
+            and get_header(headers, b"set-cookie") is None
+            and b"no-store" not in (get_header(headers, b"cache-control") or b"")
+        )
+
+    @staticmethod
+    def compute_etag(body: bytes, session_cookie: str | None) -> str:
+        """Weak ETag over the body, scoped to the session for personalized responses."""
+        digest = hashlib.blake2b(body, digest_size=16)
+        if session_cookie:
+            digest.update(b"\x00" + session_cookie.encode())
+        return f'W/"{digest.hexdigest()}"'
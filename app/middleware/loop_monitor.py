@@ -0,0 +1,23 @@
+"""Request attribution for the blocking-call detector (debug only)."""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.observability.loop import track_request, untrack_request
+
+
+class RequestTaskMiddleware:
+    """Record which request each task is serving so loop stalls can be attributed."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = track_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            untrack_request(task)
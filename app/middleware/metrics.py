@@ -0,0 +1,41 @@
+"""Request metrics middleware (Prometheus)."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.access_log import UNMATCHED_ROUTE
+from app.middleware.base import PathSet
+from app.observability.metrics import observe_request
+
+
+class MetricsMiddleware:
+    """Count requests and record latency per route template (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            observe_request(
+                scope["method"], template, status_code, time.perf_counter() - start
+            )
@@ -0,0 +1,70 @@
+"""Per-request profiling middleware (installed only when PROFILING_TOKEN is set)."""
+
+import asyncio
+import cProfile
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import get_header, send_json_error
+from app.observability.profiling import (
+    acquire_profiler,
+    is_authorized,
+    release_profiler,
+    save_request_profile,
+)
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request with cProfile when asked via headers.
+
+    Requests carrying `X-Profile: 1` and a valid `X-Profile-Token` are run
+    under cProfile; the result is saved and its id returned in the
+    `X-Profile-Id` response header (download it from /debug/profile/requests/{id}).
+    cProfile sees the whole event loop thread, so requests running concurrently
+    on the same worker show up in the profile too.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or get_header(scope["headers"], b"x-profile") != b"1"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token = get_header(scope["headers"], b"x-profile-token")
+        if not is_authorized(token.decode("latin-1") if token else None):
+            await send_json_error(scope, receive, send, 403, "Forbidden")
+            return
+        if not acquire_profiler():
+            await send_json_error(
+                scope, receive, send, 409, "A profile is already running"
+            )
+            return
+
+        profile_id = scope.get("state", {}).get("request_id") or uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-profile-id", profile_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profile.disable()
+            # Writing (and pruning old profiles) is file I/O: keep it off the event loop
+            await asyncio.to_thread(save_request_profile, profile_id, profile)
+        finally:
+            release_profiler()
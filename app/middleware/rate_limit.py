@@ -0,0 +1,43 @@
+"""Rate limiting middleware."""
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.base import PathSet, send_json_error
+from app.routes.rate_limit import rate_limiter
+
+# (method, path) -> rate limit bucket
+RATE_LIMITED_ROUTES = {
+    ("POST", "/api/login"): "login",
+    ("POST", "/api/register"): "register",
+}
+
+
+class RateLimitMiddleware:
+    """Apply the in-memory rate limiter before the request body is read."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: dict[tuple[str, str], str] = RATE_LIMITED_ROUTES,
+        exempt_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.routes = routes
+        self.exempt_paths = PathSet(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self.routes.get((scope["method"], scope["path"]))
+        if endpoint is not None:
+            try:
+                rate_limiter.check_rate_limit(Request(scope), endpoint)
+            except HTTPException as exc:
+                await send_json_error(scope, receive, send, exc.status_code, exc.detail)
+                return
+
+        await self.app(scope, receive, send)
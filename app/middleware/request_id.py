@@ -0,0 +1,39 @@
+"""Request ID middleware."""
+
+import re
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import PathSet, get_header
+
+# Accept upstream IDs (load balancer / proxy) only if they are short and plain
+VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIDMiddleware:
+    """Attach a request ID to request.state and the X-Request-ID response header."""
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        header_value = get_header(scope["headers"], b"x-request-id")
+        if not header_value or not VALID_REQUEST_ID.match(header_value):
+            header_value = uuid.uuid4().hex.encode("latin-1")
+        scope.setdefault("state", {})["request_id"] = header_value.decode("latin-1")
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-request-id", header_value),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
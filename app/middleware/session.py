@@ -0,0 +1,43 @@
+"""Session cookie refresh after a secret rotation."""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.session import session_manager
+from app.middleware.base import PathSet
+
+
+class SessionRefreshMiddleware:
+    """
+    Send back session cookies re-signed with the active secret.
+
+    SessionManager.get_user_id() leaves the re-signed value in the request
+    state when a cookie was signed with a previous secret; it is set on the
+    response unless the route already set (or deleted) the session cookie.
+    Only installed while SESSION_SECRET_FALLBACKS is non-empty.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths)
+        self.cookie_prefix = f"{session_manager.cookie_name}=".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                refreshed = scope.get("state", {}).get("refreshed_session_cookie")
+                headers = message.get("headers", ())
+                if refreshed and not any(
+                    key == b"set-cookie" and value.startswith(self.cookie_prefix)
+                    for key, value in headers
+                ):
+                    message["headers"] = [
+                        *headers,
+                        (b"set-cookie", session_manager.cookie_header(refreshed)),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
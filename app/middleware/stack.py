@@ -0,0 +1,60 @@
+"""Middleware stack assembly."""
+
+from fastapi import FastAPI
+
+from app.config import config
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.etag import ETagMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.timing import TimingMiddleware
+from app.middleware.tracing import TracingMiddleware
+
+
+def install_middleware(app: FastAPI) -> None:
+    """
+    Register cross-cutting middleware on the app.
+
+    All layers are pure ASGI (no BaseHTTPMiddleware). Request order, outermost first:
+
+        RequestID -> [Profiling] -> [RequestTask] -> AccessLog -> Tracing -> Metrics -> Timing -> RateLimit -> CSRF -> [SessionRefresh] -> Compression -> ETag -> routes
+
+    Cheap rejections (rate limit, CSRF) run before the layers that buffer the
+    response body, and paths in MIDDLEWARE_EXEMPT_PATHS (health checks, static
+    assets) skip every request-scoped layer.
+    """
+    exempt_paths = config.MIDDLEWARE_EXEMPT_PATHS
+
+    # add_middleware() wraps the current stack, so the last one added runs first
+    app.add_middleware(ETagMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+    )
+    if config.SESSION_SECRET_FALLBACKS:
+        # Re-signs cookies made with a previous SESSION_SECRET; only needed during a rotation
+        from app.middleware.session import SessionRefreshMiddleware
+
+        app.add_middleware(SessionRefreshMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(CSRFMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(RateLimitMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(TimingMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(MetricsMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(TracingMiddleware, exempt_paths=exempt_paths)
+    app.add_middleware(AccessLogMiddleware, exempt_paths=exempt_paths)
+    if config.LOOP_BLOCKING_DETECTOR:
+        # Lets the detector attribute loop stalls to routes (debug only)
+        from app.middleware.loop_monitor import RequestTaskMiddleware
+
+        app.add_middleware(RequestTaskMiddleware)
+    if config.PROFILING_TOKEN:
+        # Opt-in per-request profiling; not installed (or imported) otherwise
+        from app.middleware.profiling import ProfilingMiddleware
+
+        app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(RequestIDMiddleware, exempt_paths=exempt_paths)
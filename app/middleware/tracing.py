@@ -0,0 +1,54 @@
+"""Request tracing middleware."""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.base import PathSet, get_header
+from app.observability.tracing import Tracer
+from app.observability.tracing import tracer as default_tracer
+
+
+class TracingMiddleware:
+    """Open a server span per request, continuing an incoming W3C traceparent."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        exempt_paths: tuple[str, ...] = (),
+        tracer: Tracer = default_tracer,
+    ):
+        self.app = app
+        self.exempt_paths = PathSet(exempt_paths)
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.tracer.enabled
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = get_header(scope["headers"], b"traceparent")
+        with self.tracer.span(
+            "http.request",
+            traceparent=traceparent.decode("latin-1") if traceparent else None,
+            **{"http.method": scope["method"]},
+        ) as span:
+            request_id = scope.get("state", {}).get("request_id")
+            if request_id:
+                span.set_attribute("request_id", request_id)
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Route template (not the raw path) keeps span names low-cardinality
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
@@ -1,6 +1,6 @@
 """Database models."""
 from datetime import datetime
-from sqlalchemy import String, DateTime, Text, Index
+from sqlalchemy import String, DateTime, Text, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db import Base
 
@@ -38,3 +38,27 @@ class AuditLog(Base):
     __table_args__ = (
         Index('ix_audit_logs_action_created_at', 'action', 'created_at'),
     )
+
+
+class Entitlement(Base):
+    """Omni content a customer may embed."""
+    __tablename__ = "entitlements"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Looked up by customer_id via the unique constraint's index
+    customer_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    # JSON object passed to Omni as user attributes when embedding this content
+    attributes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint('customer_id', 'content_path', name='uq_entitlements_customer_id_content_path'),
+    )
@@ -0,0 +1,202 @@
+"""
+Structured JSON logging.
+
+Records are serialized and written by a QueueListener thread, so request
+handlers only pay for putting a record on a queue. Per-request context
+(request id, user id, route, trace id) is captured from a contextvar when the
+record is created and emitted as top-level JSON fields.
+
+Never log secrets, cookies, session tokens or signed embed URLs (docs/security.md).
+"""
+
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from app.config import config
+from app.observability.tracing import tracer
+
+logger = logging.getLogger("app")
+access_logger = logging.getLogger("app.access")
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_STANDARD_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "context", "taskName"}
+
+_log_context: ContextVar[dict[str, Any] | None] = ContextVar(
+    "log_context", default=None
+)
+
+
+def new_log_context(**fields: Any) -> dict[str, Any]:
+    """
+    Start a fresh per-request context.
+
+    The returned dict is shared by everything running in the request (including
+    threadpool dependencies), so later `bind_log_context` calls are visible to
+    the access log emitted at the end of the request.
+    """
+    context = dict(fields)
+    _log_context.set(context)
+    return context
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Add fields (e.g. user_id) to the current request's log context."""
+    context = _log_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the request context and the current trace id onto the record, in the thread that logs it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.context = dict(context) if context else {}
+        span = tracer.current_span()
+        if span is not None:
+            record.context["trace_id"] = span.trace_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO-and-below records from high-volume loggers."""
+
+    def __init__(self, rate: float, loggers: tuple[str, ...]):
+        super().__init__()
+        self.rate = rate
+        self.loggers = loggers
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (
+            self.rate >= 1.0
+            or record.levelno > logging.INFO
+            or record.name not in self.loggers
+        ):
+            return True
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "context", None) or {})
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class _ContextQueueHandler(QueueHandler):
+    """QueueHandler that keeps extras and context as record attributes."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and the traceback now (they may not be safe to touch
+        # from another thread) but leave JSON formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+_configured_loggers: list[logging.Logger] = []
+
+
+def configure_logging(stream=None) -> None:
+    """
+    Route the app's logs through a queue to a JSON stream handler.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    Args:
+        stream: Output stream (default stdout)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter())
+
+    handler = _ContextQueueHandler(queue.SimpleQueue())
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(config.LOG_SAMPLE_RATE, ("app.access",)))
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=False)
+    _listener.start()
+
+    levels = {"app": config.LOG_LEVEL, "uvicorn.error": config.LOG_LEVEL}
+    if config.LOG_SQL:
+        # Replaces SQLAlchemy's echo=True, which writes to stdout synchronously
+        levels["sqlalchemy.engine"] = logging.INFO
+
+    for name, level in levels.items():
+        named_logger = logging.getLogger(name)
+        named_logger.handlers = [handler]
+        named_logger.setLevel(level)
+        named_logger.propagate = False
+        _configured_loggers.append(named_logger)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    for named_logger in _configured_loggers:
+        named_logger.handlers = []
+        named_logger.propagate = True
+    _configured_loggers.clear()
+    _listener.stop()
+    _listener = None
+
+
+def log_request(method: str, route: str, status: int, duration_ms: float) -> None:
+    """Emit the access log line (slow requests are always logged as warnings)."""
+    extra = {
+        "method": method,
+        "route": route,
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+    }
+    if duration_ms >= config.LOG_SLOW_REQUEST_MS:
+        access_logger.warning("slow request", extra=extra)
+    else:
+        access_logger.info("request", extra=extra)
+
+
+def log_slow_query(statement: str, duration_ms: float) -> None:
+    """Log a query over LOG_SLOW_QUERY_MS (timed by the SQL listener in metrics.py)."""
+    if duration_ms >= config.LOG_SLOW_QUERY_MS:
+        # Statement only: bound parameters may contain emails or password hashes
+        slow_query_logger.warning(
+            "slow query",
+            extra={"statement": statement[:500], "duration_ms": round(duration_ms, 2)},
+        )
@@ -0,0 +1,179 @@
+"""
+Event loop lag monitoring and blocking-call detection.
+
+LoopLagMonitor runs always: a periodic sleeper measures how late the loop
+wakes it and feeds a histogram. BlockingCallDetector is a debug tool: a
+watchdog thread notices when the loop stops heart-beating for longer than a
+threshold and logs the loop thread's stack at that moment, attributed to the
+request whose task was running.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Any
+
+from app.observability.log import logger
+from app.observability.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+
+UNKNOWN_ROUTE = "<unknown>"
+
+
+class LoopLagMonitor:
+    """
+    Measure how late the event loop wakes up a periodic sleeper.
+
+    A sleeper asks to wake after `interval` seconds; anything beyond that is
+    time the loop spent running other callbacks (i.e. blocked).
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.lag = 0.0  # seconds, most recent sample
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling on the running loop (called from the app lifespan)."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name="loop-lag-monitor"
+            )
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - scheduled - self.interval))
+
+    def record(self, lag: float) -> None:
+        """Store one lag sample."""
+        self.lag = lag
+        EVENT_LOOP_LAG.observe(lag)
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+# Request scope of each task currently serving a request (for attribution)
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def track_request(scope: dict) -> asyncio.Task | None:
+    """Associate the current task with a request scope (see untrack_request)."""
+    task = asyncio.current_task()
+    if task is not None:
+        _task_scopes[task] = scope
+    return task
+
+
+def untrack_request(task: asyncio.Task | None) -> None:
+    if task is not None:
+        _task_scopes.pop(task, None)
+
+
+class BlockingCallDetector:
+    """
+    Report callbacks that hold the event loop longer than `threshold` seconds.
+
+    The loop re-arms a heartbeat every threshold/4 seconds. A watchdog thread
+    checks the heartbeat; when it is stale, the loop is stuck in some callback
+    right now, so the loop thread's current stack *is* the blocking code. One
+    report is logged per stall.
+    """
+
+    def __init__(self, threshold: float = 0.1):
+        self.threshold = threshold
+        self.reports: list[dict[str, Any]] = []  # most recent last (bounded)
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start heart-beating on the running loop and the watchdog thread."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-blocking-detector", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watchdog (call from the loop thread)."""
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _beat(self) -> None:
+        self._heartbeat = time.monotonic()
+        self._handle = self._loop.call_later(self.threshold / 4, self._beat)
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.threshold / 4):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat
+            if blocked_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self.report(blocked_for)
+
+    def report(self, blocked_for: float) -> None:
+        """Capture the loop thread's stack and the request being served."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+
+        route, method, path = UNKNOWN_ROUTE, None, None
+        task = asyncio.current_task(self._loop)
+        scope = _task_scopes.get(task) if task is not None else None
+        if scope is not None:
+            method, path = scope.get("method"), scope.get("path")
+            # The route template is only known once routing has happened
+            route = getattr(scope.get("route"), "path", None) or UNKNOWN_ROUTE
+
+        report = {
+            # Time blocked when detected; the stall may continue afterwards
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "route": route,
+            "method": method,
+            "path": path,
+            "stack": stack,
+        }
+        self.reports = [*self.reports[-49:], report]
+        EVENT_LOOP_BLOCKED.labels(route).inc()
+        logger.warning("Event loop blocked", extra=report)
+
+
+blocking_call_detector = BlockingCallDetector()
@@ -0,0 +1,207 @@
+"""
+Prometheus metrics.
+
+When PROMETHEUS_MULTIPROC_DIR is set (it must be set before this module is
+imported, e.g. by the process manager), prometheus_client stores values in
+per-process mmap files and /metrics aggregates every uvicorn worker.
+Otherwise metrics live in the default in-process registry.
+"""
+
+import hmac
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+
+from app.config import config
+from app.observability.log import log_slow_query
+
+# Latency buckets tuned for a small web app (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+OMNI_REQUESTS = Counter(
+    "omni_requests_total",
+    "Omni API calls by operation and outcome",
+    ["operation", "outcome"],
+)
+OMNI_REQUEST_DURATION = Histogram(
+    "omni_request_duration_seconds",
+    "Omni API call latency",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "argon2 hash / verify time",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed by statement type",
+    ["statement"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["statement"],
+    buckets=DB_BUCKETS,
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ["endpoint"],
+)
+LOGIN_ATTEMPTS = Counter(
+    "login_attempts_total",
+    "Login attempts by the pipeline stage that decided them (success, syntax, locked, account_locked, ip_locked, coalesced, unknown, password)",
+    ["stage"],
+)
+AUDIT_WRITE_DURATION = Histogram(
+    "audit_write_duration_seconds",
+    "Audit log insert + commit time (audit writes are synchronous; there is no queue)",
+    ["action"],
+    buckets=DB_BUCKETS,
+)
+EMBED_URL_CACHE = Counter(
+    "embed_url_cache_total",
+    "Embed URL requests by how they were served (hit, joined in-flight prefetch, miss)",
+    ["result"],
+)
+EMBED_PREFETCH = Counter(
+    "embed_prefetch_total",
+    "Speculative embed URL generations by outcome",
+    ["outcome"],
+)
+OMNI_QUOTA = Counter(
+    "omni_quota_total",
+    "Outbound Omni quota decisions by priority (granted, waited, rejected; throttled = 429 from Omni)",
+    ["priority", "result"],
+)
+OMNI_SCHEDULER_JOBS = Counter(
+    "omni_scheduler_jobs_total",
+    "Queued Omni calls by priority and outcome (completed, failed, abandoned, expired, cancelled)",
+    ["priority", "outcome"],
+)
+OMNI_SCHEDULER_WAIT = Histogram(
+    "omni_scheduler_wait_seconds",
+    "Time an Omni call waited in the priority queue",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+CLIENT_DISCONNECTS = Counter(
+    "client_disconnects_total",
+    "Requests whose work was cancelled because the client disconnected",
+    ["operation"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the event loop running it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total",
+    "Callbacks that held the event loop longer than the blocking threshold (debug detector)",
+    ["route"],
+)
+
+# Label children are cached so the hot path skips prometheus_client's label lookup
+_request_children: dict[tuple[str, str, int], tuple] = {}
+
+
+def observe_request(method: str, route: str, status: int, duration: float) -> None:
+    """Record one HTTP request."""
+    key = (method, route, status)
+    children = _request_children.get(key)
+    if children is None:
+        children = _request_children[key] = (
+            HTTP_REQUESTS.labels(method, route, str(status)),
+            HTTP_REQUEST_DURATION.labels(method, route),
+        )
+    children[0].inc()
+    children[1].observe(duration)
+
+
+def observe_omni_call(operation: str, outcome: str, duration: float) -> None:
+    """Record one Omni API call."""
+    OMNI_REQUESTS.labels(operation, outcome).inc()
+    OMNI_REQUEST_DURATION.labels(operation).observe(duration)
+
+
+def _statement_type(statement: str) -> str:
+    """First SQL keyword (SELECT / INSERT / ...), bounded to known values."""
+    keyword = statement.lstrip()[:6].upper()
+    if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return keyword
+    return "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    statement_type = _statement_type(statement)
+    DB_QUERIES.labels(statement_type).inc()
+    DB_QUERY_DURATION.labels(statement_type).observe(duration)
+    log_slow_query(statement, duration * 1000)
+
+
+def multiprocess_dir() -> str | None:
+    """Directory used for multiprocess metrics (None in single-process mode)."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def is_scrape_authorized(authorization: str | None) -> bool:
+    """Check a scrape's Authorization header against METRICS_TOKEN (constant-time)."""
+    if not config.METRICS_TOKEN or not authorization:
+        return False
+    return hmac.compare_digest(
+        authorization.encode(), f"Bearer {config.METRICS_TOKEN}".encode()
+    )
+
+
+def metrics_response() -> Response:
+    """Render all metrics in the Prometheus text format."""
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead(pid: int | None = None) -> None:
+    """Drop a finished worker's live gauges (multiprocess mode only)."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid or os.getpid())
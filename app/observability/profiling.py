@@ -0,0 +1,164 @@
+"""
+On-demand CPU profiling of a live worker.
+
+Two profilers are available:
+
+- SamplingProfiler: a background thread snapshots every thread's stack at a
+  fixed interval and aggregates them as collapsed stacks
+  ("frame;frame;frame count"), the input format of flamegraph.pl / speedscope.
+- cProfile: deterministic profiling of the event loop thread, exported as
+  pstats (marshal) data or a text summary.
+
+Nothing here runs unless an authorized caller asks for a profile; when
+PROFILING_TOKEN is unset the routes and middleware are not even installed.
+"""
+
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.config import config
+
+VALID_PROFILE_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Only one profiler may run per process (cProfile cannot nest)
+_profile_lock = threading.Lock()
+
+
+def is_authorized(token: str | None) -> bool:
+    """Check a caller-supplied profiling token (constant-time)."""
+    if not config.PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), config.PROFILING_TOKEN.encode())
+
+
+def acquire_profiler() -> bool:
+    """Reserve the process-wide profiler slot (False if one is already running)."""
+    return _profile_lock.acquire(blocking=False)
+
+
+def release_profiler() -> None:
+    """Release the slot reserved by acquire_profiler()."""
+    _profile_lock.release()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """Periodically sample all thread stacks and count identical stacks."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Samples as collapsed stacks, most frequent first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def pstats_bytes(profile: cProfile.Profile) -> bytes:
+    """Serialize a finished cProfile run in the format `pstats.Stats(path)` reads."""
+    profile.create_stats()
+    return marshal.dumps(profile.stats)
+
+
+def pstats_text(source: cProfile.Profile | str, limit: int = 50) -> str:
+    """Human-readable summary (of a profile or a saved .pstats file) by cumulative time."""
+    output = io.StringIO()
+    stats = pstats.Stats(source, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
+
+
+def save_request_profile(profile_id: str, profile: cProfile.Profile) -> None:
+    """Store a per-request profile under PROFILE_DIR, keeping the newest PROFILE_MAX_FILES."""
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    with open(request_profile_path(profile_id), "wb") as f:
+        f.write(pstats_bytes(profile))
+    prune_request_profiles(config.PROFILE_MAX_FILES)
+
+
+def prune_request_profiles(keep: int) -> int:
+    """
+    Delete all but the `keep` most recently written profiles in PROFILE_DIR.
+
+    Returns:
+        Number of files deleted
+    """
+    with os.scandir(config.PROFILE_DIR) as entries:
+        profiles = [
+            entry
+            for entry in entries
+            if entry.is_file() and entry.name.endswith(".pstats")
+        ]
+    profiles.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    deleted = 0
+    for entry in profiles[keep:]:
+        try:
+            os.unlink(entry.path)
+            deleted += 1
+        except FileNotFoundError:
+            # Another worker pruned it first
+            continue
+    return deleted
+
+
+def request_profile_path(profile_id: str) -> str:
+    """
+    Path of a stored per-request profile.
+
+    Raises:
+        ValueError: If the id contains anything but [A-Za-z0-9._-]
+    """
+    if not VALID_PROFILE_ID.match(profile_id) or profile_id.startswith("."):
+        raise ValueError("Invalid profile id")
+    return os.path.join(config.PROFILE_DIR, f"{profile_id}.pstats")
+
+
+def capture_timestamp() -> str:
+    """Compact UTC timestamp for download filenames."""
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
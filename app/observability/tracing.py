@@ -0,0 +1,275 @@
+"""
+Lightweight request tracing (OpenTelemetry-style spans).
+
+Spans nest through a contextvar, so any code running inside a request can open
+a child span with `tracer.span("name")`. Trace context follows the W3C
+`traceparent` header: it is continued from incoming requests and injected into
+outbound Omni calls. Finished spans of sampled traces are handed to an
+exporter (JSON lines file or in-memory collector).
+"""
+
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.config import config
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+INVALID_TRACE_ID = "0" * 32
+INVALID_SPAN_ID = "0" * 16
+_STOP = object()  # FileExporter writer thread sentinel
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    sampled: bool
+    start_time: float = field(default_factory=time.time)
+    duration_ms: float | None = None
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    _start_counter: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute (never pass secrets, cookies or signed URLs)."""
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        """Mark the span as failed."""
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        """Stop the span's clock."""
+        self.duration_ms = (time.perf_counter() - self._start_counter) * 1000
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable representation for exporters."""
+        data = asdict(self)
+        data.pop("_start_counter")
+        data.pop("sampled")
+        return data
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """
+    Parse a W3C traceparent header.
+
+    Returns:
+        (trace_id, parent_span_id, sampled), or None if missing or malformed
+    """
+    if not value:
+        return None
+    match = TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == INVALID_TRACE_ID or span_id == INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+class InMemoryExporter:
+    """Collect finished spans in a list (for tests)."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+    def names(self) -> list[str]:
+        return [span.name for span in self.spans]
+
+
+class FileExporter:
+    """
+    Append finished spans to a file as JSON lines.
+
+    export() only enqueues the span. A writer thread serializes whatever has
+    queued up and appends it in one write, so requests never touch the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dropped = 0  # spans lost to write errors
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+        # Started lazily: threads do not survive the fork into uvicorn workers
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-file-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            spans = [span for span in batch if span is not _STOP]
+            if spans:
+                self._write(spans)
+            if len(spans) < len(batch):
+                return
+
+    def _write(self, spans: list[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n"
+            for span in spans
+        )
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            self.dropped += len(spans)
+
+    def shutdown(self) -> None:
+        """Write out queued spans and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout=5)
+
+
+def create_exporter(name: str, path: str):
+    """Build the exporter selected by TRACE_EXPORTER (None disables export)."""
+    if name == "file":
+        return FileExporter(path)
+    if name == "memory":
+        return InMemoryExporter()
+    return None
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Create spans and hand sampled ones to an exporter."""
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def shutdown(self) -> None:
+        """Flush the exporter (at application shutdown)."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    def current_span(self) -> Span | None:
+        """The innermost active span, if any."""
+        return _current_span.get()
+
+    def current_traceparent(self) -> str | None:
+        """traceparent header for outbound calls from the current span."""
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def should_sample(self) -> bool:
+        """Head sampling decision for a new trace."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @contextmanager
+    def span(
+        self, name: str, traceparent: str | None = None, **attributes: Any
+    ) -> Iterator[Span | None]:
+        """
+        Open a span as a child of the current span (or of `traceparent`).
+
+        Args:
+            name: Span name (e.g. "omni.generate_embed_url")
+            traceparent: Incoming W3C header; only used when there is no current span
+            **attributes: Initial span attributes
+
+        Yields:
+            The span, or None when tracing is disabled
+        """
+        if self.exporter is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id, sampled = (
+                parent.trace_id,
+                parent.span_id,
+                parent.sampled,
+            )
+        else:
+            context = parse_traceparent(traceparent)
+            if context is not None:
+                trace_id, parent_id, sampled = context
+            else:
+                trace_id, parent_id, sampled = (
+                    f"{random.getrandbits(128):032x}",
+                    None,
+                    self.should_sample(),
+                )
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent_id,
+            sampled=sampled,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            if span.sampled:
+                self.exporter.export(span)
+
+
+tracer = Tracer(
+    exporter=create_exporter(config.TRACE_EXPORTER, config.TRACE_FILE),
+    sample_rate=config.TRACE_SAMPLE_RATE,
+)
@@ -0,0 +1,241 @@
+"""
+Content path allowlist for Omni embeds.
+
+Entries come in three forms, each compiled into its own structure so a
+lookup costs the same with ten entries or thousands:
+
+- exact:  /dashboards/abc123        -> frozenset membership
+- prefix: /dashboards/shared/**     -> segment trie (the path itself and everything below it)
+- glob:   /dashboards/sales-*       -> one combined regex; * and ? never cross a "/"
+
+The default list is OMNI_CONTENT_PATH_ALLOWLIST. OMNI_ALLOWLIST_FILE may add
+default and per-customer entries (JSON, see docs/commands.md) and is re-read
+when its mtime changes, so dashboards can be added without a restart. In the
+app a background task checks it every OMNI_ALLOWLIST_RELOAD_INTERVAL seconds
+in a thread, so requests never touch the file; without start() (scripts,
+tests) the check runs inline, at most once per interval.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from collections.abc import Iterable
+
+from app.config import config
+from app.observability.log import logger
+
+PREFIX_SUFFIX = "/**"
+GLOB_CHARS = re.compile(r"[*?\[]")
+_TERMINAL = None  # trie key marking the end of a prefix entry
+
+
+def is_safe_path(path: str) -> bool:
+    """Absolute path without empty, "." or ".." segments, query or fragment."""
+    if not path.startswith("/") or "?" in path or "#" in path or "\\" in path:
+        return False
+    segments = path[1:].split("/")
+    return all(segment not in ("", ".", "..") for segment in segments)
+
+
+def _glob_regex(pattern: str) -> str:
+    """Translate a glob to a regex fragment where wildcards stay within one path segment."""
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"(?:(?!/)[{body}])")
+                index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+class CompiledAllowlist:
+    """Exact set + prefix trie + combined glob regex built from a list of entries."""
+
+    def __init__(self, entries: Iterable[str]):
+        exact = set()
+        self.trie: dict = {}
+        globs = []
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            if entry.endswith(PREFIX_SUFFIX):
+                node = self.trie
+                for segment in filter(None, entry[: -len(PREFIX_SUFFIX)].split("/")):
+                    node = node.setdefault(segment, {})
+                node[_TERMINAL] = True
+            elif GLOB_CHARS.search(entry):
+                globs.append(_glob_regex(entry))
+            else:
+                exact.add(entry)
+        self.exact = frozenset(exact)
+        self.glob = (
+            re.compile("|".join(f"(?:{glob})" for glob in globs)) if globs else None
+        )
+        self.size = len(self.exact) + len(globs) + self._count_prefixes(self.trie)
+
+    @classmethod
+    def _count_prefixes(cls, node: dict) -> int:
+        return sum(
+            1 if key is _TERMINAL else cls._count_prefixes(child)
+            for key, child in node.items()
+        )
+
+    def _matches_prefix(self, path: str) -> bool:
+        node = self.trie
+        for segment in path[1:].split("/"):
+            if _TERMINAL in node:
+                return True
+            node = node.get(segment)
+            if node is None:
+                return False
+        return _TERMINAL in node
+
+    def __contains__(self, path: str) -> bool:
+        if path in self.exact:
+            return True
+        if self.trie and self._matches_prefix(path):
+            return True
+        return self.glob is not None and self.glob.fullmatch(path) is not None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class ContentAllowlist:
+    """Default and per-customer allowlists, reloaded when the allowlist file changes."""
+
+    def __init__(self, path: str | None = None, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._env_entries: list[str] | None = None
+        self._file_default: list[str] = []
+        self._file_customers: dict[str, CompiledAllowlist] = {}
+        self._default = CompiledAllowlist(())
+        self._version = 0
+        self._mtime: float | None = None
+        self._checked_at = float("-inf")
+        self._file_generation = 0
+        self._compiled_generation = 0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the compiled allowlists are replaced (for caches built on top)."""
+        self._refresh()
+        return self._version
+
+    def allows(self, content_path: str, customer_id: str | None = None) -> bool:
+        """Whether a content path may be embedded (for a customer, if given)."""
+        self._refresh()
+        if not is_safe_path(content_path):
+            return False
+        if content_path in self._default:
+            return True
+        customer = (
+            self._file_customers.get(customer_id) if customer_id is not None else None
+        )
+        return customer is not None and content_path in customer
+
+    async def start(self) -> None:
+        """Load the file, then watch it from a background task (called from the app lifespan)."""
+        if not self.path or self._task is not None:
+            return
+        self._apply(await asyncio.to_thread(self._load_file))
+        self._task = asyncio.create_task(self._watch(), name="allowlist-reload")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            self._apply(await asyncio.to_thread(self._load_file))
+
+    def _refresh(self) -> None:
+        if self._task is None:
+            self._reload_file_if_changed()
+        # Re-read from config when the list object is replaced (env reload, tests)
+        if (
+            self._file_generation != self._compiled_generation
+            or config.OMNI_CONTENT_PATH_ALLOWLIST is not self._env_entries
+        ):
+            self._env_entries = config.OMNI_CONTENT_PATH_ALLOWLIST
+            self._compiled_generation = self._file_generation
+            self._default = CompiledAllowlist([*self._env_entries, *self._file_default])
+            self._version += 1
+
+    def _reload_file_if_changed(self) -> None:
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        self._apply(self._load_file())
+
+    def _load_file(
+        self,
+    ) -> tuple[float, list[str], dict[str, CompiledAllowlist]] | None:
+        """Read and compile the file if its mtime changed (None if unchanged or broken; blocking)."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return None
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            default = list(data.get("default", []))
+            CompiledAllowlist(
+                default
+            )  # reject bad patterns before swapping anything in
+            customers = {
+                str(customer_id): CompiledAllowlist(entries)
+                for customer_id, entries in data.get("customers", {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError, re.error) as e:
+            # Keep serving the last good allowlist
+            logger.warning("Content allowlist reload failed: %s", type(e).__name__)
+            return None
+        return mtime, default, customers
+
+    def _apply(
+        self, loaded: tuple[float, list[str], dict[str, CompiledAllowlist]] | None
+    ) -> None:
+        if loaded is None:
+            return
+        self._mtime, self._file_default, self._file_customers = loaded
+        self._file_generation += 1
+        logger.info(
+            "Content allowlist loaded: %d default entries, %d customers",
+            len(self._file_default),
+            len(self._file_customers),
+        )
+
+
+content_allowlist = ContentAllowlist(
+    path=config.OMNI_ALLOWLIST_FILE or None,
+    reload_interval=config.OMNI_ALLOWLIST_RELOAD_INTERVAL,
+)
@@ -0,0 +1,178 @@
+"""
+Dashboard catalog (titles and thumbnails for embeddable content).
+
+Metadata lives in an in-memory index that a background task refreshes from
+a pluggable source every CATALOG_REFRESH_INTERVAL seconds; page views only
+read the index. Each customer's visible list is computed once per index /
+allowlist / entitlements version and cached, so rendering /me does not
+scan the whole catalog.
+
+Sources implement `async fetch() -> list[CatalogEntry]` and report the
+failures they expect (unreachable, malformed data) as CatalogSourceError, so
+a refresh keeps the last index on those and lets anything else surface.
+FileCatalogSource
+reads a JSON list and doubles as the stand-in for tests and local runs; an
+Omni-backed source can be added to create_source() without touching callers.
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from app.config import config
+from app.observability.log import logger
+from app.omni.allowlist import content_allowlist
+from app.omni.entitlements import CustomerEntitlements
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Display metadata for one piece of Omni content."""
+
+    content_path: str
+    title: str
+    thumbnail_url: str = ""
+    description: str = ""
+
+
+class CatalogSourceError(Exception):
+    """The source could not provide a catalog right now (the last index stays in use)."""
+
+
+class CatalogSource(Protocol):
+    async def fetch(self) -> list[CatalogEntry]: ...
+
+
+class FileCatalogSource:
+    """Catalog read from a JSON file: [{"content_path", "title", "thumbnail_url"?, "description"?}, ...]."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self) -> list[CatalogEntry]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                items = json.load(f)
+            return [
+                CatalogEntry(
+                    content_path=item["content_path"],
+                    title=item.get("title") or item["content_path"],
+                    thumbnail_url=item.get("thumbnail_url", ""),
+                    description=item.get("description", ""),
+                )
+                for item in items
+            ]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise CatalogSourceError(type(e).__name__) from e
+
+    async def fetch(self) -> list[CatalogEntry]:
+        return await asyncio.to_thread(self._read)
+
+
+def create_source(name: str, path: str) -> CatalogSource | None:
+    """Build the source selected by CATALOG_SOURCE (None disables the catalog)."""
+    if name == "file":
+        return FileCatalogSource(path)
+    return None
+
+
+class CatalogIndex:
+    """In-memory catalog refreshed in the background, with per-customer views."""
+
+    def __init__(
+        self,
+        source: CatalogSource | None = None,
+        refresh_interval: float = 300.0,
+        max_customers: int = 10000,
+    ):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.max_customers = max_customers
+        self.entries: dict[str, CatalogEntry] = {}
+        self.version = 0
+        self._views: OrderedDict[str, tuple[tuple, tuple[CatalogEntry, ...]]] = (
+            OrderedDict()
+        )
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> bool:
+        """Reload from the source; on failure the previous index is kept."""
+        if self.source is None:
+            return False
+        try:
+            entries = await self.source.fetch()
+        except CatalogSourceError as e:
+            logger.warning("Catalog refresh failed: %s", e)
+            return False
+        self.entries = {entry.content_path: entry for entry in entries}
+        self.version += 1
+        self._views.clear()
+        return True
+
+    async def start(self) -> None:
+        """Load the index once, then keep refreshing it in the background."""
+        if self.source is None or self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name="catalog-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    def for_customer(
+        self, customer_id: str, entitlements: CustomerEntitlements
+    ) -> tuple[CatalogEntry, ...]:
+        """
+        Dashboards a customer may open: its entitled content, or for a
+        customer without entitlements, the catalog entries allowed by the
+        configured allowlists.
+        """
+        stamp = (self.version, content_allowlist.version, entitlements)
+        cached = self._views.get(customer_id)
+        if cached is not None and cached[0] == stamp:
+            self._views.move_to_end(customer_id)
+            return cached[1]
+
+        view = []
+        for dashboard in entitlements.dashboards:
+            entry = self.entries.get(dashboard.content_path)
+            view.append(
+                CatalogEntry(
+                    content_path=dashboard.content_path,
+                    title=dashboard.title,
+                    thumbnail_url=entry.thumbnail_url if entry else "",
+                    description=entry.description if entry else "",
+                )
+            )
+        if not entitlements.dashboards:
+            view.extend(
+                entry
+                for path, entry in self.entries.items()
+                if content_allowlist.allows(path, customer_id)
+            )
+        result = tuple(view)
+
+        self._views[customer_id] = (stamp, result)
+        self._views.move_to_end(customer_id)
+        while len(self._views) > self.max_customers:
+            self._views.popitem(last=False)
+        return result
+
+
+catalog_index = CatalogIndex(
+    source=create_source(config.CATALOG_SOURCE, config.CATALOG_FILE),
+    refresh_interval=config.CATALOG_REFRESH_INTERVAL,
+)
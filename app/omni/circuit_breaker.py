@@ -0,0 +1,84 @@
+"""Circuit breaker for Omni API calls."""
+
+import time
+from collections.abc import Callable
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Omni while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls flow; `failure_threshold` consecutive failures open the circuit
+    open      -> calls fail fast until `reset_timeout` seconds have passed
+    half_open -> one trial call is let through; success closes, failure re-opens.
+                 A trial that ends without either (cancelled, unexpected error)
+                 must call release_trial() so the next call can be the trial.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state (an open circuit becomes half-open after the timeout)."""
+        if (
+            self._state == self.OPEN
+            and self.clock() - self.opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed (0 unless open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a call may be attempted now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """The half-open trial call ended without a verdict; allow another one."""
+        if self._state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """A call succeeded (closes a half-open circuit)."""
+        self.failures = 0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """A call failed in a way that indicates Omni is unhealthy."""
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = self.clock()
+            self._trial_in_flight = False
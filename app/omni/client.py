@@ -1,7 +1,21 @@
 """Omni API client."""
-import httpx
-from typing import Optional
+import asyncio
+import json
+import os
+import time
+
 from app.config import config
+from app.observability.log import logger
+from app.observability.metrics import observe_omni_call
+from app.observability.tracing import tracer
+from app.omni.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.omni.quota import (
+    INTERACTIVE,
+    QuotaExceededError,
+    omni_quota,
+    parse_retry_after,
+)
+from app.omni.scheduler import omni_scheduler
 
 
 class OmniClient:
@@ -10,22 +24,70 @@ class OmniClient:
     def __init__(self):
         self.base_url = config.OMNI_BASE_URL.rstrip("/")
         self.secret = config.OMNI_SECRET
+        # Shared keep-alive client, opened in the app lifespan (see start())
+        self.http_client = None
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.OMNI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.OMNI_CIRCUIT_RESET_TIMEOUT,
+        )
+
+    async def start(self) -> None:
+        """Open the shared connection pool (called from the app lifespan)."""
+        import httpx
+
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(
+                    max_connections=config.OMNI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.OMNI_HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=config.OMNI_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+
+    async def warm_up(self) -> bool:
+        """
+        Pre-establish a keep-alive connection (DNS + TCP + TLS) to Omni.
+
+        Any HTTP response counts as success; failures are logged and do not
+        block startup.
+
+        Returns:
+            True if a connection was established
+        """
+        import httpx
+
+        if self.http_client is None or not self.validate_config()[0]:
+            return False
+        try:
+            await self.http_client.head(self.base_url, timeout=config.OMNI_WARMUP_TIMEOUT)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning("Omni connection warm-up failed: %s", type(e).__name__)
+            return False
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
 
-    def validate_config(self) -> tuple[bool, Optional[str]]:
+    def validate_config(self) -> tuple[bool, str | None]:
         """Validate Omni configuration."""
         if not self.base_url:
             return False, "OMNI_BASE_URL is not configured"
         if not self.secret:
             return False, "OMNI_SECRET is not configured"
-        if not config.OMNI_CONTENT_PATH_ALLOWLIST:
-            return False, "OMNI_CONTENT_PATH_ALLOWLIST is not configured"
+        # No allowlist entries is valid: only customers with entitlements can embed
         return True, None
 
     async def generate_embed_url(
         self,
         content_path: str,
         external_id: str,
-        email: str
+        email: str,
+        user_attributes: dict | None = None,
+        priority: str = INTERACTIVE
     ) -> dict:
         """
         Generate embed URL using Standard SSO (manual generation).
@@ -36,12 +98,17 @@ class OmniClient:
             content_path: Path to Omni content (e.g., /dashboards/abc123)
             external_id: External user ID (customer_id)
             email: User email
+            user_attributes: Omni user attributes for this embed (e.g. from entitlements)
+            priority: Scheduling / quota class (see app/omni/scheduler.py and app/omni/quota.py)
 
         Returns:
             Dictionary with 'url' key containing the embed URL
 
         Raises:
             httpx.HTTPStatusError: If API call fails
+            CircuitOpenError: If recent calls failed and Omni is not being called
+            QuotaExceededError: If the outbound quota is used up or Omni answered 429
+            OmniOverloadedError: If the call waited too long in the priority queue
         """
         url = f"{self.base_url}/embed/sso/generate-url"
 
@@ -51,11 +118,80 @@ class OmniClient:
             "externalId": external_id,
             "email": email,
         }
+        if user_attributes:
+            payload["userAttributes"] = json.dumps(user_attributes)
+
+        return await omni_scheduler.run(priority, lambda: self._post_generate_url(url, payload, priority))
+
+    async def _post_generate_url(self, url: str, payload: dict, priority: str) -> dict:
+        """One generate-url call: circuit breaker, quota, HTTP (runs on a scheduler worker)."""
+        # Breaker first: an open circuit must not spend (or wait for) quota
+        trial = self.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+        if not self.circuit_breaker.allow_request():
+            observe_omni_call("generate_embed_url", "circuit_open", 0.0)
+            raise CircuitOpenError("Omni circuit breaker is open")
+        try:
+            try:
+                await omni_quota.acquire(priority)
+            except QuotaExceededError:
+                observe_omni_call("generate_embed_url", "quota_exceeded", 0.0)
+                raise
+            return await self._send_generate_url(url, payload)
+        finally:
+            if trial:
+                # No-op once a success or failure was recorded; otherwise (cancelled by the
+                # scheduler or a client disconnect, unexpected error) free the trial slot
+                self.circuit_breaker.release_trial()
+
+    async def _send_generate_url(self, url: str, payload: dict) -> dict:
+        # Deferred import: httpx (and its SSL setup) is only needed once Omni is used
+        import httpx
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+        start = time.perf_counter()
+        outcome = "error"
+        with tracer.span("omni.generate_embed_url", content_path=payload["contentPath"]) as span:
+            # Propagate W3C trace context so Omni-side latency can be correlated
+            traceparent = tracer.current_traceparent()
+            headers = {"traceparent": traceparent} if traceparent else None
+            try:
+                if self.http_client is not None:
+                    response = await self.http_client.post(url, json=payload, headers=headers, timeout=10.0)
+                else:
+                    # Outside the app lifespan (scripts, tests): one-off connection
+                    async with httpx.AsyncClient() as client:
+                        response = await client.post(url, json=payload, headers=headers, timeout=10.0)
+                outcome = str(response.status_code)
+                # 4xx means Omni is up but rejected the request; only 5xx trips the breaker
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(
+                        response.headers.get("Retry-After"), config.OMNI_QUOTA_DEFAULT_RETRY_AFTER
+                    )
+                    # Every worker backs off, not just this one
+                    await omni_quota.back_off(retry_after)
+                    raise QuotaExceededError(retry_after)
+                response.raise_for_status()
+                return response.json()
+            except httpx.TimeoutException:
+                outcome = "timeout"
+                self.circuit_breaker.record_failure()
+                raise
+            except httpx.TransportError:
+                outcome = "connection_error"
+                self.circuit_breaker.record_failure()
+                raise
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                if span is not None:
+                    span.set_attribute("omni.outcome", outcome)
+                observe_omni_call("generate_embed_url", outcome, time.perf_counter() - start)
 
 
 omni_client = OmniClient()
+# An httpx client (and its sockets) must not cross a fork; the child opens its own in start()
+os.register_at_fork(after_in_child=lambda: setattr(omni_client, "http_client", None))
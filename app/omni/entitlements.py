@@ -0,0 +1,132 @@
+"""
+Per-customer dashboard entitlements.
+
+Entitlements are read from the database once per customer and kept in a
+per-process cache, so the embed hot path does no DB round-trip in steady
+state. Changes made through the ORM invalidate the affected customers when
+the transaction commits; other workers pick them up within
+ENTITLEMENT_CACHE_TTL seconds. Bulk query updates bypass the ORM events, so
+call entitlement_resolver.invalidate() after those.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.models import Entitlement
+from app.observability.log import logger
+
+
+@dataclass(frozen=True)
+class Dashboard:
+    """One entitled piece of Omni content."""
+
+    content_path: str
+    title: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class CustomerEntitlements:
+    """Everything a customer is entitled to, indexed by content path."""
+
+    dashboards: tuple[Dashboard, ...] = ()
+    by_path: dict[str, Dashboard] = field(default_factory=dict)
+
+    def get(self, content_path: str) -> Dashboard | None:
+        return self.by_path.get(content_path)
+
+
+def _parse_attributes(raw: str | None) -> dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        attributes = json.loads(raw)
+    except ValueError:
+        logger.warning("Ignoring entitlement attributes that are not valid JSON")
+        return {}
+    return attributes if isinstance(attributes, dict) else {}
+
+
+class EntitlementResolver:
+    """TTL + LRU cache of CustomerEntitlements keyed by customer_id."""
+
+    def __init__(self, ttl: float, max_customers: int = 10000):
+        self.ttl = ttl
+        self.max_customers = max_customers
+        self._cache: OrderedDict[str, tuple[float, CustomerEntitlements]] = (
+            OrderedDict()
+        )
+
+    def get(self, db: Session, customer_id: str) -> CustomerEntitlements:
+        """Entitlements for a customer (from the cache, or one query on a miss)."""
+        now = time.monotonic()
+        cached = self._cache.get(customer_id)
+        if cached is not None and now - cached[0] < self.ttl:
+            self._cache.move_to_end(customer_id)
+            return cached[1]
+
+        rows = db.scalars(
+            select(Entitlement)
+            .where(Entitlement.customer_id == customer_id)
+            .order_by(Entitlement.title, Entitlement.content_path)
+        ).all()
+        dashboards = tuple(
+            Dashboard(row.content_path, row.title, _parse_attributes(row.attributes))
+            for row in rows
+        )
+        entitlements = CustomerEntitlements(
+            dashboards, {dashboard.content_path: dashboard for dashboard in dashboards}
+        )
+
+        self._cache[customer_id] = (now, entitlements)
+        self._cache.move_to_end(customer_id)
+        while len(self._cache) > self.max_customers:
+            self._cache.popitem(last=False)
+        return entitlements
+
+    def invalidate(self, customer_id: str | None = None) -> None:
+        """Drop one customer's cached entitlements, or all of them."""
+        if customer_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(customer_id, None)
+
+
+entitlement_resolver = EntitlementResolver(
+    ttl=config.ENTITLEMENT_CACHE_TTL,
+    max_customers=config.ENTITLEMENT_CACHE_MAX_CUSTOMERS,
+)
+
+_CHANGED_KEY = "entitlements_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changed_customers(session: Session, flush_context) -> None:
+    """Remember which customers' entitlements this transaction touched."""
+    changed = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Entitlement):
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED_KEY, set())
+            changed.add(obj.customer_id)
+            # A row moved to another customer also changes the previous one
+            changed.update(inspect(obj).attrs.customer_id.history.deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_customers(session: Session) -> None:
+    # Invalidate only after commit, so a concurrent miss cannot cache uncommitted state
+    for customer_id in session.info.pop(_CHANGED_KEY, ()):
+        entitlement_resolver.invalidate(customer_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_customers(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
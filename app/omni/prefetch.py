@@ -0,0 +1,173 @@
+"""
+Embed URL cache and speculative prefetch.
+
+When EMBED_PREFETCH is on, rendering /me starts background generation of
+embed URLs for the dashboards the user opened most recently, so the click
+that follows is served from memory instead of waiting on Omni.
+
+Embed URLs are signed and single-use, so a cached URL is handed out at most
+once and dropped after EMBED_URL_CACHE_TTL seconds. A click that arrives
+while its prefetch is still running waits for that call instead of issuing a
+second one. Prefetch only ever uses EMBED_PREFETCH_SHARE of the Omni
+connection pool and stops entirely while the circuit breaker is not closed;
+when the budget is used up, prefetches are skipped rather than queued. They
+also run at prefetch priority in the outbound quota (app/omni/quota.py), so
+they never take the tokens reserved for users waiting on an embed.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+
+from fastapi import HTTPException
+
+from app.config import config
+from app.observability.log import logger
+from app.observability.metrics import EMBED_PREFETCH, EMBED_URL_CACHE
+from app.omni.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.omni.client import omni_client
+from app.omni.quota import QuotaExceededError
+from app.omni.scheduler import OmniOverloadedError
+
+UrlFactory = Callable[[], Awaitable[str]]
+
+
+class EmbedURLCache:
+    """Single-use, short-lived embed URLs keyed by (user id, content path)."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._urls: OrderedDict[Hashable, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        """A fresh URL is cached or being generated for the key."""
+        if key in self._inflight:
+            return True
+        cached = self._urls.get(key)
+        return cached is not None and cached[0] > self.clock()
+
+    def take(self, key: Hashable) -> str | None:
+        """Remove and return a fresh URL (None if missing or expired)."""
+        cached = self._urls.pop(key, None)
+        if cached is None or cached[0] <= self.clock():
+            return None
+        return cached[1]
+
+    def put(self, key: Hashable, url: str) -> None:
+        self._urls[key] = (self.clock() + self.ttl, url)
+        self._urls.move_to_end(key)
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+
+    def fill(self, key: Hashable, factory: UrlFactory) -> asyncio.Task:
+        """Generate a URL in the background and cache it (failures leave nothing cached)."""
+
+        async def run() -> None:
+            # Deferred like app/omni/client.py; the factory imports it anyway
+            import httpx
+
+            # Waiters fall back to their own call; anything else is a bug and is logged in full
+            try:
+                self.put(key, await factory())
+            except (QuotaExceededError, OmniOverloadedError, CircuitOpenError) as e:
+                logger.debug(
+                    "Embed URL prefetch for %s skipped: %s", key, type(e).__name__
+                )
+            except (HTTPException, httpx.HTTPError) as e:
+                logger.warning(
+                    "Embed URL prefetch for %s failed: %s", key, type(e).__name__
+                )
+
+        def done(task: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(
+                    "Embed URL prefetch for %s crashed", key, exc_info=task.exception()
+                )
+
+        task = asyncio.create_task(run())
+        self._inflight[key] = task
+        task.add_done_callback(done)
+        return task
+
+    async def get_or_generate(self, key: Hashable, factory: UrlFactory) -> str:
+        """Use a cached or in-flight URL for the key, otherwise generate one now."""
+        url = self.take(key)
+        if url is not None:
+            EMBED_URL_CACHE.labels("hit").inc()
+            return url
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # wait() neither cancels the shared call when the click is cancelled nor raises its error
+            await asyncio.wait({task})
+            url = self.take(key)
+            if url is not None:
+                EMBED_URL_CACHE.labels("joined").inc()
+                return url
+
+        EMBED_URL_CACHE.labels("miss").inc()
+        return await factory()
+
+    def clear(self) -> None:
+        self._urls.clear()
+
+
+class EmbedPrefetcher:
+    """Start prefetches within a fixed share of Omni capacity."""
+
+    def __init__(self, cache: EmbedURLCache, max_in_flight: int):
+        self.cache = cache
+        self.max_in_flight = max(1, max_in_flight)
+        self.in_flight = 0
+
+    def schedule(self, key: Hashable, factory: UrlFactory) -> bool:
+        """Prefetch one URL unless cached, over budget or Omni is failing; True if started."""
+        if key in self.cache:
+            return False
+        if omni_client.circuit_breaker.state != CircuitBreaker.CLOSED:
+            EMBED_PREFETCH.labels("circuit_open").inc()
+            return False
+        if self.in_flight >= self.max_in_flight:
+            EMBED_PREFETCH.labels("budget_exceeded").inc()
+            return False
+
+        async def budgeted() -> str:
+            try:
+                url = await factory()
+            except QuotaExceededError:
+                # Expected when interactive calls need the quota; not worth a log line
+                EMBED_PREFETCH.labels("quota_exceeded").inc()
+                raise
+            except OmniOverloadedError:
+                EMBED_PREFETCH.labels("expired").inc()
+                raise
+            except Exception:
+                # Logged with the key by EmbedURLCache.fill
+                EMBED_PREFETCH.labels("failed").inc()
+                raise
+            finally:
+                self.in_flight -= 1
+            EMBED_PREFETCH.labels("completed").inc()
+            return url
+
+        # Counted now, not when the task first runs, so a burst of schedule() calls respects the budget
+        self.in_flight += 1
+        self.cache.fill(key, budgeted)
+        return True
+
+
+embed_url_cache = EmbedURLCache(ttl=config.EMBED_URL_CACHE_TTL)
+embed_prefetcher = EmbedPrefetcher(
+    embed_url_cache,
+    max_in_flight=int(config.OMNI_HTTP_MAX_CONNECTIONS * config.EMBED_PREFETCH_SHARE),
+)
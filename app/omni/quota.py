@@ -0,0 +1,199 @@
+"""
+Outbound quota for Omni API calls, shared by every worker on the host.
+
+A token bucket refilled at OMNI_QUOTA_RATE calls per second (burst
+OMNI_QUOTA_BURST) paces calls to Omni so the app stays under Omni's own
+rate limit however many uvicorn workers run. With OMNI_QUOTA_FILE set (the
+production server sets it for multi-worker runs) the bucket lives in a small
+file that workers update under an exclusive flock; otherwise it is
+per-process. flock does not serialize threads sharing one descriptor, so
+threads within a worker also take a per-instance lock.
+
+Interactive calls (a user is waiting) may use the whole bucket and wait
+up to OMNI_QUOTA_MAX_WAIT seconds for a token. Background
+calls (prefetch) only spend tokens above the interactive reserve
+and never wait.
+
+A 429 from Omni pauses every worker until its Retry-After and halves the
+rate, which then recovers linearly over OMNI_QUOTA_RECOVERY_SECONDS.
+
+The async entry points (acquire, back_off) run the flock'd file update in a
+thread, so a worker holding the lock never stalls another worker's event loop.
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from app.config import config
+from app.observability.metrics import OMNI_QUOTA
+
+INTERACTIVE = "interactive"
+PREFETCH = "prefetch"
+PRIORITIES = (INTERACTIVE, PREFETCH)
+# Classes a user is waiting on: they may use the whole bucket and wait for a token
+FOREGROUND = (INTERACTIVE,)
+
+# tokens, updated_at, current rate, paused_until
+_STATE = struct.Struct("=dddd")
+
+
+class QuotaExceededError(Exception):
+    """No Omni quota is available for this call (or Omni answered 429)."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Omni quota exhausted")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class OmniQuota:
+    """Token bucket with priority reserve and 429 back-off, optionally shared through a file."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        path: str | None = None,
+        max_wait: float = 2.0,
+        background_reserve: float = 0.5,
+        recovery_seconds: float = 60.0,
+        min_rate_fraction: float = 0.1,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.limit = rate
+        self.burst = max(1.0, burst)
+        self.path = path
+        self.max_wait = max_wait
+        self.background_reserve = background_reserve
+        self.recovery_seconds = recovery_seconds
+        self.min_rate = rate * min_rate_fraction
+        # Wall clock: the shared state is read by other processes
+        self.clock = clock
+        self._state = (self.burst, self.clock(), rate, 0.0)
+        self._fd: int | None = None
+        self._thread_lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Forget the parent's file descriptor after a fork (flock is per open file)."""
+        self._fd = None
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[list]:
+        """Read-modify-write the bucket state; the file is locked for the duration."""
+        if not self.path:
+            state = list(self._state)
+            yield state
+            self._state = tuple(state)
+            return
+
+        import fcntl
+
+        # flock is held per open file: it keeps other workers out, not this worker's threads
+        with self._thread_lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, _STATE.size, 0)
+                state = (
+                    list(_STATE.unpack(raw))
+                    if len(raw) == _STATE.size
+                    else list(self._state)
+                )
+                yield state
+                os.pwrite(self._fd, _STATE.pack(*state), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def try_acquire(self, priority: str = INTERACTIVE) -> float:
+        """Take one token if available; otherwise seconds until one may be (0.0 = acquired)."""
+        floor = 0.0 if priority in FOREGROUND else self.burst * self.background_reserve
+        with self._locked() as state:
+            tokens, updated_at, rate, paused_until = state
+            now = self.clock()
+            if now < paused_until:
+                return paused_until - now
+            if not self.limit:
+                return 0.0
+            elapsed = max(0.0, now - updated_at)
+            tokens = min(self.burst, tokens + elapsed * rate)
+            rate = min(self.limit, rate + self.limit * elapsed / self.recovery_seconds)
+            wait = 0.0
+            if tokens - 1.0 >= floor:
+                tokens -= 1.0
+            else:
+                wait = (floor + 1.0 - tokens) / rate
+            state[:] = [tokens, now, rate, paused_until]
+            return wait
+
+    async def acquire(self, priority: str = INTERACTIVE) -> None:
+        """
+        Wait for a token (foreground calls only, up to max_wait).
+
+        Raises:
+            QuotaExceededError: If no token is available in time
+        """
+        deadline = time.monotonic() + (self.max_wait if priority in FOREGROUND else 0.0)
+        waited = False
+        while True:
+            wait = await self._run(self.try_acquire, priority)
+            if wait == 0.0:
+                OMNI_QUOTA.labels(priority, "waited" if waited else "granted").inc()
+                return
+            if time.monotonic() + wait > deadline:
+                OMNI_QUOTA.labels(priority, "rejected").inc()
+                raise QuotaExceededError(wait)
+            waited = True
+            await asyncio.sleep(wait)
+
+    async def back_off(self, retry_after: float) -> None:
+        """throttled() from the event loop."""
+        await self._run(self.throttled, retry_after)
+
+    async def _run(self, method: Callable[..., Any], *args: Any) -> Any:
+        # The in-memory bucket is cheap; only the shared file (flock, pread/pwrite) goes to a thread
+        if self.path:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def throttled(self, retry_after: float) -> None:
+        """Omni answered 429: pause all workers and halve the rate."""
+        with self._locked() as state:
+            now = self.clock()
+            state[0] = 0.0
+            state[1] = now
+            state[2] = max(self.min_rate, state[2] / 2)
+            state[3] = max(state[3], now + retry_after)
+        OMNI_QUOTA.labels("all", "throttled").inc()
+
+
+omni_quota = OmniQuota(
+    rate=config.OMNI_QUOTA_RATE,
+    burst=config.OMNI_QUOTA_BURST,
+    path=config.OMNI_QUOTA_FILE or None,
+    max_wait=config.OMNI_QUOTA_MAX_WAIT,
+    background_reserve=config.OMNI_QUOTA_BACKGROUND_RESERVE,
+    recovery_seconds=config.OMNI_QUOTA_RECOVERY_SECONDS,
+)
+os.register_at_fork(after_in_child=omni_quota.reset)
@@ -0,0 +1,187 @@
+"""
+Priority scheduling of Omni API calls.
+
+Calls are queued by class and served by a fixed pool of worker coroutines
+(OMNI_SCHEDULER_WORKERS, the size of the Omni connection pool), so when
+Omni is slow the queue forms here, in priority order, instead of first come
+first served inside httpx:
+
+    interactive  /api/embed/url, a user is waiting on the iframe
+    prefetch     speculative embed URLs (app/omni/prefetch.py)
+
+Only classes with a caller exist; a new one (e.g. batch jobs nobody waits on)
+is a rank here, a quota class and an OMNI_SCHEDULER_MAX_QUEUE_WAIT entry.
+
+A queued call whose caller has gone away (its task was cancelled, e.g.
+after a client disconnect) is dropped without calling Omni, and so is one
+that waited longer than its class's OMNI_SCHEDULER_MAX_QUEUE_WAIT; the
+caller of the latter gets OmniOverloadedError. Cancelling a caller also
+cancels its call if a worker already started it; OmniClient then releases
+a half-open circuit breaker trial it was holding, so the next call can retry.
+
+The pool runs between start() and stop() in the app lifespan; outside it
+(scripts, tests) calls run inline.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from app.config import config
+from app.observability.metrics import OMNI_SCHEDULER_JOBS, OMNI_SCHEDULER_WAIT
+from app.omni.quota import INTERACTIVE, PREFETCH
+
+T = TypeVar("T")
+
+_RANK = {INTERACTIVE: 0, PREFETCH: 1}
+
+
+class OmniOverloadedError(Exception):
+    """A call waited too long for a free Omni worker and was dropped."""
+
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__("Omni call queue is overloaded")
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Job:
+    rank: int
+    seq: int
+    priority: str = field(compare=False)
+    factory: Callable[[], Awaitable] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    context: contextvars.Context = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    deadline: float = field(compare=False)
+
+
+class OmniScheduler:
+    """Priority queue of Omni calls served by a fixed pool of worker coroutines."""
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue_wait: dict[str, float],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue_wait = max_queue_wait
+        self.clock = clock
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._seq = itertools.count()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the worker pool on the running loop (called from the app lifespan)."""
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"omni-scheduler-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; calls still queued fail with OmniOverloadedError."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        queue, self._queue = self._queue, None
+        while queue is not None and not queue.empty():
+            job = queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(OmniOverloadedError())
+
+    async def run(self, priority: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Queue a call and wait for its result.
+
+        Raises:
+            OmniOverloadedError: If the call waited longer than its class allows
+        """
+        if not self.running:
+            return await factory()
+        now = self.clock()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            _Job(
+                rank=_RANK[priority],
+                seq=next(self._seq),
+                priority=priority,
+                factory=factory,
+                future=future,
+                # Trace / request context of the caller, not of the worker
+                context=contextvars.copy_context(),
+                enqueued_at=now,
+                deadline=now + self.max_queue_wait.get(priority, 0.0),
+            )
+        )
+        # Cancelling this await cancels the future, which drops or cancels the job
+        return await future
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                OMNI_SCHEDULER_JOBS.labels(job.priority, "abandoned").inc()
+                continue
+            waited = self.clock() - job.enqueued_at
+            OMNI_SCHEDULER_WAIT.labels(job.priority).observe(waited)
+            if self.clock() > job.deadline:
+                OMNI_SCHEDULER_JOBS.labels(job.priority, "expired").inc()
+                job.future.set_exception(OmniOverloadedError())
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: _Job) -> None:
+        task = asyncio.get_running_loop().create_task(
+            job.factory(), context=job.context
+        )
+        # The caller giving up cancels the Omni call it was waiting for
+        job.future.add_done_callback(
+            lambda future: task.cancel() if future.cancelled() else None
+        )
+        try:
+            await asyncio.wait((task,))
+        except asyncio.CancelledError:
+            # The worker itself is being stopped
+            task.cancel()
+            if not job.future.done():
+                job.future.set_exception(OmniOverloadedError())
+            raise
+
+        if task.cancelled():
+            OMNI_SCHEDULER_JOBS.labels(job.priority, "cancelled").inc()
+            if not job.future.done():
+                job.future.cancel()
+            return
+        error = task.exception()
+        OMNI_SCHEDULER_JOBS.labels(
+            job.priority, "failed" if error else "completed"
+        ).inc()
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(task.result())
+
+
+omni_scheduler = OmniScheduler(
+    workers=config.OMNI_SCHEDULER_WORKERS,
+    max_queue_wait=config.OMNI_SCHEDULER_MAX_QUEUE_WAIT,
+)
@@ -1,20 +1,90 @@
 """Standard SSO implementation for Omni Embed."""
+
 from fastapi import HTTPException, status
-from app.config import config
-from app.omni.client import omni_client
+from sqlalchemy.orm import Session
+
 from app.models import User
+from app.observability.log import logger
+from app.omni.allowlist import content_allowlist
+from app.omni.circuit_breaker import CircuitOpenError
+from app.omni.client import omni_client
+from app.omni.entitlements import Dashboard, entitlement_resolver
+from app.omni.prefetch import embed_prefetcher, embed_url_cache
+from app.omni.quota import INTERACTIVE, PREFETCH, QuotaExceededError
+from app.omni.scheduler import OmniOverloadedError
+
+
+def authorize_content(user: User, content_path: str, db: Session) -> Dashboard | None:
+    """
+    Check that the user's customer may embed a content path.
+
+    A customer with entitlements may embed exactly those paths; the configured
+    allowlists only apply to customers without any.
+
+    Returns:
+        The matching entitlement (None if allowed by the configured allowlists)
+
+    Raises:
+        HTTPException: If the path is not allowed
+    """
+    # The customer's entitlements (cached) are authoritative once there are any
+    entitlements = entitlement_resolver.get(db, user.customer_id)
+    dashboard = entitlements.get(content_path)
+    if dashboard is None and (
+        entitlements.dashboards or not content_allowlist.allows(content_path, user.customer_id)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Content path not allowed"
+        )
+    return dashboard
+
+
+def embed_url_factory(
+    user: User,
+    content_path: str,
+    dashboard: Dashboard | None,
+    priority: str = INTERACTIVE
+):
+    """Coroutine factory calling Omni for one embed URL (used directly and for prefetch)."""
+    # Plain values: the factory may outlive the request's DB session
+    customer_id, email = user.customer_id, user.email
+    attributes = dashboard.attributes if dashboard else None
+
+    async def generate() -> str:
+        result = await omni_client.generate_embed_url(
+            content_path=content_path,
+            external_id=customer_id,
+            email=email,
+            user_attributes=attributes,
+            priority=priority
+        )
+        embed_url = result.get("url")
+        if not embed_url:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate embed URL"
+            )
+        return embed_url
+
+    return generate
 
 
 async def generate_embed_url_for_user(
     user: User,
-    content_path: str
+    content_path: str,
+    db: Session
 ) -> str:
     """
     Generate embed URL for a user using Standard SSO.
 
+    A URL prefetched for the same user and path (see app/omni/prefetch.py) is
+    used instead of calling Omni again.
+
     Args:
         user: Authenticated user
         content_path: Path to Omni content
+        db: Database session (only used when the customer's entitlements are not cached)
 
     Returns:
         Embed URL for iframe
@@ -30,35 +100,53 @@ async def generate_embed_url_for_user(
             detail=f"Omni configuration error: {error_msg}"
         )
 
-    # Validate content path against allowlist
-    if content_path not in config.OMNI_CONTENT_PATH_ALLOWLIST:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Content path not allowed"
-        )
+    dashboard = authorize_content(user, content_path, db)
 
     try:
-        # Call Omni API to generate embed URL
-        result = await omni_client.generate_embed_url(
-            content_path=content_path,
-            external_id=user.customer_id,
-            email=user.email
+        return await embed_url_cache.get_or_generate(
+            (user.id, content_path),
+            embed_url_factory(user, content_path, dashboard)
         )
 
-        # Extract URL from response
-        embed_url = result.get("url")
-        if not embed_url:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate embed URL"
-            )
-
-        return embed_url
-
-    except Exception:
-        # Log error but don't expose sensitive details
-        # In production, use proper logging
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Embed service temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(omni_client.circuit_breaker.retry_after())))}
+        )
+    except (QuotaExceededError, OmniOverloadedError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Embed service temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    except Exception as e:
+        # Don't expose details to the client; log the type only (messages may carry URLs).
+        # A cancelled request (client gone) raises CancelledError, which is not caught here.
+        logger.error("Embed URL generation failed for %s: %s", content_path, type(e).__name__)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate embed URL"
         )
+
+
+def prefetch_embed_urls(user: User, content_paths: list[str], db: Session) -> int:
+    """
+    Start background generation of embed URLs the user is likely to open next.
+
+    Paths the user may no longer open are skipped. Returns the number of
+    prefetches started (see EmbedPrefetcher for the budget).
+    """
+    if not omni_client.validate_config()[0]:
+        return 0
+    started = 0
+    for content_path in content_paths:
+        try:
+            dashboard = authorize_content(user, content_path, db)
+        except HTTPException:
+            continue
+        key = (user.id, content_path)
+        started += embed_prefetcher.schedule(key, embed_url_factory(user, content_path, dashboard, PREFETCH))
+    return started
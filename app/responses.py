@@ -0,0 +1,20 @@
+"""
+Default JSON response class.
+
+FastJSONResponse encodes with pydantic-core's Rust serializer instead of
+json.dumps. It is the app's default_response_class, so every JSON route
+uses it. Routes declare a response_model, which FastAPI validates and
+serializes (also in pydantic-core) to plain data before render() runs.
+"""
+
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by pydantic-core (compact, UTF-8, same output as JSONResponse)."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,16 +1,21 @@
 """API routes."""
 import base64
+from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
+from app.config import config
 from app.db import get_db
 from app.models import User
-from app.auth.password import hash_password, verify_password
+from app.auth.login import account_key, login_pipeline
+from app.auth.password import hash_password_async
+from app.auth.csrf import csrf_protection
 from app.auth.session import session_manager
 from app.auth.deps import require_auth
-from app.routes.rate_limit import rate_limiter
 from app.routes.audit import log_action
+from app.routes.disconnect import cancel_on_disconnect
 from app.omni.standard import generate_embed_url_for_user
 
 router = APIRouter(prefix="/api")
@@ -27,25 +32,49 @@ class LoginRequest(BaseModel):
     password: str
 
 
-@router.post("/register")
+class MessageResponse(BaseModel):
+    message: str
+
+
+class AuthResponse(MessageResponse):
+    user_id: int
+
+
+class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    customer_id: str
+    created_at: datetime
+
+
+class EmbedURLResponse(BaseModel):
+    url: str
+
+
+@router.post("/register", response_model=AuthResponse)
 async def register(
     request: Request,
     data: RegisterRequest,
     db: Session = Depends(get_db)
 ):
-    """Register a new user."""
-    # Rate limiting
-    rate_limiter.check_rate_limit(request, "register")
-
+    """Register a new user (rate limited by RateLimitMiddleware)."""
     # Validate password length
-    if len(data.password) < 8:
+    if len(data.password) < config.PASSWORD_MIN_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Password must be at least {config.PASSWORD_MIN_LENGTH} characters"
+        )
+    if len(data.password) > config.PASSWORD_MAX_LENGTH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Password must be at least 8 characters"
+            detail=f"Password must be at most {config.PASSWORD_MAX_LENGTH} characters"
         )
 
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == data.email).first()
+    # Check if user already exists (emails are compared the way login matches them)
+    email = account_key(data.email)
+    existing_user = db.query(User).filter(func.lower(User.email) == email).first()
     if existing_user:
         # Don't reveal that email exists (enumeration protection)
         raise HTTPException(
@@ -63,21 +92,22 @@ async def register(
 
     # Create user
     user = User(
-        email=data.email,
-        password_hash=hash_password(data.password),
+        email=email,
+        password_hash=await hash_password_async(data.password),
         customer_id=data.customer_id
     )
     db.add(user)
     db.commit()
     db.refresh(user)
+    login_pipeline.registered(email, data.password)
 
     # Log action
     log_action(db, "register", request, user=user)
 
-    return {"message": "Registration successful", "user_id": user.id}
+    return AuthResponse(message="Registration successful", user_id=user.id)
 
 
-@router.post("/login")
+@router.post("/login", response_model=AuthResponse)
 async def login(
     request: Request,
     response: Response,
@@ -90,10 +120,10 @@ async def login(
     Accepts:
     - JSON body with email and password
     - Authorization: Basic header
-    """
-    # Rate limiting
-    rate_limiter.check_rate_limit(request, "login")
 
+    Rate limited per IP by RateLimitMiddleware; failures lock the account
+    and, past a higher threshold, the client IP (see app/auth/login.py).
+    """
     email = None
     password = None
 
@@ -117,27 +147,22 @@ async def login(
             detail="Invalid credentials"
         )
 
-    # Find user
-    user = db.query(User).filter(User.email == email).first()
-
-    # Verify password (constant-time to prevent enumeration)
-    if not user or not verify_password(password, user.password_hash):
-        # Generic error message (enumeration protection)
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials"
-        )
+    # Lockout, coalescing and unknown-email checks before the SELECT and argon2
+    # (unknown emails still cost a dummy hash: enumeration protection)
+    client_ip = request.client.host if request.client else "unknown"
+    user = await login_pipeline.authenticate(db, email, password, client_ip)
 
     # Create session
     session_manager.create_session(response, user.id)
+    csrf_protection.issue_cookie(response)
 
     # Log action
     log_action(db, "login", request, user=user)
 
-    return {"message": "Login successful", "user_id": user.id}
+    return AuthResponse(message="Login successful", user_id=user.id)
 
 
-@router.post("/logout")
+@router.post("/logout", response_model=MessageResponse)
 async def logout(
     request: Request,
     response: Response,
@@ -150,26 +175,23 @@ async def logout(
 
     # Delete session
     session_manager.delete_session(response)
+    csrf_protection.clear_cookie(response)
 
-    return {"message": "Logout successful"}
+    return MessageResponse(message="Logout successful")
 
 
-@router.get("/me")
+@router.get("/me", response_model=UserResponse)
 async def get_me(
     user: User = Depends(require_auth)
 ):
     """Get current user info."""
-    return {
-        "id": user.id,
-        "email": user.email,
-        "customer_id": user.customer_id,
-        "created_at": user.created_at.isoformat()
-    }
+    return UserResponse.model_validate(user)
 
 
-@router.get("/embed/url")
+@router.get("/embed/url", response_model=EmbedURLResponse)
 async def get_embed_url(
     request: Request,
+    response: Response,
     content_path: str,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
@@ -183,10 +205,15 @@ async def get_embed_url(
     Returns:
         {"url": "https://..."}
     """
-    # Generate embed URL using Standard SSO
-    embed_url = await generate_embed_url_for_user(user, content_path)
+    # Generate embed URL using Standard SSO; abandoned if the browser goes away while Omni is slow
+    embed_url = await cancel_on_disconnect(
+        request, generate_embed_url_for_user(user, content_path, db), "generate_embed_url"
+    )
 
-    # Log action
+    # Log action (every URL actually issued, even if the client left just after)
     log_action(db, "generate_embed_url", request, user=user, resource=content_path)
 
-    return {"url": embed_url}
+    # Signed embed URLs must never be stored by browsers or proxies
+    response.headers["Cache-Control"] = "no-store"
+
+    return EmbedURLResponse(url=embed_url)
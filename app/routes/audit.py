@@ -1,17 +1,22 @@
 """Audit logging utilities."""
-from typing import Optional
+from datetime import UTC, datetime, timedelta
+
 from fastapi import Request
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+
 from app.models import AuditLog, User
+from app.observability.metrics import AUDIT_WRITE_DURATION
+from app.observability.tracing import tracer
 
 
 def log_action(
     db: Session,
     action: str,
     request: Request,
-    user: Optional[User] = None,
-    resource: Optional[str] = None,
-    details: Optional[str] = None
+    user: User | None = None,
+    resource: str | None = None,
+    details: str | None = None
 ) -> None:
     """
     Log an action to the audit log.
@@ -24,13 +29,52 @@ def log_action(
         resource: Resource affected (optional)
         details: Additional details (optional)
     """
-    log_entry = AuditLog(
-        user_id=user.id if user else None,
-        action=action,
-        resource=resource,
-        ip_address=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent"),
-        details=details
-    )
-    db.add(log_entry)
-    db.commit()
+    with tracer.span("audit.write", action=action), AUDIT_WRITE_DURATION.labels(action).time():
+        log_entry = AuditLog(
+            user_id=user.id if user else None,
+            action=action,
+            resource=resource,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            details=details
+        )
+        db.add(log_entry)
+        db.commit()
+
+
+def most_frequent_resources(
+    db: Session,
+    user_id: int,
+    action: str,
+    limit: int,
+    days: int
+) -> list[str]:
+    """
+    Resources a user acted on most often recently (e.g. their favourite dashboards).
+
+    Args:
+        db: Database session
+        user_id: User whose history to read
+        action: Audit action to count (e.g., "generate_embed_url")
+        limit: Maximum number of resources
+        days: How far back to look
+
+    Returns:
+        Resources, most frequent first
+    """
+    # created_at is stored as naive UTC
+    since = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=days)
+    count = func.count(AuditLog.id)
+    rows = db.execute(
+        select(AuditLog.resource, count)
+        .where(
+            AuditLog.user_id == user_id,
+            AuditLog.action == action,
+            AuditLog.created_at >= since,
+            AuditLog.resource.is_not(None),
+        )
+        .group_by(AuditLog.resource)
+        .order_by(count.desc(), func.max(AuditLog.created_at).desc())
+        .limit(limit)
+    ).all()
+    return [resource for resource, _ in rows]
@@ -0,0 +1,63 @@
+"""
+Stop work for requests whose client has gone away.
+
+A browser that navigates away (or a user who reloads) while /api/embed/url
+waits on Omni closes the connection, but the handler would keep waiting and
+then write an audit row for a URL nobody receives. cancel_on_disconnect()
+runs the handler's work next to a watcher on the ASGI receive channel and
+cancels the work as soon as the server reports the disconnect.
+
+Cancellation only reaches work owned by the request: a queued Omni call is
+dropped by the scheduler, a running one is cancelled, while a shared
+in-flight prefetch the request had joined keeps running (see
+EmbedURLCache.get_or_generate).
+
+Only use this in handlers that do not read the request body afterwards:
+the watcher consumes the remaining body messages.
+"""
+
+import asyncio
+from collections.abc import Awaitable
+
+from fastapi import HTTPException, Request
+
+from app.observability.metrics import CLIENT_DISCONNECTS
+
+# Non-standard status (nginx convention) so logs and metrics show the client gave up
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the server reports that the client disconnected."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect[T](
+    request: Request, work: Awaitable[T], operation: str
+) -> T:
+    """
+    Await work, cancelling it if the client disconnects first.
+
+    Raises:
+        HTTPException: 499 if the client disconnected (the response is never delivered)
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+
+    if not task.done() or task.cancelled():
+        # Let the cancelled work unwind (release DB connections, drop queued Omni calls)
+        await asyncio.gather(task, return_exceptions=True)
+        CLIENT_DISCONNECTS.labels(operation).inc()
+        raise HTTPException(
+            status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request"
+        )
+    return task.result()
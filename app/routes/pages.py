@@ -1,21 +1,33 @@
 """Page routes (HTML)."""
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from sqlalchemy.orm import Session
+
 from app.auth.deps import get_current_user, require_auth
+from app.config import config
+from app.db import get_db
 from app.models import User
+from app.omni.catalog import catalog_index
+from app.omni.entitlements import entitlement_resolver
+from app.omni.standard import prefetch_embed_urls
+from app.routes.audit import most_frequent_resources
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+
+def user_dashboards(db: Session, user: User):
+    """Catalog entries for the user's customer (cached; no per-view scan or fetch)."""
+    return catalog_index.for_customer(user.customer_id, entitlement_resolver.get(db, user.customer_id))
 
 
 @router.get("/", response_class=HTMLResponse)
-async def index(request: Request, user: User = Depends(get_current_user)):
+async def index(request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Home page."""
     if user:
         return templates.TemplateResponse(
             "me.html",
-            {"request": request, "user": user}
+            {"request": request, "user": user, "dashboards": user_dashboards(db, user)}
         )
     return templates.TemplateResponse(
         "index.html",
@@ -42,11 +54,16 @@ async def login_page(request: Request):
 
 
 @router.get("/me", response_class=HTMLResponse)
-async def me_page(request: Request, user: User = Depends(require_auth)):
-    """User profile page."""
+async def me_page(request: Request, user: User = Depends(require_auth), db: Session = Depends(get_db)):
+    """User profile page (catalog of the dashboards the user may open)."""
+    if config.EMBED_PREFETCH:
+        # Warm embed URLs for the dashboards the user opens most; never delays the page
+        prefetch_embed_urls(user, most_frequent_resources(
+            db, user.id, "generate_embed_url", config.EMBED_PREFETCH_TOP_N, config.EMBED_PREFETCH_HISTORY_DAYS
+        ), db)
     return templates.TemplateResponse(
         "me.html",
-        {"request": request, "user": user}
+        {"request": request, "user": user, "dashboards": user_dashboards(db, user)}
     )
 
 
@@ -0,0 +1,141 @@
+"""Profiling routes (installed only when PROFILING_TOKEN is set)."""
+
+import asyncio
+import cProfile
+import os
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+
+from app.config import config
+from app.observability.profiling import (
+    SamplingProfiler,
+    acquire_profiler,
+    capture_timestamp,
+    is_authorized,
+    pstats_bytes,
+    pstats_text,
+    release_profiler,
+    request_profile_path,
+)
+
+PSTATS_MEDIA_TYPE = "application/octet-stream"
+
+
+def require_profiling_token(
+    x_profile_token: str | None = Header(default=None),
+) -> None:
+    """Dependency: reject callers without the profiling token."""
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+router = APIRouter(
+    prefix="/debug/profile",
+    dependencies=[Depends(require_profiling_token)],
+    include_in_schema=False,
+)
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def pstats_download(data: bytes, name: str) -> Response:
+    """Return raw pstats data as a file download."""
+    return Response(
+        data,
+        media_type=PSTATS_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.pstats"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("")
+async def capture_profile(
+    seconds: float = Query(default=5.0, gt=0),
+    mode: Literal["sampling", "cprofile"] = "sampling",
+    format: Literal["collapsed", "pstats", "text"] = "collapsed",
+):
+    """
+    Profile this worker for a fixed time window.
+
+    - mode=sampling: all threads, returned as collapsed stacks (flamegraph input)
+    - mode=cprofile: event loop thread, returned as pstats data or a text summary
+    """
+    if mode == "sampling" and format != "collapsed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sampling mode only supports format=collapsed",
+        )
+    if mode == "cprofile" and format == "collapsed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cprofile mode supports format=pstats or format=text",
+        )
+    seconds = min(seconds, config.PROFILING_MAX_SECONDS)
+
+    if not acquire_profiler():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A profile is already running"
+        )
+    try:
+        if mode == "sampling":
+            profiler = SamplingProfiler(interval=config.PROFILING_SAMPLE_INTERVAL)
+            profiler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                await asyncio.to_thread(profiler.stop)
+            return PlainTextResponse(
+                profiler.collapsed(), headers={"Cache-Control": "no-store"}
+            )
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+    finally:
+        release_profiler()
+
+    if format == "pstats":
+        return pstats_download(
+            pstats_bytes(profile), f"worker-{os.getpid()}-{capture_timestamp()}"
+        )
+    return PlainTextResponse(
+        pstats_text(profile), headers={"Cache-Control": "no-store"}
+    )
+
+
+@router.get("/requests/{profile_id}")
+async def get_request_profile(
+    profile_id: str, format: Literal["pstats", "text"] = "pstats"
+):
+    """Download a profile recorded with the X-Profile request header."""
+    try:
+        path = request_profile_path(profile_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    # File I/O (and pstats parsing) off the event loop
+    try:
+        if format == "text":
+            text = await asyncio.to_thread(pstats_text, path)
+        else:
+            data = await asyncio.to_thread(read_file, path)
+    except FileNotFoundError:
+        # Never recorded, or pruned (PROFILE_MAX_FILES)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+
+    if format == "text":
+        return PlainTextResponse(text, headers={"Cache-Control": "no-store"})
+    return pstats_download(data, profile_id)
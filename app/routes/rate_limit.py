@@ -4,6 +4,7 @@ from typing import Dict, Tuple
 from collections import defaultdict
 from fastapi import Request, HTTPException, status
 from app.config import config
+from app.observability.metrics import RATE_LIMIT_REJECTIONS
 
 
 class RateLimiter:
@@ -49,6 +50,7 @@ class RateLimiter:
 
         # Check if rate limit exceeded
         if len(self.attempts[key]) >= max_attempts:
+            RATE_LIMIT_REJECTIONS.labels(endpoint).inc()
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Too many requests. Please try again later."
@@ -0,0 +1,139 @@
+"""
+Production server entry point.
+
+    uv run python -m app.server                # workers sized from CPU count
+    uv run python -m app.server --workers 4 --port 8080
+
+Runs uvicorn with several worker processes, uvloop / httptools when they are
+installed, and timeouts suited to running behind a load balancer. Each worker
+is a fresh (spawned) interpreter and builds its own DB pool, Omni client and
+metrics state in the app lifespan; see app/db.py and app/omni/client.py for
+the fork-safety hooks used when a pre-forking server imports the app first.
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import tempfile
+
+# Loads .env so WEB_CONCURRENCY / SERVER_* can be set there too
+import app.config  # noqa: F401
+
+APP = "app.main:app"
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, otherwise one worker per CPU."""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    return max(1, os.cpu_count() or 1)
+
+
+def select_loop() -> str:
+    """uvloop when installed (faster event loop), otherwise asyncio."""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http() -> str:
+    """httptools when installed (C HTTP parser), otherwise h11."""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def prepare_metrics_dir(workers: int) -> str | None:
+    """
+    Give multi-worker servers a clean Prometheus multiprocess directory.
+
+    Must run before any worker imports prometheus_client; the variable is
+    inherited by the spawned workers.
+    """
+    if workers < 2:
+        return None
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.path.join(
+        tempfile.gettempdir(), f"omni-embed-metrics-{os.getpid()}"
+    )
+    # Stale files from a previous run would be merged into current metrics
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    return directory
+
+
+def prepare_quota_file(workers: int) -> str | None:
+    """
+    Share the Omni outbound quota between workers through a fresh state file.
+
+    Like prepare_metrics_dir(), this must run before the workers start; they
+    read OMNI_QUOTA_FILE when importing the config.
+    """
+    if workers < 2:
+        return None
+    path = os.environ.get("OMNI_QUOTA_FILE") or os.path.join(
+        tempfile.gettempdir(), f"omni-embed-quota-{os.getpid()}"
+    )
+    # A previous run's bucket (and any 429 pause in it) must not carry over
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    os.environ["OMNI_QUOTA_FILE"] = path
+    return path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run the app with production settings")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--backlog", type=int, default=int(os.getenv("SERVER_BACKLOG", "2048"))
+    )
+    # Longer than typical load balancer idle timeouts (60s) so the LB closes idle connections first
+    parser.add_argument(
+        "--keep-alive", type=int, default=int(os.getenv("SERVER_KEEP_ALIVE", "75"))
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=int(os.getenv("SERVER_MAX_REQUESTS", "0")),
+        help="Restart a worker after this many requests (0 = never)",
+    )
+    return parser
+
+
+def server_options(args: argparse.Namespace) -> dict:
+    """Keyword arguments for uvicorn.run()."""
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": select_loop(),
+        "http": select_http(),
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keep_alive,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "limit_max_requests": args.max_requests or None,
+        # The app writes its own structured access log (app.access)
+        "access_log": False,
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "server_header": False,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    args = build_parser().parse_args(argv)
+    prepare_metrics_dir(args.workers)
+    prepare_quota_file(args.workers)
+    uvicorn.run(APP, **server_options(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Jinja2 template environment with precompilation and bytecode caching."""
+
+import os
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.assets import asset_manifest
+from app.auth.csrf import csrf_token_for_request
+from app.config import config
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+
+def create_bytecode_cache(directory: str) -> BytecodeCache | None:
+    """Create a filesystem bytecode cache (None if disabled or not writable)."""
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    if not os.access(directory, os.W_OK):
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def create_environment(
+    auto_reload: bool | None = None, bytecode_cache_dir: str | None = None
+) -> Environment:
+    """
+    Create the Jinja2 environment used by page routes.
+
+    Args:
+        auto_reload: Check template mtimes on every render (default from config)
+        bytecode_cache_dir: Directory for compiled templates (default from config)
+
+    Returns:
+        Configured Jinja2 environment
+    """
+    if auto_reload is None:
+        auto_reload = config.TEMPLATE_AUTO_RELOAD
+    if bytecode_cache_dir is None:
+        bytecode_cache_dir = config.TEMPLATE_BYTECODE_CACHE_DIR
+
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=auto_reload,
+        bytecode_cache=create_bytecode_cache(bytecode_cache_dir),
+        # Keep every template compiled in memory for the worker's lifetime
+        cache_size=-1,
+    )
+    environment.globals["static_url"] = asset_manifest.url
+    environment.globals["csrf_token"] = csrf_token_for_request
+    return environment
+
+
+def warm_up_templates(environment: Environment | None = None) -> int:
+    """
+    Compile every template into the in-memory cache (and bytecode cache).
+
+    Called from the application lifespan so the first request after a
+    deploy or worker restart does not pay for template compilation.
+
+    Returns:
+        Number of templates compiled
+    """
+    environment = environment or templates.env
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    return len(names)
+
+
+templates = Jinja2Templates(env=create_environment())
+
+
+if __name__ == "__main__":
+    # Build step: populate the bytecode cache before workers start
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    count = warm_up_templates()
+    logging.getLogger("app.templating").info(
+        "Precompiled %d templates into %s", count, config.TEMPLATE_BYTECODE_CACHE_DIR
+    )
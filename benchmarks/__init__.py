@@ -0,0 +1 @@
+"""Micro-benchmarks (run with `uv run python -m benchmarks.<name>`)."""
@@ -0,0 +1,111 @@
+"""
+Per-request cost of CSRF verification.
+
+Compares token verification with stock itsdangerous, with cached signing
+keys, and in double-submit mode, then measures the middleware itself for
+header and urlencoded form tokens:
+
+    uv run python -m benchmarks.csrf_verify --iterations 50000
+"""
+
+import argparse
+import asyncio
+import hmac
+import os
+import secrets
+import time
+
+from itsdangerous import URLSafeTimedSerializer
+
+os.environ.setdefault("SESSION_SECRET", secrets.token_urlsafe(32))
+
+from app.auth.signing import CachedURLSafeTimedSerializer
+from app.config import config
+from app.middleware.csrf import CSRFMiddleware
+
+
+def per_call_us(func, iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def middleware_us(
+    headers: list[tuple[bytes, bytes]], body: bytes, iterations: int
+) -> float:
+    async def app(scope, receive, send):
+        pass
+
+    async def send(message):
+        pass
+
+    middleware = CSRFMiddleware(app)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/logout",
+        "headers": headers,
+    }
+    message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive():
+        return message
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await middleware(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    session_cookie = URLSafeTimedSerializer(config.SESSION_SECRET).dumps({"user_id": 1})
+    stock = URLSafeTimedSerializer(config.SESSION_SECRET, salt="csrf")
+    cached = CachedURLSafeTimedSerializer(config.SESSION_SECRET, salt="csrf")
+    token = stock.dumps(session_cookie)
+    double_submit = secrets.token_urlsafe(32)
+
+    print(f"iterations: {args.iterations}")
+    print(
+        f"signed, stock itsdangerous:   {per_call_us(lambda: stock.loads(token, max_age=3600), args.iterations):7.2f} us"
+    )
+    print(
+        f"signed, cached keys:          {per_call_us(lambda: cached.loads(token, max_age=3600), args.iterations):7.2f} us"
+    )
+    print(
+        f"double submit:                "
+        f"{per_call_us(lambda: hmac.compare_digest(double_submit.encode(), double_submit.encode()), args.iterations):7.2f} us"
+    )
+
+    cookie = f"{config.SESSION_COOKIE_NAME}={session_cookie}".encode()
+    header_us = asyncio.run(
+        middleware_us(
+            [(b"cookie", cookie), (b"x-csrf-token", token.encode())],
+            b"",
+            args.iterations,
+        )
+    )
+    form_us = asyncio.run(
+        middleware_us(
+            [
+                (b"cookie", cookie),
+                (b"content-type", b"application/x-www-form-urlencoded"),
+            ],
+            f"csrf_token={token}&note={'x' * 4096}".encode(),
+            args.iterations,
+        )
+    )
+    print(f"middleware, header token:     {header_us:7.2f} us")
+    print(f"middleware, form token (4KB): {form_us:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-request overhead of the middleware stack.
+
+Calls the ASGI apps directly (no sockets, no HTTP parsing) so the numbers
+isolate framework + middleware cost:
+
+    uv run python -m benchmarks.middleware_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.middleware.stack import install_middleware
+
+
+def build_app(with_middleware: bool) -> FastAPI:
+    """Build a minimal app, optionally wrapped in the production middleware stack."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    if with_middleware:
+        install_middleware(app)
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int) -> float:
+    """Return mean microseconds per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"accept-encoding", b"gzip, br"),
+            (b"cookie", b"session=bench-session-cookie"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up (middleware stack is built lazily on the first call)
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    bare = build_app(with_middleware=False)
+    stacked = build_app(with_middleware=True)
+
+    bare_us = await run(bare, "/ping", requests)
+    stacked_us = await run(stacked, "/ping", requests)
+    exempt_us = await run(stacked, "/healthz", requests)
+
+    print(f"requests per case:          {requests}")
+    print(f"bare app        /ping:      {bare_us:8.1f} us/request")
+    print(
+        f"full stack      /ping:      {stacked_us:8.1f} us/request  (+{stacked_us - bare_us:.1f} us)"
+    )
+    print(
+        f"full stack      /healthz:   {exempt_us:8.1f} us/request  (+{exempt_us - bare_us:.1f} us, exempt)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
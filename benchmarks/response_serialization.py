@@ -0,0 +1,108 @@
+"""
+Per-request cost of API response serialization.
+
+Calls a one-route FastAPI app directly over ASGI (no middleware, no network)
+so the difference is the framework's response handling alone:
+
+- before: handler returns a dict, no response_model, stock JSONResponse
+  (jsonable_encoder + json.dumps)
+- after:  handler returns a pydantic model declared as response_model
+  (FastAPI serializes it to plain data in pydantic-core), FastJSONResponse
+  (pydantic-core to_json instead of json.dumps)
+
+    uv run python -m benchmarks.response_serialization --iterations 20000
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import time
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+os.environ.setdefault("SESSION_SECRET", secrets.token_urlsafe(32))
+
+from app.responses import FastJSONResponse
+from app.routes.api import UserResponse
+
+USER = {
+    "id": 42,
+    "email": "analyst@example.com",
+    "customer_id": "customer-0042",
+    "created_at": datetime(2026, 1, 2, 3, 4, 5, 678901),
+}
+
+
+def before_app() -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/api/me")
+    async def get_me():
+        return {**USER, "created_at": USER["created_at"].isoformat()}
+
+    return app
+
+
+def after_app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/api/me", response_model=UserResponse)
+    async def get_me():
+        return UserResponse(**USER)
+
+    return app
+
+
+async def per_request_us(app: FastAPI, iterations: int) -> tuple[float, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/me",
+        "raw_path": b"/api/me",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message["body"])
+
+    for _ in range(min(iterations, 1000)):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations * 1_000_000, body[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    before_us, before_body = asyncio.run(per_request_us(before_app(), args.iterations))
+    after_us, after_body = asyncio.run(per_request_us(after_app(), args.iterations))
+    assert before_body == after_body, (before_body, after_body)
+
+    print(f"iterations: {args.iterations}")
+    print(f"dict + JSONResponse:                  {before_us:7.2f} us/request")
+    print(f"response_model + FastJSONResponse:    {after_us:7.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
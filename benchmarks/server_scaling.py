@@ -0,0 +1,155 @@
+"""
+Throughput of the production server across worker counts.
+
+Starts `python -m app.server` with each worker count, waits for /readyz and
+drives it with concurrent keep-alive clients (spread over several client
+processes so the load generator is not the bottleneck):
+
+    uv run python -m benchmarks.server_scaling --workers 1 2 4 --duration 10
+
+Run it on the machine size you deploy to; workers beyond the CPU count only
+add context switching.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "STARTUP_WARMUP": "false", "LOG_LEVEL": "WARNING"}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.server",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def _load(url: str, concurrency: int, duration: float) -> tuple[int, int]:
+    completed = errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+
+        async def worker():
+            nonlocal completed, errors
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(url)
+                    completed += 1
+                    errors += response.status_code >= 500
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return completed, errors
+
+
+def _client_process(url: str, concurrency: int, duration: float, results) -> None:
+    results.put(asyncio.run(_load(url, concurrency, duration)))
+
+
+def measure(
+    url: str, clients: int, concurrency: int, duration: float
+) -> tuple[float, int]:
+    """Requests per second and error count for `clients` x `concurrency` connections."""
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_client_process, args=(url, concurrency, duration, results)
+        )
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    completed = sum(done for done, _ in totals)
+    return completed / duration, sum(errors for _, errors in totals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/login")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--clients", type=int, default=2, help="load generator processes"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="connections per client process"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"CPUs: {os.cpu_count()}  path: {args.path}  connections: {args.clients * args.concurrency}"
+    )
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_ready(base_url)
+            # Short warm-up so every worker has built its middleware stack and templates
+            measure(base_url + args.path, args.clients, args.concurrency, 1.0)
+            rps, errors = measure(
+                base_url + args.path, args.clients, args.concurrency, args.duration
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or rps
+        print(
+            f"workers={workers:<3} {rps:9.1f} req/s  x{rps / baseline:.2f}  errors={errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-start cost of importing the application.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+reports the total import time, the part spent in the app's own modules, and
+the slowest imports:
+
+    uv run python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+@dataclass
+class ImportProfile:
+    """Parsed `-X importtime` output of one interpreter run (microseconds)."""
+
+    total_us: int
+    app_self_us: int
+    cumulative_us: dict[str, int]
+    modules: set[str]
+
+
+def profile_import(module: str = "app.main", env: dict | None = None) -> ImportProfile:
+    """Import a module in a fresh interpreter and parse its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    app_self = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        cumulative[name] = int(cumulative_us)
+        if name == "app" or name.startswith("app."):
+            app_self += int(self_us)
+    return ImportProfile(
+        total_us=cumulative.get(module, 0),
+        app_self_us=app_self,
+        cumulative_us=cumulative,
+        modules=set(cumulative),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    profiles = [profile_import() for _ in range(args.runs)]
+    totals = [profile.total_us / 1000 for profile in profiles]
+    app_selfs = [profile.app_self_us / 1000 for profile in profiles]
+    print(
+        f"import app.main: median {statistics.median(totals):.1f} ms (min {min(totals):.1f} ms)"
+    )
+    print(f"app.* self time: median {statistics.median(app_selfs):.1f} ms")
+
+    print("\nslowest top-level imports (cumulative, last run):")
+    last = profiles[-1].cumulative_us
+    top_level = {
+        name: us for name, us in last.items() if "." not in name and name != "app"
+    }
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[
+        : args.top
+    ]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -87,6 +87,23 @@ def test_csrf_token_uniqueness(csrf_protection):
     assert csrf_protection.verify_token(token2, session_id) is True
 
 
+def test_stable_token(csrf_protection):
+    """Test page tokens only change every token_refresh seconds and verify like any other token."""
+    import time
+
+    session_id = "test-session-123"
+    now = time.time()
+    csrf_protection.clock = lambda: now - now % 600
+    token = csrf_protection.stable_token(session_id)
+    csrf_protection.clock = lambda: now - now % 600 + 599
+    assert csrf_protection.stable_token(session_id) == token
+    csrf_protection.clock = lambda: now - now % 600 + 600
+    assert csrf_protection.stable_token(session_id) != token
+
+    assert csrf_protection.verify_token(token, session_id) is True
+    assert csrf_protection.verify_token(token, "other-session") is False
+
+
 def test_get_token_from_request_header(csrf_protection):
     """Test extracting CSRF token from request header."""
     from fastapi import Request
@@ -0,0 +1,109 @@
+"""Tests for the fixed-memory failure tracker."""
+
+import pytest
+
+from app.auth.lockout import FailureTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_tracker(clock, threshold=3, width=1024, max_locked=100) -> FailureTracker:
+    return FailureTracker(
+        threshold=threshold,
+        window=60,
+        duration=10,
+        max_duration=35,
+        width=width,
+        max_locked=max_locked,
+        clock=clock,
+    )
+
+
+def fail(tracker, key, times):
+    for _ in range(times):
+        tracker.record_failure(key)
+
+
+def test_locks_at_threshold():
+    """Test a key locks on its threshold-th failure, and other keys are unaffected."""
+    clock = FakeClock()
+    tracker = make_tracker(clock)
+    fail(tracker, "a@example.com", 2)
+    assert tracker.failures("a@example.com") == 2
+    assert tracker.retry_after("a@example.com") == 0.0
+
+    tracker.record_failure("a@example.com")
+    assert tracker.retry_after("a@example.com") == 10
+    assert tracker.retry_after("b@example.com") == 0.0
+
+
+def test_lockout_doubles_up_to_max():
+    """Test each lockout of the same key doubles the next, capped at max_duration."""
+    clock = FakeClock()
+    tracker = make_tracker(clock)
+    durations = []
+    for _ in range(4):
+        fail(tracker, "a@example.com", 3)
+        durations.append(tracker.retry_after("a@example.com"))
+        clock.now += durations[-1]
+    assert durations == [10, 20, 35, 35]
+
+
+def test_success_resets_failures_and_escalation():
+    """Test a success forgets both the failure count and earlier lockouts."""
+    clock = FakeClock()
+    tracker = make_tracker(clock)
+    fail(tracker, "a@example.com", 3)
+    clock.now += 10
+    fail(tracker, "a@example.com", 2)
+    tracker.record_success("a@example.com")
+    assert tracker.failures("a@example.com") == 0
+
+    fail(tracker, "a@example.com", 3)
+    assert tracker.retry_after("a@example.com") == 10
+
+
+def test_failures_forgotten_after_window():
+    """Test failures older than the window no longer count."""
+    clock = FakeClock()
+    tracker = make_tracker(clock)
+    fail(tracker, "a@example.com", 2)
+    clock.now += 30
+    assert tracker.failures("a@example.com") == 2
+    clock.now += 30
+    assert tracker.failures("a@example.com") == 0
+
+
+def test_fixed_memory_under_key_spray():
+    """Test spraying many distinct keys neither grows memory nor hides a real attack."""
+    clock = FakeClock()
+    tracker = make_tracker(clock, threshold=20, width=4096, max_locked=10)
+    memory = tracker.memory_bytes
+    for i in range(50000):
+        tracker.record_failure(f"spray{i}@example.com")
+    assert tracker.memory_bytes == memory == 2 * 4 * 4096
+    assert (
+        sum(1 for i in range(50000) if tracker.retry_after(f"spray{i}@example.com"))
+        <= 10
+    )
+
+    # Never undercounts: a targeted key still locks no later than its threshold
+    for attempt in range(20):
+        if tracker.retry_after("victim@example.com"):
+            break
+        tracker.record_failure("victim@example.com")
+    assert tracker.retry_after("victim@example.com") > 0
+
+
+def test_rejects_invalid_sizes():
+    """Test the sketch width must be a power of two and the threshold fit a counter."""
+    with pytest.raises(ValueError):
+        make_tracker(FakeClock(), width=1000)
+    with pytest.raises(ValueError):
+        make_tracker(FakeClock(), threshold=256)
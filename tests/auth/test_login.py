@@ -0,0 +1,359 @@
+"""Tests for the staged login pipeline."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.auth.lockout import FailureTracker
+from app.auth.login import ExpiringKeys, LoginPipeline
+
+PASSWORD = "testpassword123"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Count argon2 verifications (real and dummy) without running argon2."""
+    calls = {"verify": 0, "dummy": 0}
+
+    async def verify(password, password_hash):
+        calls["verify"] += 1
+        await asyncio.sleep(0.01)
+        return password == PASSWORD
+
+    async def dummy():
+        calls["dummy"] += 1
+
+    monkeypatch.setattr("app.auth.login.verify_password_async", verify)
+    monkeypatch.setattr("app.auth.login.dummy_verify_async", dummy)
+    return calls
+
+
+@pytest.fixture
+def selects(test_db):
+    """Count SELECTs on the users table."""
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def make_tracker(clock, threshold) -> FailureTracker:
+    return FailureTracker(
+        threshold=threshold,
+        window=60,
+        duration=120,
+        max_duration=3600,
+        width=1024,
+        max_locked=100,
+        clock=clock,
+    )
+
+
+def make_pipeline(
+    clock=None, threshold=3, account_threshold=100, ip_threshold=100
+) -> LoginPipeline:
+    clock = clock or FakeClock()
+    return LoginPipeline(
+        lockout=make_tracker(clock, threshold),
+        account_lockout=make_tracker(clock, account_threshold),
+        ip_lockout=make_tracker(clock, ip_threshold),
+        unknown_emails=ExpiringKeys(ttl=60, max_entries=100, clock=clock),
+        recent_failures=ExpiringKeys(ttl=30, max_entries=100, clock=clock),
+        known_clients=ExpiringKeys(ttl=3600, max_entries=100, clock=clock),
+    )
+
+
+async def rejected(pipeline, db, email, password, client_ip="unknown") -> int:
+    with pytest.raises(HTTPException) as exc_info:
+        await pipeline.authenticate(db, email, password, client_ip)
+    return exc_info.value.status_code
+
+
+@pytest.mark.asyncio
+async def test_implausible_credentials_rejected_without_work(test_db, hashes, selects):
+    """Test malformed emails and impossible password lengths cost neither a query nor a hash."""
+    pipeline = make_pipeline()
+    assert await rejected(pipeline, test_db, "not-an-email", PASSWORD) == 401
+    assert await rejected(pipeline, test_db, "a@example.com", "short") == 401
+    assert await rejected(pipeline, test_db, "a@example.com", "x" * 5000) == 401
+    assert hashes == {"verify": 0, "dummy": 0}
+    assert selects == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_email_negative_cache(test_db, hashes, selects):
+    """Test unknown emails always cost a dummy hash, but only the first costs a query."""
+    pipeline = make_pipeline()
+    assert await rejected(pipeline, test_db, "ghost@example.com", "password-one") == 401
+    assert await rejected(pipeline, test_db, "Ghost@example.com", "password-two") == 401
+    assert hashes["dummy"] == 2
+    assert len(selects) == 1
+
+    pipeline.registered("ghost@example.com", "password-four")
+    assert (
+        await rejected(pipeline, test_db, "ghost@example.com", "password-three") == 401
+    )
+    assert len(selects) == 2
+
+
+@pytest.mark.asyncio
+async def test_mixed_case_email_is_not_cached_as_unknown(test_db, test_user, hashes):
+    """Test a registered user logging in with different email case is found, now and afterwards."""
+    pipeline = make_pipeline()
+    assert (
+        await pipeline.authenticate(test_db, "Test@Example.com", PASSWORD)
+    ).id == test_user.id
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD)
+    ).id == test_user.id
+    assert hashes["dummy"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_failure_coalesced(test_db, test_user, hashes):
+    """Test the same failed pair is rejected without another hash, until it expires."""
+    clock = FakeClock()
+    pipeline = make_pipeline(clock, threshold=10)
+    for _ in range(3):
+        assert (
+            await rejected(pipeline, test_db, test_user.email, "wrongpassword") == 401
+        )
+    assert hashes["verify"] == 1
+
+    clock.now += 31
+    assert await rejected(pipeline, test_db, test_user.email, "wrongpassword") == 401
+    assert hashes["verify"] == 2
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD)
+    ).id == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_attempts_share_one_hash(test_db, test_user, hashes):
+    """Test a burst of the same failing pair runs argon2 once."""
+    pipeline = make_pipeline(threshold=10)
+    results = await asyncio.gather(
+        *(
+            pipeline.authenticate(test_db, test_user.email, "wrongpassword")
+            for _ in range(5)
+        ),
+        return_exceptions=True,
+    )
+    assert all(
+        isinstance(result, HTTPException) and result.status_code == 401
+        for result in results
+    )
+    assert hashes["verify"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lockout_after_failures(test_db, test_user, hashes):
+    """Test an account locks after the threshold, answers 429 without hashing, and unlocks later."""
+    clock = FakeClock()
+    pipeline = make_pipeline(clock, threshold=3)
+    for attempt in range(3):
+        assert (
+            await rejected(
+                pipeline, test_db, test_user.email, f"wrong-password-{attempt}"
+            )
+            == 401
+        )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == "120"
+    assert hashes["verify"] == 3
+
+    clock.now += 120
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD)
+    ).id == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_others_cannot_lock_owner_out(test_db, test_user, hashes):
+    """Test failures from one client IP lock the account only for that IP."""
+    pipeline = make_pipeline(threshold=3)
+    for attempt in range(3):
+        assert (
+            await rejected(
+                pipeline,
+                test_db,
+                test_user.email,
+                f"wrong-password-{attempt}",
+                "198.51.100.1",
+            )
+            == 401
+        )
+
+    assert (
+        await rejected(pipeline, test_db, test_user.email, PASSWORD, "198.51.100.1")
+        == 429
+    )
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD, "198.51.100.2")
+    ).id == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_rotating_ips_hit_account_lock_except_known_clients(
+    test_db, test_user, hashes
+):
+    """Test guesses spread over many IPs lock the account, but not for an IP that logged in before."""
+    pipeline = make_pipeline(threshold=3, account_threshold=6)
+    owner_ip = "198.51.100.1"
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD, owner_ip)
+    ).id == test_user.id
+
+    for attempt in range(6):
+        # Two guesses per address: each stays under the per-IP account lock
+        client_ip = f"203.0.113.{attempt // 2}"
+        assert (
+            await rejected(
+                pipeline, test_db, test_user.email, f"wrong-guess-{attempt}", client_ip
+            )
+            == 401
+        )
+
+    assert (
+        await rejected(pipeline, test_db, test_user.email, PASSWORD, "203.0.113.99")
+        == 429
+    )
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD, owner_ip)
+    ).id == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_ip_lockout_spans_accounts(test_db, test_user, hashes):
+    """Test an IP failing on many accounts is locked for all of them, without affecting other IPs."""
+    pipeline = make_pipeline(threshold=10, ip_threshold=5)
+    for attempt in range(5):
+        assert (
+            await rejected(
+                pipeline,
+                test_db,
+                f"user{attempt}@example.com",
+                PASSWORD,
+                "198.51.100.1",
+            )
+            == 401
+        )
+
+    assert (
+        await rejected(pipeline, test_db, test_user.email, PASSWORD, "198.51.100.1")
+        == 429
+    )
+    assert (
+        await pipeline.authenticate(test_db, test_user.email, PASSWORD, "198.51.100.2")
+    ).id == test_user.id
+
+
+def test_login_after_registering_previously_unknown_email(client):
+    """Test registration clears the negative cache entry left by an earlier failed login."""
+    credentials = {"email": "late@example.com", "password": "somepassword123"}
+    assert client.post("/api/login", json=credentials).status_code == 401
+    assert (
+        client.post(
+            "/api/register", json={**credentials, "customer_id": "late-customer"}
+        ).status_code
+        == 200
+    )
+    assert client.post("/api/login", json=credentials).status_code == 200
+
+
+def test_registered_email_matched_case_insensitively(client):
+    """Test registration stores the email the way login matches it, and rejects case-only duplicates."""
+    credentials = {"email": "Mixed.Case@Example.com", "password": "somepassword123"}
+    assert (
+        client.post(
+            "/api/register", json={**credentials, "customer_id": "mixed-customer"}
+        ).status_code
+        == 200
+    )
+    assert (
+        client.post(
+            "/api/login", json={**credentials, "email": "mixed.case@example.com"}
+        ).status_code
+        == 200
+    )
+    duplicate = {
+        **credentials,
+        "email": "MIXED.CASE@example.com",
+        "customer_id": "other-customer",
+    }
+    assert client.post("/api/register", json=duplicate).status_code == 400
+
+
+def test_lockouts_fire_within_the_rate_limit(client, test_user):
+    """Test the per-IP account and IP locks are reachable through RateLimitMiddleware."""
+    from datetime import datetime, timedelta
+    from unittest.mock import patch
+
+    from app.config import config
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def attempt(email, password):
+        nonlocal now
+        response = client.post(
+            "/api/login", json={"email": email, "password": password}
+        )
+        if (
+            response.status_code == 429
+            and "Too many requests" in response.json()["detail"]
+        ):
+            # Rate limited: wait out the rate limit window, as a patient attacker would
+            now += timedelta(seconds=config.RATE_LIMIT_WINDOW + 1)
+            mock_datetime.utcnow.return_value = now
+            response = client.post(
+                "/api/login", json={"email": email, "password": password}
+            )
+        return response
+
+    with patch("app.routes.rate_limit.datetime") as mock_datetime:
+        mock_datetime.utcnow.return_value = now
+        for guess in range(config.LOGIN_LOCKOUT_THRESHOLD):
+            assert (
+                attempt(test_user.email, f"wrong-password-{guess}").status_code == 401
+            )
+        response = attempt(test_user.email, "testpassword123")
+        assert response.status_code == 429
+        assert (
+            response.json()["detail"]
+            == "Too many failed attempts. Please try again later."
+        )
+
+        for guess in range(
+            config.LOGIN_LOCKOUT_THRESHOLD, config.LOGIN_IP_LOCKOUT_THRESHOLD
+        ):
+            assert (
+                attempt(f"sprayed{guess}@example.com", "some-password").status_code
+                == 401
+            )
+        response = attempt("another@example.com", "some-password")
+        assert response.status_code == 429
+        assert (
+            response.json()["detail"]
+            == "Too many failed attempts. Please try again later."
+        )
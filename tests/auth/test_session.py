@@ -122,3 +122,13 @@ def test_session_cookie_attributes(session_manager):
 
     # Max-Age should be set
     assert "Max-Age" in cookie_str or "max-age" in cookie_str
+
+
+def test_warm_up_requires_secret(session_manager, monkeypatch):
+    """Test warm_up builds the serializer up front and fails fast without a secret."""
+    session_manager.warm_up()
+    assert "serializer" in session_manager.__dict__
+
+    monkeypatch.setattr(config, "SESSION_SECRET", "")
+    with pytest.raises(ValueError):
+        SessionManager().warm_up()
@@ -0,0 +1,76 @@
+"""Tests for the cached-key and rotating itsdangerous serializers."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from itsdangerous import (
+    BadSignature,
+    SignatureExpired,
+    TimestampSigner,
+    URLSafeTimedSerializer,
+)
+
+from app.auth.signing import CachedURLSafeTimedSerializer, RotatingSerializer
+
+SECRET = "test-secret-key-min-32-chars-for-testing-purposes"
+OLD_SECRET = "previous-secret-key-min-32-chars-for-testing"
+
+
+def test_tokens_compatible_with_itsdangerous():
+    """Test tokens are interchangeable with stock URLSafeTimedSerializer (existing cookies stay valid)."""
+    stock = URLSafeTimedSerializer(SECRET, salt="csrf")
+    cached = CachedURLSafeTimedSerializer(SECRET, salt="csrf")
+
+    assert cached.loads(stock.dumps("session-1")) == "session-1"
+    assert stock.loads(cached.dumps({"user_id": 1})) == {"user_id": 1}
+
+
+def test_key_derived_once():
+    """Test the signing key is derived once rather than on every call."""
+    cached = CachedURLSafeTimedSerializer(SECRET)
+    with patch.object(
+        TimestampSigner,
+        "derive_key",
+        autospec=True,
+        side_effect=TimestampSigner.derive_key,
+    ) as derive:
+        for value in range(5):
+            assert cached.loads(cached.dumps(value)) == value
+    assert derive.call_count == 1
+
+
+def test_rotating_serializer_accepts_previous_secret():
+    """Test tokens signed with a previous secret verify and come back re-signed."""
+    old = RotatingSerializer(OLD_SECRET)
+    rotated = RotatingSerializer(SECRET, [OLD_SECRET])
+    token = old.dumps({"user_id": 1})
+
+    payload, resigned = rotated.loads_rotating(token)
+    assert payload == {"user_id": 1}
+    assert resigned is not None and resigned != token
+    # The re-signed token is current and keeps the original timestamp (no lifetime extension)
+    assert rotated.loads_rotating(resigned) == ({"user_id": 1}, None)
+    assert (
+        RotatingSerializer(SECRET).active.loads(resigned, return_timestamp=True)[1]
+        == old.active.loads(token, return_timestamp=True)[1]
+    )
+
+
+def test_rotating_serializer_rejects_unknown_secret():
+    """Test tokens from secrets that are neither active nor previous are rejected."""
+    token = RotatingSerializer("some-other-secret-that-was-never-configured").dumps("x")
+    with pytest.raises(BadSignature):
+        RotatingSerializer(SECRET, [OLD_SECRET]).loads(token)
+    with pytest.raises(BadSignature):
+        RotatingSerializer(SECRET).loads(RotatingSerializer(OLD_SECRET).dumps("x"))
+
+
+def test_rotating_serializer_keeps_expiry_for_previous_secret():
+    """Test max_age still applies to tokens signed with a previous secret."""
+    token = RotatingSerializer(OLD_SECRET).dumps("x")
+    with (
+        patch("itsdangerous.timed.time.time", return_value=time.time() + 120),
+        pytest.raises(SignatureExpired),
+    ):
+        RotatingSerializer(SECRET, [OLD_SECRET]).loads(token, max_age=60)
@@ -1,15 +1,20 @@
 """Pytest configuration and fixtures."""
 import os
+import re
+
 import pytest
+
+# Skip connection / argon2 warm-up on every TestClient startup (no network, faster tests)
+os.environ.setdefault("STARTUP_WARMUP", "false")
+from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from fastapi.testclient import TestClient
+
+from app.auth.password import hash_password
 from app.db import Base, get_db
 from app.main import app
 from app.models import User
-from app.auth.password import hash_password
-
 
 # Use in-memory SQLite for tests with StaticPool
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -49,6 +54,15 @@ def client(test_db):
     # Reset rate limiter before each test
     from app.routes.rate_limit import rate_limiter
     rate_limiter.attempts.clear()
+    # Login lockout / negative cache state is per process
+    from app.auth.login import login_pipeline
+    login_pipeline.reset()
+    # Entitlements are cached per process; each test has its own database
+    from app.omni.entitlements import entitlement_resolver
+    entitlement_resolver.invalidate()
+    # Prefetched embed URLs are keyed by user id, which restarts in every test database
+    from app.omni.prefetch import embed_url_cache
+    embed_url_cache.clear()
 
     with TestClient(app) as test_client:
         yield test_client
@@ -70,6 +84,17 @@ def test_user(test_db):
     return user
 
 
+@pytest.fixture
+def csrf_headers(client):
+    """Return a function building CSRF headers for the client's current session."""
+    def _csrf_headers() -> dict:
+        response = client.get("/me")
+        match = re.search(r'<meta name="csrf-token" content="([^"]+)"', response.text)
+        assert match, "CSRF token not rendered (not logged in?)"
+        return {"X-CSRF-Token": match.group(1)}
+    return _csrf_headers
+
+
 @pytest.fixture(autouse=True)
 def set_test_env():
     """Set test environment variables."""
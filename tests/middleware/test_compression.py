@@ -0,0 +1,105 @@
+"""Tests for response compression middleware."""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+LARGE_BODY = "購買分析レポート " * 200
+
+
+@pytest.fixture
+def compression_client():
+    """Create a client for a minimal app wrapped in CompressionMiddleware."""
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" * 500, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(10):
+                yield LARGE_BODY
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+def test_parse_accept_encoding():
+    """Test Accept-Encoding parsing honors q=0."""
+    assert parse_accept_encoding("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert parse_accept_encoding("gzip;q=0, br;q=0.5") == {"br"}
+    assert (
+        parse_accept_encoding("br; q=0.000, gzip;level=1;q=0, deflate;q=bogus")
+        == frozenset()
+    )
+
+
+def test_large_response_gzipped(compression_client):
+    """Test large text responses are gzip-compressed."""
+    response = compression_client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(LARGE_BODY.encode())
+    assert response.text == LARGE_BODY
+
+
+def test_brotli_preferred_when_available(compression_client):
+    """Test brotli is chosen when installed and accepted."""
+    brotli = pytest.importorskip("brotli")
+    response = compression_client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert brotli is not None
+
+
+def test_small_response_not_compressed(compression_client):
+    """Test responses below the threshold are sent as-is."""
+    response = compression_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+def test_incompressible_content_type_skipped(compression_client):
+    """Test binary content types are not compressed."""
+    response = compression_client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_no_accept_encoding(compression_client):
+    """Test identity responses when the client does not accept compression."""
+    response = compression_client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == LARGE_BODY
+
+
+def test_streaming_response_compressed(compression_client):
+    """Test streaming responses are compressed incrementally."""
+    with compression_client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == LARGE_BODY * 10
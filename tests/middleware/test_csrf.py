@@ -0,0 +1,116 @@
+"""Tests for CSRF token extraction and verification modes."""
+
+import asyncio
+import re
+
+from app.auth.csrf import DOUBLE_SUBMIT, csrf_protection
+from app.middleware.csrf import CSRFMiddleware, FormTokenScanner
+
+
+def login(client, test_user):
+    """Log in the test user."""
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
+def rendered_token(client) -> str:
+    """CSRF token rendered into the page for the current session."""
+    match = re.search(
+        r'<meta name="csrf-token" content="([^"]+)"', client.get("/me").text
+    )
+    assert match
+    return match.group(1)
+
+
+def test_scanner_finds_field_split_across_chunks():
+    """Test the form field is found even when split between body chunks."""
+    scanner = FormTokenScanner("csrf_token", limit=1024)
+    assert scanner.feed(b"a=1&csrf_to", more_body=True) is None
+    assert scanner.feed(b"ken=ab%2Bc", more_body=True) is None
+    assert scanner.feed(b"&b=2", more_body=True) == "ab+c"
+    assert scanner.done
+
+
+def test_scanner_gives_up_after_limit():
+    """Test scanning stops after the byte limit instead of reading the whole body."""
+    scanner = FormTokenScanner("csrf_token", limit=8)
+    assert scanner.feed(b"upload=" + b"x" * 16, more_body=True) is None
+    assert scanner.done
+
+
+def test_form_body_replayed_to_app():
+    """Test the bytes read while scanning still reach the application."""
+    messages = [
+        {"type": "http.request", "body": b"csrf_token=forged&", "more_body": True},
+        {"type": "http.request", "body": b"note=hello", "more_body": False},
+    ]
+    received = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message["body"])
+            if not message["more_body"]:
+                break
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/notes",
+        "headers": [(b"content-type", b"application/x-www-form-urlencoded")],
+    }
+    # No session cookie: the body passes through untouched
+    asyncio.run(CSRFMiddleware(app)(dict(scope), receive, send))
+    assert received == [b"csrf_token=forged&", b"note=hello"]
+
+
+def test_form_field_token_accepted(client, test_user):
+    """Test a urlencoded form post can carry the token instead of the header."""
+    login(client, test_user)
+    token = rendered_token(client)
+
+    response = client.post(
+        "/api/logout",
+        content=f"csrf_token={token}".encode(),
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 200
+
+
+def test_form_field_token_rejected_when_forged(client, test_user):
+    """Test a forged form token is rejected."""
+    login(client, test_user)
+
+    response = client.post(
+        "/api/logout",
+        content=b"csrf_token=forged",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Invalid CSRF token"
+
+
+def test_double_submit_mode(client, test_user, monkeypatch):
+    """Test double-submit mode issues a token cookie and compares it to the header."""
+    monkeypatch.setattr(csrf_protection, "mode", DOUBLE_SUBMIT)
+    login(client, test_user)
+    cookie = client.cookies.get(csrf_protection.cookie_name)
+    assert cookie
+
+    token = rendered_token(client)
+    assert token == cookie
+
+    response = client.post("/api/logout", headers={"X-CSRF-Token": "forged"})
+    assert response.status_code == 403
+
+    response = client.post("/api/logout", headers={"X-CSRF-Token": token})
+    assert response.status_code == 200
+    assert csrf_protection.cookie_name not in client.cookies
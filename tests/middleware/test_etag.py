@@ -0,0 +1,99 @@
+"""Tests for conditional GET (ETag / 304) middleware."""
+
+from app.auth.csrf import csrf_protection
+from app.auth.signing import CachedKeyTimestampSigner
+from app.middleware.etag import etag_matches
+
+
+def login(client, test_user):
+    """Log in the test user."""
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
+def test_etag_matches_weak_comparison():
+    """Test If-None-Match uses weak comparison and supports lists."""
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"xyz", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"xyz"', 'W/"abc"')
+
+
+def test_page_has_weak_etag(client):
+    """Test HTML pages carry a weak ETag and revalidation headers."""
+    response = client.get("/login")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert "Cookie" in response.headers["vary"]
+    assert "no-cache" in response.headers["cache-control"]
+
+
+def test_if_none_match_returns_304(client):
+    """Test a matching If-None-Match yields an empty 304."""
+    etag = client.get("/login").headers["etag"]
+
+    response = client.get("/login", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-type" not in response.headers
+
+
+def test_stale_etag_returns_full_response(client):
+    """Test a non-matching If-None-Match yields the full page."""
+    response = client.get("/login", headers={"If-None-Match": 'W/"stale"'})
+
+    assert response.status_code == 200
+    assert 'name="email"' in response.text
+
+
+def test_personalized_page_is_private_and_user_scoped(client, test_user):
+    """Test authenticated pages are private and the ETag is scoped to the session."""
+    anonymous_etag = client.get("/login").headers["etag"]
+    login(client, test_user)
+
+    response = client.get("/login")
+    assert response.headers["etag"] != anonymous_etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    me_response = client.get("/me")
+    assert me_response.status_code == 200
+    assert "private" in me_response.headers["cache-control"]
+
+
+def test_personalized_page_revalidates(client, test_user, monkeypatch):
+    """Test a logged-in page keeps its ETag across renders (the embedded CSRF token is stable)."""
+    import time
+
+    now = time.time()
+    monkeypatch.setattr(csrf_protection, "clock", lambda: now)
+    login(client, test_user)
+    etag = client.get("/me").headers["etag"]
+
+    # A few seconds later: every signature made now carries a different timestamp
+    monkeypatch.setattr(
+        CachedKeyTimestampSigner, "get_timestamp", lambda self: int(now) + 5
+    )
+    response = client.get("/me", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_api_json_conditional_get(client, test_user):
+    """Test JSON API responses support conditional GET."""
+    login(client, test_user)
+    etag = client.get("/api/me").headers["etag"]
+
+    response = client.get("/api/me", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_error_responses_have_no_etag(client):
+    """Test non-200 responses are not given validators."""
+    response = client.get("/api/me")
+    assert response.status_code == 401
+    assert "etag" not in response.headers
@@ -0,0 +1,91 @@
+"""Tests for re-signing session cookies after a secret rotation."""
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.auth.csrf import csrf_protection
+from app.auth.session import session_manager
+from app.auth.signing import RotatingSerializer
+from app.config import config
+from app.middleware.session import SessionRefreshMiddleware
+
+OLD_SECRET = "previous-secret-key-min-32-chars-for-testing"
+
+
+@pytest.fixture
+def rotated(monkeypatch):
+    """Session and CSRF serializers after rotating from OLD_SECRET to SESSION_SECRET."""
+    # cached_property values live in the instance __dict__
+    monkeypatch.setitem(
+        session_manager.__dict__,
+        "serializer",
+        RotatingSerializer(config.SESSION_SECRET, [OLD_SECRET]),
+    )
+    monkeypatch.setitem(
+        csrf_protection.__dict__,
+        "serializer",
+        RotatingSerializer(config.SESSION_SECRET, [OLD_SECRET], salt="csrf"),
+    )
+
+
+@pytest.fixture
+def client(rotated):
+    """A minimal app reading the session behind SessionRefreshMiddleware."""
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(request: Request):
+        return {"user_id": session_manager.get_user_id(request)}
+
+    @app.post("/logout")
+    async def logout(request: Request, response: Response):
+        session_manager.get_user_id(request)
+        session_manager.delete_session(response)
+        return {}
+
+    app.add_middleware(SessionRefreshMiddleware)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def old_cookie(user_id: int = 7) -> str:
+    return RotatingSerializer(OLD_SECRET).dumps({"user_id": user_id})
+
+
+def test_old_cookie_accepted_and_resigned(client):
+    """Test a cookie signed with the previous secret keeps the user logged in and is re-signed."""
+    client.cookies.set(config.SESSION_COOKIE_NAME, old_cookie())
+
+    response = client.get("/whoami")
+    assert response.json() == {"user_id": 7}
+    resigned = response.cookies.get(config.SESSION_COOKIE_NAME)
+    assert resigned
+    assert RotatingSerializer(config.SESSION_SECRET).loads(resigned) == {"user_id": 7}
+
+    # Already current: no further Set-Cookie
+    response = client.get("/whoami")
+    assert response.json() == {"user_id": 7}
+    assert "set-cookie" not in response.headers
+
+
+def test_logout_not_overridden_by_refresh(client):
+    """Test a route that deletes the session cookie wins over the refresh."""
+    client.cookies.set(config.SESSION_COOKIE_NAME, old_cookie())
+
+    response = client.post("/logout")
+    set_cookies = response.headers.get_list("set-cookie")
+    assert len(set_cookies) == 1
+    assert "Max-Age=0" in set_cookies[0]
+
+
+def test_csrf_token_survives_resigning(rotated):
+    """Test a CSRF token rendered before the cookie was re-signed still verifies."""
+    cookie = old_cookie()
+    token = csrf_protection.token_for(cookie, None)
+    resigned = session_manager.serializer.loads_rotating(cookie)[1]
+
+    assert csrf_protection.verify_request_token(token, resigned, None)
+    assert not csrf_protection.verify_request_token(
+        token, RotatingSerializer(config.SESSION_SECRET).dumps({"user_id": 8}), None
+    )
@@ -0,0 +1,111 @@
+"""Tests for the pure ASGI middleware stack."""
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.main import app
+from app.middleware.base import PathSet
+
+
+def login(client, test_user):
+    """Log in the test user."""
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
+def test_no_base_http_middleware():
+    """Test the stack contains no BaseHTTPMiddleware layers."""
+    for middleware in app.user_middleware:
+        assert not issubclass(middleware.cls, BaseHTTPMiddleware)
+
+
+def test_exempt_path_set():
+    """Test exemption matches exact paths and sub-paths only."""
+    exempt_paths = PathSet(("/healthz", "/static"))
+    assert "/healthz" in exempt_paths
+    assert "/static/css/app.css" in exempt_paths
+    assert "/staticfoo" not in exempt_paths
+    assert "/api/me" not in exempt_paths
+
+
+def test_request_id_generated(client):
+    """Test a request ID is generated and returned."""
+    response = client.get("/login")
+    assert len(response.headers["x-request-id"]) == 32
+
+
+def test_request_id_propagated(client):
+    """Test a valid upstream request ID is reused."""
+    response = client.get("/login", headers={"X-Request-ID": "lb-abc-123"})
+    assert response.headers["x-request-id"] == "lb-abc-123"
+
+
+def test_invalid_request_id_replaced(client):
+    """Test malformed upstream request IDs are replaced."""
+    response = client.get("/login", headers={"X-Request-ID": "bad id\twith spaces"})
+    assert response.headers["x-request-id"] != "bad id\twith spaces"
+
+
+def test_server_timing_header(client):
+    """Test handler latency is reported via Server-Timing."""
+    response = client.get("/login")
+    assert response.headers["server-timing"].startswith("app;dur=")
+
+
+def test_healthz_bypasses_stack(client):
+    """Test exempt paths skip request IDs, timing and ETags."""
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert "x-request-id" not in response.headers
+    assert "server-timing" not in response.headers
+    assert "etag" not in response.headers
+
+
+def test_csrf_required_with_session(client, test_user):
+    """Test state-changing requests with a session need a CSRF token."""
+    login(client, test_user)
+
+    response = client.post("/api/logout")
+    assert response.status_code == 403
+    assert response.json()["detail"] == "CSRF token missing"
+
+    response = client.post("/api/logout", headers={"X-CSRF-Token": "forged"})
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Invalid CSRF token"
+
+
+def test_csrf_token_accepted(client, test_user, csrf_headers):
+    """Test a token rendered into the page authorizes the request."""
+    login(client, test_user)
+
+    response = client.post("/api/logout", headers=csrf_headers())
+    assert response.status_code == 200
+
+
+def test_csrf_not_required_without_session(client):
+    """Test requests without a session fall through to authentication."""
+    response = client.post("/api/logout")
+    assert response.status_code == 401
+
+
+def test_login_exempt_from_csrf(client, test_user):
+    """Test logging in again with an existing session needs no token."""
+    login(client, test_user)
+    login(client, test_user)
+
+
+def test_rate_limit_rejects_before_body_parsing(client):
+    """Test the rate limiter rejects requests before the handler runs."""
+    for _ in range(5):
+        client.post(
+            "/api/login",
+            content=b"not json",
+            headers={"Content-Type": "application/json"},
+        )
+
+    response = client.post(
+        "/api/login", content=b"not json", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 429
+    assert "Too many requests" in response.json()["detail"]
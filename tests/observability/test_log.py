@@ -0,0 +1,126 @@
+"""Tests for structured logging."""
+
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from app.config import config
+from app.observability.log import (
+    JSONFormatter,
+    SamplingFilter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_stream(client):
+    """Capture the app's JSON logs (the listener is flushed by read_logs)."""
+    stream = io.StringIO()
+    shutdown_logging()
+    configure_logging(stream)
+    yield stream
+    shutdown_logging()
+
+
+def read_logs(stream: io.StringIO) -> list[dict]:
+    """Flush the queue listener and parse the captured lines."""
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def make_record(level=logging.INFO, name="app.access", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, "hello %s", ("world",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_context_and_extras():
+    """Test records render as one JSON object with context and extra fields."""
+    record = make_record(status=200)
+    record.context = {"request_id": "abc"}
+
+    data = json.loads(JSONFormatter().format(record))
+    assert data["message"] == "hello world"
+    assert data["level"] == "INFO"
+    assert data["request_id"] == "abc"
+    assert data["status"] == 200
+    assert "args" not in data
+
+
+def test_sampling_filter_keeps_warnings():
+    """Test sampling drops info access logs but never warnings."""
+    sampler = SamplingFilter(0.0, ("app.access",))
+    assert sampler.filter(make_record()) is False
+    assert sampler.filter(make_record(level=logging.WARNING)) is True
+    assert sampler.filter(make_record(name="app")) is True
+
+
+def test_access_log_has_request_context(client, test_user, log_stream):
+    """Test each request logs one line with request id, route, status and user."""
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    client.get("/api/me", headers={"X-Request-ID": "req-42"})
+
+    access = [
+        entry for entry in read_logs(log_stream) if entry["logger"] == "app.access"
+    ]
+    entry = access[-1]
+    assert entry["request_id"] == "req-42"
+    assert entry["route"] == "/api/me"
+    assert entry["status"] == 200
+    assert entry["user_id"] == test_user.id
+    assert entry["duration_ms"] >= 0
+    # Cookies and session tokens are never logged
+    assert "session" not in json.dumps(access)
+
+
+def test_slow_request_logged_as_warning(client, log_stream):
+    """Test requests over the threshold are logged as warnings."""
+    with patch.object(config, "LOG_SLOW_REQUEST_MS", 0):
+        client.get("/login")
+
+    entry = [
+        entry for entry in read_logs(log_stream) if entry["logger"] == "app.access"
+    ][-1]
+    assert entry["level"] == "WARNING"
+    assert entry["message"] == "slow request"
+
+
+def test_slow_query_logged_without_parameters(client, test_user, log_stream):
+    """Test slow queries log the statement but not bound parameters."""
+    with patch.object(config, "LOG_SLOW_QUERY_MS", 0):
+        client.post(
+            "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+        )
+
+    slow = [
+        entry
+        for entry in read_logs(log_stream)
+        if entry["logger"] == "app.db.slow_query"
+    ]
+    assert slow
+    assert "SELECT" in slow[0]["statement"]
+    assert test_user.email not in json.dumps(slow)
+
+
+@pytest.mark.asyncio
+async def test_unhandled_error_logged_with_traceback(log_stream):
+    """Test the global exception handler logs the traceback."""
+    from starlette.requests import Request
+
+    from app.main import global_exception_handler
+
+    request = Request({"type": "http", "method": "GET", "path": "/boom", "headers": []})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError as exc:
+        response = await global_exception_handler(request, exc)
+
+    assert response.status_code == 500
+    errors = [entry for entry in read_logs(log_stream) if entry["level"] == "ERROR"]
+    assert "RuntimeError: boom" in errors[-1]["exc_info"]
@@ -0,0 +1,95 @@
+"""Tests for event loop lag monitoring and the blocking-call detector."""
+
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.observability.loop import (
+    BlockingCallDetector,
+    LoopLagMonitor,
+    track_request,
+    untrack_request,
+)
+
+
+def block_the_loop(seconds: float) -> None:
+    """Synchronous work running on the event loop thread."""
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_measures_blocking():
+    """Test lag reflects time the loop was blocked and feeds the histogram."""
+    before = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    block_the_loop(0.15)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert REGISTRY.get_sample_value("event_loop_lag_seconds_count") > before
+    assert REGISTRY.get_sample_value(
+        "event_loop_lag_seconds_bucket", {"le": "0.1"}
+    ) < REGISTRY.get_sample_value("event_loop_lag_seconds_count")
+    assert not monitor.running
+
+
+@pytest.mark.asyncio
+async def test_detector_reports_blocking_stack_and_route():
+    """Test a stall is reported once with the blocking frame and the request route."""
+    detector = BlockingCallDetector(threshold=0.05)
+    detector.start()
+    task = track_request({"type": "http", "method": "POST", "path": "/api/login"})
+    try:
+        await asyncio.sleep(0.02)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.02)
+    finally:
+        untrack_request(task)
+        detector.stop()
+
+    assert len(detector.reports) == 1
+    report = detector.reports[0]
+    assert report["blocked_ms"] >= 50
+    assert report["method"] == "POST"
+    assert report["path"] == "/api/login"
+    assert "block_the_loop" in report["stack"]
+
+
+@pytest.mark.asyncio
+async def test_detector_quiet_when_loop_is_responsive():
+    """Test short callbacks do not produce reports."""
+    detector = BlockingCallDetector(threshold=0.1)
+    detector.start()
+    try:
+        for _ in range(10):
+            block_the_loop(0.005)
+            await asyncio.sleep(0.01)
+    finally:
+        detector.stop()
+
+    assert detector.reports == []
+
+
+def test_detector_attributes_route_template(client):
+    """Test stalls inside a request are attributed to its route template."""
+    from app.main import app
+    from app.observability.loop import blocking_call_detector
+
+    @app.get("/_test_blocking/{item_id}")
+    async def blocking_endpoint(item_id: int):
+        block_the_loop(0.3)
+        return {"ok": True}
+
+    try:
+        blocking_call_detector.reports = []
+        assert client.get("/_test_blocking/1").status_code == 200
+        report = blocking_call_detector.reports[-1]
+    finally:
+        app.router.routes.pop()
+
+    assert report["route"] == "/_test_blocking/{item_id}"
+    assert "blocking_endpoint" in report["stack"]
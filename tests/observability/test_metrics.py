@@ -0,0 +1,97 @@
+"""Tests for Prometheus metrics."""
+
+from prometheus_client import REGISTRY
+
+
+def sample(name: str, **labels) -> float:
+    """Current value of a metric sample (0 if not yet recorded)."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    """Test /metrics serves the Prometheus text format."""
+    monkeypatch.setattr("app.config.config.METRICS_TOKEN", "scrape-token")
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_requests_total" in response.text
+    assert "x-request-id" not in response.headers
+
+
+def test_metrics_requires_token(client, monkeypatch):
+    """Test /metrics is hidden without METRICS_TOKEN and refuses scrapes without it."""
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr("app.config.config.METRICS_TOKEN", "scrape-token")
+    assert client.get("/metrics").status_code == 403
+    assert (
+        client.get(
+            "/metrics", headers={"Authorization": "Bearer wrong-token"}
+        ).status_code
+        == 403
+    )
+
+
+def test_requests_labelled_by_route_template(client):
+    """Test request metrics use the route template, not the raw path."""
+    before = sample("http_requests_total", method="GET", route="/login", status="200")
+    client.get("/login")
+    after = sample("http_requests_total", method="GET", route="/login", status="200")
+    assert after == before + 1
+
+    duration_count = sample(
+        "http_request_duration_seconds_count", method="GET", route="/login"
+    )
+    assert duration_count >= 1
+
+
+def test_unmatched_routes_share_a_label(client):
+    """Test unknown paths do not create per-path label values."""
+    before = sample(
+        "http_requests_total", method="GET", route="<unmatched>", status="404"
+    )
+    client.get("/no-such-page-1")
+    client.get("/no-such-page-2")
+    after = sample(
+        "http_requests_total", method="GET", route="<unmatched>", status="404"
+    )
+    assert after == before + 2
+
+
+def test_exempt_paths_not_counted(client):
+    """Test health checks and scrapes are not counted."""
+    before = sample("http_requests_total", method="GET", route="/healthz", status="200")
+    client.get("/healthz")
+    assert (
+        sample("http_requests_total", method="GET", route="/healthz", status="200")
+        == before
+    )
+
+
+def test_password_and_db_metrics(client, test_user):
+    """Test a login records password verification and SQL statements."""
+    verify_before = sample("password_hash_duration_seconds_count", operation="verify")
+    select_before = sample("db_queries_total", statement="SELECT")
+
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+    assert (
+        sample("password_hash_duration_seconds_count", operation="verify")
+        == verify_before + 1
+    )
+    assert sample("db_queries_total", statement="SELECT") > select_before
+
+
+def test_rate_limit_rejections_counted(client):
+    """Test rate limiter rejections are counted per endpoint."""
+    before = sample("rate_limit_rejections_total", endpoint="login")
+    for _ in range(6):
+        response = client.post(
+            "/api/login",
+            json={"email": "nobody@example.com", "password": "wrongpassword"},
+        )
+    assert response.status_code == 429
+    assert sample("rate_limit_rejections_total", endpoint="login") == before + 1
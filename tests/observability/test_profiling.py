@@ -0,0 +1,158 @@
+"""Tests for on-demand profiling."""
+
+import marshal
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import config
+from app.main import app as main_app
+from app.middleware.profiling import ProfilingMiddleware
+from app.observability.profiling import SamplingProfiler, request_profile_path
+from app.routes import profiling
+
+TOKEN = "profiling-token-for-tests"
+AUTH = {"X-Profile-Token": TOKEN}
+
+
+@pytest.fixture
+def profiling_client(tmp_path):
+    """App with the profiling routes and middleware enabled."""
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiling.router)
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(range(10000))}
+
+    with (
+        patch.object(config, "PROFILING_TOKEN", TOKEN),
+        patch.object(config, "PROFILE_DIR", str(tmp_path)),
+        TestClient(app) as client,
+    ):
+        yield client
+
+
+def test_disabled_by_default():
+    """Test nothing is installed when PROFILING_TOKEN is unset."""
+    assert not config.PROFILING_TOKEN
+    assert not any(
+        middleware.cls is ProfilingMiddleware for middleware in main_app.user_middleware
+    )
+    assert not any(
+        getattr(route, "path", "").startswith("/debug") for route in main_app.routes
+    )
+
+
+def test_profile_requires_token(profiling_client):
+    """Test profiling endpoints reject missing or wrong tokens."""
+    assert profiling_client.get("/debug/profile?seconds=0.01").status_code == 403
+    response = profiling_client.get(
+        "/debug/profile?seconds=0.01", headers={"X-Profile-Token": "wrong"}
+    )
+    assert response.status_code == 403
+    assert profiling_client.get("/work", headers={"X-Profile": "1"}).status_code == 403
+
+
+def test_sampling_profile_returns_collapsed_stacks(profiling_client):
+    """Test sampling mode returns flamegraph-compatible collapsed stacks."""
+    response = profiling_client.get("/debug/profile?seconds=0.1", headers=AUTH)
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert ";" in stack
+
+
+def test_cprofile_returns_pstats(profiling_client):
+    """Test cProfile mode returns loadable pstats data."""
+    response = profiling_client.get(
+        "/debug/profile?seconds=0.05&mode=cprofile&format=pstats", headers=AUTH
+    )
+    assert response.status_code == 200
+    assert isinstance(marshal.loads(response.content), dict)
+
+    response = profiling_client.get(
+        "/debug/profile?seconds=0.05&mode=cprofile&format=text", headers=AUTH
+    )
+    assert "cumulative" in response.text
+
+
+def test_invalid_mode_format_combination(profiling_client):
+    """Test collapsed stacks are only offered for sampling mode."""
+    response = profiling_client.get(
+        "/debug/profile?mode=cprofile&format=collapsed", headers=AUTH
+    )
+    assert response.status_code == 400
+
+
+def test_per_request_profile(profiling_client):
+    """Test X-Profile profiles one request and stores the result for download."""
+    response = profiling_client.get("/work", headers={"X-Profile": "1", **AUTH})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    download = profiling_client.get(
+        f"/debug/profile/requests/{profile_id}?format=text", headers=AUTH
+    )
+    assert download.status_code == 200
+    assert "function calls" in download.text
+
+
+def test_per_request_profiles_capped(profiling_client):
+    """Test only the newest PROFILE_MAX_FILES per-request profiles are kept."""
+    with patch.object(config, "PROFILE_MAX_FILES", 2):
+        profile_ids = [
+            profiling_client.get("/work", headers={"X-Profile": "1", **AUTH}).headers[
+                "x-profile-id"
+            ]
+            for _ in range(4)
+        ]
+        assert sorted(os.listdir(config.PROFILE_DIR)) == sorted(
+            f"{profile_id}.pstats" for profile_id in profile_ids[2:]
+        )
+    assert (
+        profiling_client.get(
+            f"/debug/profile/requests/{profile_ids[0]}", headers=AUTH
+        ).status_code
+        == 404
+    )
+
+
+def test_profile_id_cannot_escape_directory():
+    """Test stored profile lookups reject path traversal."""
+    with pytest.raises(ValueError):
+        request_profile_path("../secrets")
+    with pytest.raises(ValueError):
+        request_profile_path("..")
+
+
+def test_sampling_profiler_sees_busy_thread():
+    """Test the sampler records stacks of other threads."""
+    import threading
+    import time
+
+    stop = threading.Event()
+
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_loop, name="busy")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    time.sleep(0.05)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profiler.samples > 0
+    assert any(
+        stack.startswith("busy;") and "busy_loop" in stack for stack in profiler.stacks
+    )
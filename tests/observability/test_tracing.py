@@ -0,0 +1,182 @@
+"""Tests for request tracing."""
+
+import json
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.observability.tracing import (
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+    parse_traceparent,
+    tracer,
+)
+
+INCOMING_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+INCOMING_TRACEPARENT = f"00-{INCOMING_TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def exporter():
+    """Route the app tracer to an in-memory collector."""
+    collector = InMemoryExporter()
+    with (
+        patch.object(tracer, "exporter", collector),
+        patch.object(tracer, "sample_rate", 1.0),
+    ):
+        yield collector
+
+
+def login(client, test_user):
+    """Log in the test user."""
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
+def test_parse_traceparent():
+    """Test W3C traceparent parsing."""
+    assert parse_traceparent(INCOMING_TRACEPARENT) == (
+        INCOMING_TRACE_ID,
+        "00f067aa0ba902b7",
+        True,
+    )
+    assert parse_traceparent(f"00-{INCOMING_TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_child_spans_share_trace():
+    """Test nested spans form a parent/child chain."""
+    collector = InMemoryExporter()
+    local_tracer = Tracer(exporter=collector)
+
+    with local_tracer.span("parent") as parent, local_tracer.span("child") as child:
+        assert local_tracer.current_span() is child
+
+    assert collector.names() == ["child", "parent"]
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert child.duration_ms is not None
+
+
+def test_unsampled_traces_not_exported():
+    """Test a zero sample rate drops new traces."""
+    collector = InMemoryExporter()
+    local_tracer = Tracer(exporter=collector, sample_rate=0.0)
+
+    with local_tracer.span("parent"), local_tracer.span("child"):
+        pass
+
+    assert collector.spans == []
+
+
+def test_disabled_tracer_yields_none():
+    """Test tracing without an exporter is a no-op."""
+    with Tracer().span("anything") as span:
+        assert span is None
+
+
+def test_error_recorded():
+    """Test an exception marks the span as failed."""
+    collector = InMemoryExporter()
+    local_tracer = Tracer(exporter=collector)
+
+    with pytest.raises(ValueError), local_tracer.span("failing"):
+        raise ValueError("boom")
+
+    assert collector.spans[0].status == "error"
+    assert collector.spans[0].attributes["error.type"] == "ValueError"
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Test spans are appended to the trace file as JSON lines."""
+    path = tmp_path / "traces" / "spans.jsonl"
+    local_tracer = Tracer(exporter=FileExporter(str(path)))
+
+    with local_tracer.span("one", user_id=1):
+        pass
+    with local_tracer.span("two"):
+        pass
+    local_tracer.shutdown()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["one", "two"]
+    assert records[0]["attributes"] == {"user_id": 1}
+
+
+def test_file_exporter_does_not_write_on_export(tmp_path, monkeypatch):
+    """Test export() leaves the file to the writer thread (nothing blocks the caller)."""
+    path = tmp_path / "spans.jsonl"
+    exporter = FileExporter(str(path))
+    writer_threads = []
+    real_write = exporter._write
+
+    def write(spans):
+        writer_threads.append(threading.current_thread())
+        real_write(spans)
+
+    monkeypatch.setattr(exporter, "_write", write)
+    local_tracer = Tracer(exporter=exporter)
+    for index in range(100):
+        with local_tracer.span("span", index=index):
+            pass
+    local_tracer.shutdown()
+
+    assert threading.current_thread() not in writer_threads
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["attributes"]["index"] for record in records] == list(range(100))
+
+
+def test_embed_url_request_spans(client, test_user, exporter):
+    """Test the embed URL request is broken down into stage spans."""
+    login(client, test_user)
+    exporter.clear()
+    captured = {}
+
+    async def fake_post(self, url, json=None, headers=None, timeout=None):
+        captured["headers"] = headers
+        return httpx.Response(
+            200,
+            json={"url": "https://test.omni.co/embed/x"},
+            request=httpx.Request("POST", url),
+        )
+
+    with patch.object(httpx.AsyncClient, "post", new=fake_post):
+        response = client.get(
+            "/api/embed/url?content_path=/dashboards/test",
+            headers={"traceparent": INCOMING_TRACEPARENT},
+        )
+    assert response.status_code == 200
+
+    spans = {span.name: span for span in exporter.spans}
+    server = spans["GET /api/embed/url"]
+    assert server.trace_id == INCOMING_TRACE_ID
+    assert server.parent_id == "00f067aa0ba902b7"
+    assert server.attributes["http.status_code"] == 200
+    for name in (
+        "session.decode",
+        "db.select_user",
+        "omni.generate_embed_url",
+        "audit.write",
+    ):
+        assert spans[name].trace_id == INCOMING_TRACE_ID
+        assert spans[name].parent_id == server.span_id
+
+    # The outbound Omni call continues the trace from the Omni span
+    omni_span = spans["omni.generate_embed_url"]
+    assert captured["headers"]["traceparent"] == omni_span.traceparent
+    # The signed URL never ends up in span data
+    assert "embed/x" not in repr([span.to_dict() for span in exporter.spans])
+
+
+def test_exempt_paths_not_traced(client, exporter):
+    """Test health checks are not traced."""
+    client.get("/healthz")
+    assert exporter.spans == []
@@ -0,0 +1,131 @@
+"""Tests for the compiled content path allowlist."""
+
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.omni.allowlist import CompiledAllowlist, ContentAllowlist, is_safe_path
+
+
+def test_exact_prefix_and_glob_entries():
+    """Test each entry form matches what it should and nothing more."""
+    allowlist = CompiledAllowlist(
+        [
+            "/dashboards/abc123",
+            "/dashboards/shared/**",
+            "/dashboards/sales-*",
+            "/reports/q[1-4]",
+        ]
+    )
+    assert "/dashboards/abc123" in allowlist
+    assert "/dashboards/abc1234" not in allowlist
+
+    assert "/dashboards/shared" in allowlist
+    assert "/dashboards/shared/team/overview" in allowlist
+    assert "/dashboards/sharedx" not in allowlist
+
+    assert "/dashboards/sales-emea" in allowlist
+    assert "/dashboards/sales-emea/secret" not in allowlist  # * stays within a segment
+    assert "/dashboards/marketing" not in allowlist
+
+    assert "/reports/q3" in allowlist
+    assert "/reports/q5" not in allowlist
+    assert len(allowlist) == 4
+
+
+def test_unsafe_paths_rejected():
+    """Test traversal and query tricks cannot widen a prefix or glob."""
+    assert is_safe_path("/dashboards/shared/a")
+    for path in (
+        "dashboards/a",
+        "/dashboards/shared/../admin",
+        "/dashboards//a",
+        "/dashboards/sales-x?y=1",
+        "/a/./b",
+    ):
+        assert not is_safe_path(path)
+
+    allowlist = ContentAllowlist()
+    with patch(
+        "app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/shared/**"]
+    ):
+        assert allowlist.allows("/dashboards/shared/a")
+        assert not allowlist.allows("/dashboards/shared/../../admin")
+
+
+def test_follows_config_changes():
+    """Test the default list is recompiled when the configured list is replaced."""
+    allowlist = ContentAllowlist()
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/a"]):
+        assert allowlist.allows("/dashboards/a")
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/b"]):
+        assert not allowlist.allows("/dashboards/a")
+        assert allowlist.allows("/dashboards/b")
+
+
+def test_per_customer_file_and_hot_reload(tmp_path):
+    """Test customer entries apply only to that customer and file edits are picked up."""
+    path = tmp_path / "allowlist.json"
+    path.write_text(
+        json.dumps(
+            {
+                "default": ["/dashboards/common"],
+                "customers": {"acme": ["/dashboards/acme/**"]},
+            }
+        )
+    )
+    allowlist = ContentAllowlist(path=str(path), reload_interval=0)
+
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", []):
+        assert allowlist.allows("/dashboards/common", "globex")
+        assert allowlist.allows("/dashboards/acme/sales", "acme")
+        assert not allowlist.allows("/dashboards/acme/sales", "globex")
+
+        path.write_text(json.dumps({"customers": {"globex": ["/dashboards/acme/**"]}}))
+        os.utime(path, (1, 1))
+        assert not allowlist.allows("/dashboards/common", "globex")
+        assert allowlist.allows("/dashboards/acme/sales", "globex")
+
+
+def test_broken_file_keeps_last_good_allowlist(tmp_path):
+    """Test a bad edit does not empty the allowlist."""
+    path = tmp_path / "allowlist.json"
+    path.write_text(json.dumps({"default": ["/dashboards/common"]}))
+    allowlist = ContentAllowlist(path=str(path), reload_interval=0)
+
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", []):
+        assert allowlist.allows("/dashboards/common")
+        path.write_text("{not json")
+        os.utime(path, (1, 1))
+        assert allowlist.allows("/dashboards/common")
+
+
+@pytest.mark.asyncio
+async def test_started_allowlist_reloads_off_the_request_path(tmp_path):
+    """Test once started, lookups never read the file and edits arrive from the background task."""
+    path = tmp_path / "allowlist.json"
+    path.write_text(json.dumps({"default": ["/dashboards/common"]}))
+    allowlist = ContentAllowlist(path=str(path), reload_interval=0.01)
+
+    def inline_reload():
+        raise AssertionError("file checked on the request path")
+
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", []):
+        await allowlist.start()
+        try:
+            allowlist._reload_file_if_changed = inline_reload
+            assert allowlist.allows("/dashboards/common")
+
+            path.write_text(json.dumps({"default": ["/dashboards/new"]}))
+            os.utime(path, (1, 1))
+            for _ in range(100):
+                if allowlist.allows("/dashboards/new"):
+                    break
+                await asyncio.sleep(0.01)
+            assert allowlist.allows("/dashboards/new")
+            assert not allowlist.allows("/dashboards/common")
+        finally:
+            await allowlist.stop()
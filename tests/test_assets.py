@@ -0,0 +1,149 @@
+"""Tests for the static asset pipeline."""
+
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    AssetManifest,
+    FingerprintedStaticFiles,
+    precompress_assets,
+)
+
+CSS = "body { color: #333; }\n" * 100
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    """Create a client serving a temporary static directory."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "app.css").write_text(CSS)
+
+    manifest = AssetManifest(tmp_path)
+    manifest.build()
+
+    app = FastAPI()
+    app.mount(
+        "/static", FingerprintedStaticFiles(directory=tmp_path, manifest=manifest)
+    )
+    with TestClient(app) as client:
+        yield client, manifest, tmp_path
+
+
+def test_url_is_fingerprinted(static_client):
+    """Test asset URLs embed a content hash."""
+    _, manifest, _ = static_client
+
+    url = manifest.url("css/app.css")
+    assert url.startswith("/static/css/app.")
+    assert url.endswith(".css")
+    assert url != "/static/css/app.css"
+
+
+def test_fingerprint_changes_with_content(static_client):
+    """Test the fingerprint changes when the asset changes."""
+    _, manifest, static_dir = static_client
+    old_url = manifest.url("css/app.css")
+
+    (static_dir / "css" / "app.css").write_text(CSS + "a { color: red; }\n")
+    manifest.build()
+
+    assert manifest.url("css/app.css") != old_url
+
+
+def test_fingerprinted_asset_is_immutable(static_client):
+    """Test fingerprinted assets are served with long-lived caching."""
+    client, manifest, _ = static_client
+
+    response = client.get(manifest.url("css/app.css"))
+    assert response.status_code == 200
+    assert response.text == CSS
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_unhashed_asset_must_revalidate(static_client):
+    """Test plain asset URLs are not cached as immutable."""
+    client, _, _ = static_client
+
+    response = client.get("/static/css/app.css")
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+
+
+def test_stale_fingerprint_must_revalidate(static_client):
+    """Test an outdated fingerprint serves current content without immutable caching."""
+    client, _, _ = static_client
+
+    response = client.get("/static/css/app.000000000000.css")
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+
+
+def test_precompressed_variant_served(static_client):
+    """Test the .gz sibling is served when the client accepts gzip."""
+    client, manifest, static_dir = static_client
+    assert precompress_assets(static_dir) >= 1
+    assert (static_dir / "css" / "app.css.gz").exists()
+
+    response = client.get(
+        manifest.url("css/app.css"), headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert "Accept-Encoding" in response.headers["vary"]
+    # httpx transparently decodes the body
+    assert response.text == CSS
+    assert int(response.headers["content-length"]) == len(
+        gzip.compress(CSS.encode(), mtime=0, compresslevel=9)
+    )
+
+
+def test_refused_encoding_not_served(static_client):
+    """Test an encoding refused with q=0 is never served, whatever the coding."""
+    client, manifest, static_dir = static_client
+    precompress_assets(static_dir)
+    for accept_encoding in ("gzip;q=0", "br;q=0, gzip; q=0.0", "gzip;q=0, identity"):
+        response = client.get(
+            manifest.url("css/app.css"), headers={"Accept-Encoding": accept_encoding}
+        )
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.text == CSS
+
+
+def test_stale_precompressed_variant_not_served(static_client):
+    """Test a .gz left over from before the source changed is ignored."""
+    client, manifest, static_dir = static_client
+    precompress_assets(static_dir)
+    source = static_dir / "css" / "app.css"
+    source.write_text(CSS + "a { color: red; }\n")
+    stale = os.stat(source).st_mtime - 10
+    for suffix in (".gz", ".br"):
+        sibling = source.with_name(source.name + suffix)
+        if sibling.exists():
+            os.utime(sibling, (stale, stale))
+    manifest.build()
+
+    response = client.get(
+        manifest.url("css/app.css"), headers={"Accept-Encoding": "br, gzip"}
+    )
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.text == CSS + "a { color: red; }\n"
+
+
+def test_pages_reference_self_hosted_assets(client):
+    """Test pages load CSS and htmx from fingerprinted local URLs."""
+    response = client.get("/login")
+    assert response.status_code == 200
+
+    html_content = response.text
+    assert "<style>" not in html_content
+    assert "unpkg.com" not in html_content
+    assert "/static/css/app." in html_content
+    assert "/static/js/htmx." in html_content
@@ -105,7 +105,7 @@ def test_get_current_user_not_authenticated(client):
     assert response.json()["detail"] == "Authentication required"
 
 
-def test_logout(client, test_user):
+def test_logout(client, test_user, csrf_headers):
     """Test logout."""
     # Login first
     login_response = client.post("/api/login", json={
@@ -114,8 +114,8 @@ def test_logout(client, test_user):
     })
     assert login_response.status_code == 200
 
-    # Logout
-    logout_response = client.post("/api/logout")
+    # Logout (state-changing request with a session requires a CSRF token)
+    logout_response = client.post("/api/logout", headers=csrf_headers())
     assert logout_response.status_code == 200
     assert logout_response.json()["message"] == "Logout successful"
 
@@ -0,0 +1,139 @@
+"""Tests for the dashboard catalog index."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.omni.catalog import (
+    CatalogEntry,
+    CatalogIndex,
+    FileCatalogSource,
+    catalog_index,
+)
+from app.omni.entitlements import CustomerEntitlements, Dashboard
+
+CATALOG = [
+    {
+        "content_path": "/dashboards/test",
+        "title": "Test dashboard",
+        "thumbnail_url": "https://test.omni.co/thumb/test.png",
+    },
+    {
+        "content_path": "/dashboards/entitled",
+        "title": "Catalog title",
+        "thumbnail_url": "https://test.omni.co/thumb/e.png",
+    },
+    {"content_path": "/dashboards/hidden", "title": "Not allowed"},
+]
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(CATALOG))
+    return path
+
+
+def entitled(*paths: str) -> CustomerEntitlements:
+    dashboards = tuple(Dashboard(path, f"Entitled {path}") for path in paths)
+    return CustomerEntitlements(
+        dashboards, {dashboard.content_path: dashboard for dashboard in dashboards}
+    )
+
+
+def test_customer_view_entitlements_replace_allowlist(catalog_file):
+    """Test an entitled customer sees exactly its entitlements (with catalog thumbnails), others the allowlist."""
+    index = CatalogIndex(FileCatalogSource(str(catalog_file)))
+    assert asyncio.run(index.refresh())
+
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/test"]):
+        view = index.for_customer("acme", entitled("/dashboards/entitled"))
+        unentitled = index.for_customer("other", entitled())
+
+    assert [entry.content_path for entry in view] == ["/dashboards/entitled"]
+    assert [entry.content_path for entry in unentitled] == ["/dashboards/test"]
+    assert view[0].title == "Entitled /dashboards/entitled"
+    assert view[0].thumbnail_url == "https://test.omni.co/thumb/e.png"
+
+
+def test_customer_view_cached(catalog_file):
+    """Test a repeat view does not rescan the catalog until something changes."""
+    index = CatalogIndex(FileCatalogSource(str(catalog_file)))
+    asyncio.run(index.refresh())
+    entitlements = entitled()
+
+    with (
+        patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/test"]),
+        patch(
+            "app.omni.catalog.content_allowlist.allows",
+            wraps=lambda path, customer_id: path == "/dashboards/test",
+        ) as allows,
+    ):
+        first = index.for_customer("acme", entitlements)
+        scanned = allows.call_count
+        assert index.for_customer("acme", entitlements) is first
+        assert allows.call_count == scanned
+
+        asyncio.run(index.refresh())
+        index.for_customer("acme", entitlements)
+        assert allows.call_count == 2 * scanned
+
+
+def test_failed_refresh_keeps_index(catalog_file):
+    """Test a broken source leaves the last good index in place."""
+    index = CatalogIndex(FileCatalogSource(str(catalog_file)))
+    asyncio.run(index.refresh())
+    catalog_file.write_text("[{broken")
+
+    assert not asyncio.run(index.refresh())
+    assert index.entries["/dashboards/test"] == CatalogEntry(
+        "/dashboards/test", "Test dashboard", "https://test.omni.co/thumb/test.png"
+    )
+
+
+def test_refresh_does_not_hide_bugs():
+    """Test only source errors keep the last index; unexpected exceptions propagate."""
+
+    class BrokenSource:
+        async def fetch(self):
+            raise AttributeError("bug")
+
+    with pytest.raises(AttributeError):
+        asyncio.run(CatalogIndex(BrokenSource()).refresh())
+
+
+def test_background_refresh(catalog_file):
+    """Test the index is loaded on start and refreshed in the background."""
+
+    async def scenario():
+        index = CatalogIndex(
+            FileCatalogSource(str(catalog_file)), refresh_interval=0.01
+        )
+        await index.start()
+        version = index.version
+        await asyncio.sleep(0.05)
+        await index.stop()
+        return version, index.version
+
+    first, later = asyncio.run(scenario())
+    assert first == 1
+    assert later > first
+
+
+def test_me_page_renders_catalog(client, test_user, catalog_file, monkeypatch):
+    """Test /me lists allowed dashboards with titles and thumbnails."""
+    # Restored after the test (refresh() replaces both)
+    monkeypatch.setattr(catalog_index, "source", FileCatalogSource(str(catalog_file)))
+    monkeypatch.setattr(catalog_index, "entries", {})
+    asyncio.run(catalog_index.refresh())
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+
+    with patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/test"]):
+        response = client.get("/me")
+    assert "Test dashboard" in response.text
+    assert "https://test.omni.co/thumb/test.png" in response.text
+    assert "Not allowed" not in response.text
@@ -0,0 +1,173 @@
+"""Tests for the Omni circuit breaker."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.omni.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.omni.client import OmniClient
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    """Test the circuit opens at the failure threshold."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_success_resets_failure_count():
+    """Test failures must be consecutive."""
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_trial():
+    """Test one trial call after the reset timeout, closing on success."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.retry_after() == 10
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens():
+    """Test a failed trial call re-opens the circuit for another timeout."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == 10
+
+
+@pytest.mark.asyncio
+async def test_client_trips_on_server_errors_only():
+    """Test 5xx and connection errors count as failures, 4xx does not."""
+    client = OmniClient()
+    client.base_url = "https://omni.test"
+    client.circuit_breaker = CircuitBreaker(failure_threshold=2)
+    responses = iter([400, 500])
+
+    async def fake_post(self, url, **kwargs):
+        return httpx.Response(next(responses), request=httpx.Request("POST", url))
+
+    async def failing_post(self, url, **kwargs):
+        raise httpx.ConnectError("refused")
+
+    with patch.object(httpx.AsyncClient, "post", new=fake_post):
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.generate_embed_url(
+                    "/dashboards/test", "c1", "a@example.com"
+                )
+    assert client.circuit_breaker.failures == 1
+
+    with (
+        patch.object(httpx.AsyncClient, "post", new=failing_post),
+        pytest.raises(httpx.ConnectError),
+    ):
+        await client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+
+
+def test_embed_url_returns_503_when_circuit_open(client, test_user):
+    """Test the API fails fast with Retry-After while the circuit is open."""
+    from app.omni.client import omni_client
+
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    breaker = omni_client.circuit_breaker
+    with (
+        patch.object(breaker, "_state", breaker.OPEN),
+        patch.object(breaker, "opened_at", breaker.clock()),
+    ):
+        response = client.get("/api/embed/url?content_path=/dashboards/test")
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_released_trial_allows_another():
+    """Test a trial that ends without a verdict frees the slot, but only while half-open."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request() is True
+    breaker.release_trial()
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+    breaker.release_trial()
+    assert breaker.allow_request() is False
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_call_does_not_jam_breaker():
+    """Test cancelling the half-open trial call (e.g. client disconnect) lets the next call through."""
+    clock = FakeClock()
+    client = OmniClient()
+    client.base_url = "https://omni.test"
+    client.circuit_breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    client.circuit_breaker.record_failure()
+    clock.now = 10
+    started = asyncio.Event()
+
+    async def hanging_post(self, url, **kwargs):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def ok_post(self, url, **kwargs):
+        return httpx.Response(
+            200,
+            json={"url": "https://omni.test/embed/x"},
+            request=httpx.Request("POST", url),
+        )
+
+    with patch.object(httpx.AsyncClient, "post", new=hanging_post):
+        trial = asyncio.create_task(
+            client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+        )
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+    assert client.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+
+    with patch.object(httpx.AsyncClient, "post", new=ok_post):
+        assert await client.generate_embed_url(
+            "/dashboards/test", "c1", "a@example.com"
+        ) == {"url": "https://omni.test/embed/x"}
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
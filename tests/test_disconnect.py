@@ -0,0 +1,158 @@
+"""Tests for cancelling request work when the client disconnects."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.config import config
+from app.main import app
+from app.models import AuditLog
+from app.routes.disconnect import CLIENT_CLOSED_REQUEST, cancel_on_disconnect
+
+
+class Connection:
+    """ASGI receive channel whose client disconnects when told to."""
+
+    def __init__(self):
+        self.gone = asyncio.Event()
+        self.body_sent = False
+
+    async def receive(self) -> dict:
+        if not self.body_sent:
+            self.body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+
+def make_request(connection: Connection) -> Request:
+    return Request(
+        {"type": "http", "method": "GET", "path": "/", "headers": []},
+        connection.receive,
+    )
+
+
+@pytest.mark.asyncio
+async def test_work_cancelled_on_disconnect():
+    """Test the client leaving cancels the work and answers 499."""
+    connection = Connection()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    pending = asyncio.create_task(
+        cancel_on_disconnect(make_request(connection), slow(), "test")
+    )
+    await asyncio.sleep(0.01)
+    connection.gone.set()
+    with pytest.raises(HTTPException) as exc_info:
+        await asyncio.wait_for(pending, 1)
+    assert exc_info.value.status_code == CLIENT_CLOSED_REQUEST
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_result_returned_while_connected():
+    """Test work that finishes first returns normally and errors propagate."""
+
+    async def fast():
+        return "ok"
+
+    async def failing():
+        raise ValueError("boom")
+
+    assert (
+        await cancel_on_disconnect(make_request(Connection()), fast(), "test") == "ok"
+    )
+    with pytest.raises(ValueError):
+        await cancel_on_disconnect(make_request(Connection()), failing(), "test")
+
+
+@pytest.mark.asyncio
+async def test_shared_prefetch_survives_disconnect():
+    """Test a request that joined an in-flight prefetch leaves it running when the client leaves."""
+    from app.omni.prefetch import EmbedURLCache
+
+    cache = EmbedURLCache(ttl=60)
+    release = asyncio.Event()
+
+    async def prefetch():
+        await release.wait()
+        return "https://omni/shared"
+
+    shared = cache.fill("k", prefetch)
+    connection = Connection()
+    pending = asyncio.create_task(
+        cancel_on_disconnect(
+            make_request(connection), cache.get_or_generate("k", prefetch), "test"
+        )
+    )
+    await asyncio.sleep(0.01)
+    connection.gone.set()
+    with pytest.raises(HTTPException):
+        await pending
+
+    assert not shared.cancelled()
+    release.set()
+    await shared
+    assert cache.take("k") == "https://omni/shared"
+
+
+@pytest.mark.asyncio
+async def test_embed_url_abandoned_without_audit(client, test_db, test_user):
+    """Test /api/embed/url stops waiting on Omni and writes no audit row when the browser leaves."""
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    cookie = client.cookies.get(config.SESSION_COOKIE_NAME)
+    omni_cancelled = asyncio.Event()
+
+    async def slow_omni(*args, **kwargs):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            omni_cancelled.set()
+            raise
+
+    connection = Connection()
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/embed/url",
+        "raw_path": b"/api/embed/url",
+        "root_path": "",
+        "query_string": b"content_path=/dashboards/test",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"cookie", f"{config.SESSION_COOKIE_NAME}={cookie}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    with patch("app.omni.client.omni_client.generate_embed_url", new=slow_omni):
+        pending = asyncio.create_task(app(scope, connection.receive, send))
+        await asyncio.sleep(0.05)
+        connection.gone.set()
+        await asyncio.wait_for(pending, 1)
+
+    assert omni_cancelled.is_set()
+    assert sent[0]["status"] == CLIENT_CLOSED_REQUEST
+    assert (
+        test_db.query(AuditLog).filter(AuditLog.action == "generate_embed_url").count()
+        == 0
+    )
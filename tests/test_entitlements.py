@@ -0,0 +1,160 @@
+"""Tests for per-customer entitlements and their cache."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Entitlement
+from app.omni.entitlements import EntitlementResolver, entitlement_resolver
+
+
+@pytest.fixture
+def query_count(test_db):
+    """Count SELECTs on the entitlements table."""
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if "FROM entitlements" in statement:
+            statements.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield lambda: len(statements)
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def grant(db, customer_id, content_path, title="Sales", attributes=None):
+    db.add(
+        Entitlement(
+            customer_id=customer_id,
+            content_path=content_path,
+            title=title,
+            attributes=json.dumps(attributes) if attributes else None,
+        )
+    )
+    db.commit()
+
+
+def login(client, test_user):
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
+def test_lookups_cached(test_db, query_count):
+    """Test repeated lookups (including for customers without entitlements) hit the DB once."""
+    resolver = EntitlementResolver(ttl=60)
+    grant(test_db, "acme", "/dashboards/acme")
+
+    for _ in range(3):
+        assert resolver.get(test_db, "acme").get("/dashboards/acme").title == "Sales"
+        assert resolver.get(test_db, "nobody").dashboards == ()
+    assert query_count() == 2
+
+
+def test_invalidated_on_commit(test_db, query_count):
+    """Test committed changes are visible on the next lookup; rolled back ones are not."""
+    entitlement_resolver.invalidate()
+    assert entitlement_resolver.get(test_db, "acme").dashboards == ()
+
+    grant(test_db, "acme", "/dashboards/acme")
+    assert [
+        d.content_path for d in entitlement_resolver.get(test_db, "acme").dashboards
+    ] == ["/dashboards/acme"]
+
+    test_db.add(
+        Entitlement(customer_id="acme", content_path="/dashboards/other", title="Other")
+    )
+    test_db.flush()
+    test_db.rollback()
+    entitlement_resolver.get(test_db, "acme")
+    assert query_count() == 2
+
+
+def test_embed_allowed_by_entitlement(client, test_db, test_user):
+    """Test an entitled path can be embedded and its attributes are passed to Omni."""
+    grant(
+        test_db,
+        test_user.customer_id,
+        "/dashboards/entitled",
+        attributes={"region": "emea"},
+    )
+    login(client, test_user)
+    captured = {}
+
+    async def mock_generate(*args, **kwargs):
+        captured.update(kwargs)
+        return {"url": "https://test.omni.co/embed/x?token=abc"}
+
+    with patch("app.omni.client.omni_client.generate_embed_url", new=mock_generate):
+        response = client.get("/api/embed/url?content_path=/dashboards/entitled")
+        assert response.status_code == 200
+        assert captured["user_attributes"] == {"region": "emea"}
+
+        # Another customer's entitlement does not apply
+        grant(test_db, "someone-else", "/dashboards/private")
+        response = client.get("/api/embed/url?content_path=/dashboards/private")
+        assert response.status_code == 400
+
+
+def test_entitlements_replace_global_allowlist(client, test_db, test_user):
+    """Test a customer with entitlements can no longer embed paths only the global allowlist allows."""
+    login(client, test_user)
+
+    async def mock_generate(*args, **kwargs):
+        return {"url": "https://test.omni.co/embed/x?token=abc"}
+
+    with patch("app.omni.client.omni_client.generate_embed_url", new=mock_generate):
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/test").status_code
+            == 200
+        )
+        grant(test_db, test_user.customer_id, "/dashboards/entitled")
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/test").status_code
+            == 400
+        )
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/entitled").status_code
+            == 200
+        )
+
+
+def test_entitlements_only_deployment(client, test_db, test_user, monkeypatch):
+    """Test an empty global allowlist is a valid configuration when customers have entitlements."""
+    monkeypatch.setattr("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", [])
+    grant(test_db, test_user.customer_id, "/dashboards/entitled")
+    login(client, test_user)
+
+    async def mock_generate(*args, **kwargs):
+        return {"url": "https://test.omni.co/embed/x?token=abc"}
+
+    with patch("app.omni.client.omni_client.generate_embed_url", new=mock_generate):
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/entitled").status_code
+            == 200
+        )
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/test").status_code
+            == 400
+        )
+
+
+def test_me_lists_dashboards(client, test_db, test_user):
+    """Test the profile page lists the customer's entitled dashboards."""
+    grant(
+        test_db,
+        test_user.customer_id,
+        "/dashboards/entitled",
+        title="Quarterly revenue",
+    )
+    login(client, test_user)
+
+    response = client.get("/me")
+    assert "Quarterly revenue" in response.text
+    assert "/embed?contentPath=/dashboards/entitled" in response.text
@@ -0,0 +1,161 @@
+"""Tests for startup warm-up and health endpoints."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.auth.password import password_hash_pool
+from app.config import config
+from app.health import FAIL, check_database, health_checker, readiness
+from app.main import app
+from app.observability.loop import loop_lag_monitor
+from app.omni.client import omni_client
+
+
+def test_healthz(client):
+    """Test liveness endpoint."""
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_livez(client):
+    """Test liveness does not depend on readiness."""
+    readiness.mark_not_ready("draining")
+    try:
+        assert client.get("/livez").status_code == 200
+    finally:
+        readiness.mark_ready()
+
+
+def test_readyz_after_startup(client):
+    """Test the worker reports ready once lifespan startup has finished."""
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert set(data["checks"]) == {"database", "omni", "event_loop", "password_hashing"}
+    assert all(check["status"] == "ok" for check in data["checks"].values())
+
+
+def test_readyz_fails_on_event_loop_lag(client):
+    """Test a blocked event loop takes the worker out of rotation."""
+    health_checker.invalidate()
+    with patch.object(loop_lag_monitor, "lag", 5.0):
+        response = client.get("/readyz")
+    health_checker.invalidate()
+    assert response.status_code == 503
+    assert response.json()["checks"]["event_loop"]["status"] == "fail"
+
+
+def test_readyz_fails_when_password_pool_backed_up(client):
+    """Test a saturated argon2 pool sheds traffic (backpressure)."""
+    health_checker.invalidate()
+    with patch.object(password_hash_pool, "in_flight", password_hash_pool.workers * 10):
+        response = client.get("/readyz")
+    health_checker.invalidate()
+    assert response.status_code == 503
+    assert response.json()["checks"]["password_hashing"]["status"] == "fail"
+
+
+def test_open_circuit_is_degraded_not_unready(client):
+    """Test an open Omni circuit is reported without failing readiness."""
+    health_checker.invalidate()
+    breaker = omni_client.circuit_breaker
+    with (
+        patch.object(breaker, "_state", breaker.OPEN),
+        patch.object(breaker, "opened_at", float("inf")),
+    ):
+        response = client.get("/readyz")
+    health_checker.invalidate()
+    assert response.status_code == 200
+    assert response.json()["checks"]["omni"] == {
+        "status": "degraded",
+        "circuit": "open",
+    }
+
+
+def test_readyz_result_is_cached(client):
+    """Test repeated probes reuse the cached check result."""
+    health_checker.invalidate()
+    # check_database is async, so patch() substitutes an AsyncMock
+    with patch(
+        "app.health.check_database", return_value={"status": "ok"}
+    ) as check_database:
+        client.get("/readyz")
+        client.get("/readyz")
+        client.get("/readyz")
+    health_checker.invalidate()
+    assert check_database.call_count == 1
+
+
+def test_not_ready_after_shutdown(test_db):
+    """Test readiness is withdrawn when shutdown starts."""
+    with TestClient(app) as test_client:
+        assert test_client.get("/readyz").status_code == 200
+    assert readiness.ready is False
+    assert readiness.reason == "shutting down"
+
+
+def test_startup_warm_up(test_db):
+    """Test warm-up opens the DB pool, primes argon2 and connects to Omni."""
+    warmed = []
+
+    async def fake_head(self, url, **kwargs):
+        warmed.append(url)
+        return httpx.Response(200, request=httpx.Request("HEAD", url))
+
+    with (
+        patch.object(config, "STARTUP_WARMUP", True),
+        patch("app.main.warm_up_database", side_effect=lambda: warmed.append("db")),
+        patch(
+            "app.main.warm_up_password_hashing",
+            side_effect=lambda: warmed.append("argon2"),
+        ),
+        patch.object(httpx.AsyncClient, "head", new=fake_head),
+        TestClient(app) as test_client,
+    ):
+        assert test_client.get("/readyz").status_code == 200
+        assert omni_client.http_client is not None
+
+    assert sorted(warmed) == sorted(["db", "argon2", omni_client.base_url])
+    # The keep-alive pool is closed on shutdown
+    assert omni_client.http_client is None
+
+
+def test_omni_warm_up_failure_does_not_block_startup(test_db):
+    """Test an unreachable Omni only logs a warning."""
+
+    async def failing_head(self, url, **kwargs):
+        raise httpx.ConnectTimeout("timed out")
+
+    with (
+        patch.object(config, "STARTUP_WARMUP", True),
+        patch("app.main.warm_up_database"),
+        patch("app.main.warm_up_password_hashing"),
+        patch.object(httpx.AsyncClient, "head", new=failing_head),
+        TestClient(app) as test_client,
+    ):
+        assert test_client.get("/readyz").status_code == 200
+
+
+def test_database_check_fails_only_on_database_errors():
+    """Test DB errors mark the check failed, while programming errors are not hidden as "not ready"."""
+    with patch(
+        "app.health.warm_up_database",
+        side_effect=OperationalError("SELECT 1", {}, Exception("gone")),
+    ):
+        assert asyncio.run(check_database()) == {
+            "status": FAIL,
+            "error": "OperationalError",
+        }
+
+    with (
+        patch("app.health.warm_up_database", side_effect=AttributeError("bug")),
+        pytest.raises(AttributeError),
+    ):
+        asyncio.run(check_database())
@@ -0,0 +1,224 @@
+"""Tests for the embed URL cache and speculative prefetch."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.config import config
+from app.models import AuditLog
+from app.omni.circuit_breaker import CircuitBreaker
+from app.omni.client import omni_client
+from app.omni.prefetch import EmbedPrefetcher, EmbedURLCache
+from app.routes.audit import most_frequent_resources
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cached_url_single_use_and_expires():
+    """Test a cached URL is handed out once and not after its TTL."""
+    clock = Clock()
+    cache = EmbedURLCache(ttl=10, clock=clock)
+
+    cache.put("a", "https://omni/a")
+    assert "a" in cache
+    assert cache.take("a") == "https://omni/a"
+    assert cache.take("a") is None
+
+    cache.put("b", "https://omni/b")
+    clock.now = 10
+    assert "b" not in cache
+    assert cache.take("b") is None
+
+
+@pytest.mark.asyncio
+async def test_click_joins_inflight_prefetch():
+    """Test a request arriving during a prefetch waits for it instead of calling Omni again."""
+    cache = EmbedURLCache(ttl=60)
+    release = asyncio.Event()
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await release.wait()
+        return "https://omni/x"
+
+    cache.fill("x", factory)
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_generate("x", factory))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "https://omni/x"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_falls_back_to_direct_call():
+    """Test a failed prefetch leaves nothing cached and the click generates its own URL."""
+    cache = EmbedURLCache(ttl=60)
+    prefetcher = EmbedPrefetcher(cache, max_in_flight=1)
+
+    async def failing():
+        import httpx
+
+        raise httpx.ConnectError("omni down")
+
+    async def working():
+        return "https://omni/y"
+
+    assert prefetcher.schedule("y", failing)
+    assert await cache.get_or_generate("y", working) == "https://omni/y"
+    assert prefetcher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_prefetch_failures_logged_with_key():
+    """Test Omni errors are logged with the key, and unexpected errors are not swallowed."""
+    import httpx
+
+    cache = EmbedURLCache(ttl=60)
+
+    async def unreachable():
+        raise httpx.ConnectError("omni down")
+
+    async def broken():
+        raise RuntimeError("bug")
+
+    with patch("app.omni.prefetch.logger") as logger:
+        await cache.fill((1, "/dashboards/a"), unreachable)
+        logger.warning.assert_called_once()
+        assert (1, "/dashboards/a") in logger.warning.call_args.args
+
+        with pytest.raises(RuntimeError):
+            await cache.fill((1, "/dashboards/b"), broken)
+        await asyncio.sleep(0)
+        logger.error.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_budget_skips_instead_of_queueing():
+    """Test prefetches beyond the budget are dropped and the budget frees up afterwards."""
+    cache = EmbedURLCache(ttl=60)
+    prefetcher = EmbedPrefetcher(cache, max_in_flight=2)
+    release = asyncio.Event()
+
+    async def factory():
+        await release.wait()
+        return "https://omni/z"
+
+    assert prefetcher.schedule("a", factory)
+    assert prefetcher.schedule("b", factory)
+    assert not prefetcher.schedule("c", factory)
+    assert not prefetcher.schedule("a", factory)  # already in flight
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert prefetcher.in_flight == 0
+    assert prefetcher.schedule("c", factory)
+    release.set()
+    await asyncio.sleep(0.01)
+
+
+def test_no_prefetch_while_circuit_open(monkeypatch):
+    """Test nothing is prefetched while Omni is failing."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(omni_client, "circuit_breaker", breaker)
+    prefetcher = EmbedPrefetcher(EmbedURLCache(ttl=60), max_in_flight=4)
+
+    async def factory():
+        return "https://omni/q"
+
+    assert not prefetcher.schedule("q", factory)
+    assert prefetcher.in_flight == 0
+
+
+def test_most_frequent_resources(test_db, test_user):
+    """Test the user's most opened dashboards are ranked by recent usage."""
+    for resource in [
+        "/dashboards/a",
+        "/dashboards/b",
+        "/dashboards/b",
+        "/dashboards/c",
+        "/dashboards/b",
+        "/dashboards/a",
+    ]:
+        test_db.add(
+            AuditLog(
+                user_id=test_user.id, action="generate_embed_url", resource=resource
+            )
+        )
+    test_db.add(
+        AuditLog(user_id=test_user.id, action="login", resource="/dashboards/c")
+    )
+    test_db.add(
+        AuditLog(
+            user_id=test_user.id + 1,
+            action="generate_embed_url",
+            resource="/dashboards/c",
+        )
+    )
+    test_db.commit()
+
+    assert most_frequent_resources(
+        test_db, test_user.id, "generate_embed_url", 2, 30
+    ) == ["/dashboards/b", "/dashboards/a"]
+
+
+def test_me_page_prefetches_next_embed(client, test_user):
+    """Test opening /me warms the URL of a frequently opened dashboard so the click skips Omni."""
+    response = client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+    calls = []
+
+    async def mock_generate(*args, **kwargs):
+        calls.append(kwargs["content_path"])
+        return {"url": f"https://test.omni.co/embed/{len(calls)}"}
+
+    with (
+        patch("app.omni.client.omni_client.generate_embed_url", new=mock_generate),
+        patch("app.config.config.EMBED_PREFETCH", True),
+        patch("app.config.config.OMNI_CONTENT_PATH_ALLOWLIST", ["/dashboards/test"]),
+    ):
+        # Builds the history (the first URL is generated on demand)
+        assert (
+            client.get("/api/embed/url?content_path=/dashboards/test").status_code
+            == 200
+        )
+        assert client.get("/me").status_code == 200
+
+        response = client.get("/api/embed/url?content_path=/dashboards/test")
+        assert response.status_code == 200
+        assert response.json()["url"] == "https://test.omni.co/embed/2"
+        assert calls == ["/dashboards/test", "/dashboards/test"]
+
+        # Single use: the next click calls Omni again
+        response = client.get("/api/embed/url?content_path=/dashboards/test")
+        assert response.json()["url"] == "https://test.omni.co/embed/3"
+
+
+def test_me_page_skips_prefetch_when_disabled(client, test_user):
+    """Test /me does not call Omni when prefetch is off."""
+    assert not config.EMBED_PREFETCH
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    calls = []
+
+    async def mock_generate(*args, **kwargs):
+        calls.append(1)
+        return {"url": "https://test.omni.co/embed/x"}
+
+    with patch("app.omni.client.omni_client.generate_embed_url", new=mock_generate):
+        client.get("/api/embed/url?content_path=/dashboards/test")
+        client.get("/me")
+    assert len(calls) == 1
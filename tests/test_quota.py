@@ -0,0 +1,208 @@
+"""Tests for the shared Omni outbound quota."""
+
+import asyncio
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.omni.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.omni.client import OmniClient
+from app.omni.quota import (
+    INTERACTIVE,
+    PREFETCH,
+    OmniQuota,
+    QuotaExceededError,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_background_calls_leave_reserve_for_interactive():
+    """Test prefetch stops at the reserve while interactive calls drain the bucket."""
+    clock = FakeClock()
+    quota = OmniQuota(rate=1, burst=4, background_reserve=0.5, clock=clock)
+
+    assert quota.try_acquire(PREFETCH) == 0.0
+    assert quota.try_acquire(PREFETCH) == 0.0
+    assert quota.try_acquire(PREFETCH) > 0
+    assert quota.try_acquire(INTERACTIVE) == 0.0
+    assert quota.try_acquire(INTERACTIVE) == 0.0
+    assert quota.try_acquire(INTERACTIVE) == pytest.approx(1.0)
+
+    clock.now += 1
+    assert quota.try_acquire(INTERACTIVE) == 0.0
+
+
+def test_rate_zero_only_enforces_throttling():
+    """Test an unconfigured rate never limits, but a 429 still pauses calls."""
+    clock = FakeClock()
+    quota = OmniQuota(rate=0, burst=1, clock=clock)
+    for _ in range(100):
+        assert quota.try_acquire(PREFETCH) == 0.0
+
+    quota.throttled(5)
+    assert quota.try_acquire(INTERACTIVE) == pytest.approx(5)
+    clock.now += 5
+    assert quota.try_acquire(INTERACTIVE) == 0.0
+
+
+def test_bucket_shared_through_file(tmp_path):
+    """Test two workers using the same file draw from one bucket and see each other's 429 pause."""
+    clock = FakeClock()
+    path = str(tmp_path / "quota")
+    worker_a = OmniQuota(rate=1, burst=2, path=path, clock=clock)
+    worker_b = OmniQuota(rate=1, burst=2, path=path, clock=clock)
+
+    assert worker_a.try_acquire() == 0.0
+    assert worker_b.try_acquire() == 0.0
+    assert worker_a.try_acquire() > 0
+
+    clock.now += 10
+    worker_b.throttled(30)
+    assert worker_a.try_acquire() == pytest.approx(30)
+
+
+def test_throttling_halves_rate_then_recovers():
+    """Test a 429 halves the refill rate, which recovers linearly afterwards."""
+    clock = FakeClock()
+    quota = OmniQuota(rate=10, burst=1, recovery_seconds=10, clock=clock)
+    quota.throttled(0)
+    assert quota.try_acquire() == pytest.approx(1 / 5)
+
+    clock.now += 10
+    quota.try_acquire()
+    assert quota._state[2] == 10
+
+
+@pytest.mark.asyncio
+async def test_interactive_waits_background_does_not():
+    """Test interactive callers wait briefly for a token; background callers are rejected at once."""
+    quota = OmniQuota(rate=50, burst=1, background_reserve=0, max_wait=1)
+    await quota.acquire(INTERACTIVE)
+    with pytest.raises(QuotaExceededError):
+        await quota.acquire(PREFETCH)
+    await quota.acquire(INTERACTIVE)
+
+    quota.max_wait = 0
+    with pytest.raises(QuotaExceededError) as exc_info:
+        await quota.acquire(INTERACTIVE)
+    assert exc_info.value.retry_after > 0
+
+
+def test_parse_retry_after():
+    """Test delta-seconds, HTTP dates and garbage Retry-After values."""
+    assert parse_retry_after("7", 1.0) == 7
+    assert parse_retry_after(None, 1.0) == 1.0
+    assert parse_retry_after("soon", 1.0) == 1.0
+    later = format_datetime(datetime.now(UTC) + timedelta(seconds=60), usegmt=True)
+    assert 55 < parse_retry_after(later, 1.0) <= 60
+
+
+@pytest.mark.asyncio
+async def test_client_backs_off_on_429(monkeypatch):
+    """Test a 429 from Omni pauses the shared quota and is reported as QuotaExceededError."""
+    quota = OmniQuota(rate=0, burst=1)
+    monkeypatch.setattr("app.omni.client.omni_quota", quota)
+    client = OmniClient()
+    client.base_url = "https://omni.test"
+    calls = []
+
+    async def fake_post(self, url, **kwargs):
+        calls.append(url)
+        return httpx.Response(
+            429, headers={"Retry-After": "30"}, request=httpx.Request("POST", url)
+        )
+
+    with patch.object(httpx.AsyncClient, "post", new=fake_post):
+        with pytest.raises(QuotaExceededError) as exc_info:
+            await client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+        assert exc_info.value.retry_after == 30
+
+        # Paused: the next call does not reach Omni
+        with pytest.raises(QuotaExceededError):
+            await client.generate_embed_url(
+                "/dashboards/test", "c1", "a@example.com", priority=PREFETCH
+            )
+    assert len(calls) == 1
+    assert client.circuit_breaker.failures == 0
+
+
+def test_embed_url_returns_503_when_quota_exhausted(client, test_user):
+    """Test the API answers 503 with Retry-After while Omni is throttling us."""
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+
+    async def throttled(*args, **kwargs):
+        raise QuotaExceededError(12)
+
+    with patch("app.omni.client.omni_client.generate_embed_url", new=throttled):
+        response = client.get("/api/embed/url?content_path=/dashboards/test")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "12"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_spends_no_quota(monkeypatch):
+    """Test a call refused by the circuit breaker neither takes nor waits for a token."""
+    quota = OmniQuota(rate=1, burst=1, max_wait=5)
+    monkeypatch.setattr("app.omni.client.omni_quota", quota)
+    client = OmniClient()
+    client.base_url = "https://omni.test"
+    client.circuit_breaker = CircuitBreaker(failure_threshold=1)
+    client.circuit_breaker.record_failure()
+
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            await client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+    assert quota.try_acquire(INTERACTIVE) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_shared_file_updated_off_the_event_loop(tmp_path, monkeypatch):
+    """Test the flock'd file is read and written in a worker thread, not on the event loop."""
+    quota = OmniQuota(rate=0, burst=1, path=str(tmp_path / "quota"))
+    threads = []
+    locked = quota._locked
+
+    def recording_locked():
+        threads.append(threading.current_thread())
+        return locked()
+
+    monkeypatch.setattr(quota, "_locked", recording_locked)
+    await quota.acquire(INTERACTIVE)
+    await quota.back_off(0)
+    assert len(threads) == 2
+    assert threading.current_thread() not in threads
+
+
+@pytest.mark.asyncio
+async def test_shared_file_concurrent_calls_never_exceed_burst(tmp_path):
+    """Test concurrent acquires in one worker (threads sharing one fd) grant at most the burst."""
+
+    def slow_clock() -> float:
+        # Read inside the lock: gives other threads every chance to interleave
+        time.sleep(0.001)
+        return time.time()
+
+    quota = OmniQuota(
+        rate=0.001, burst=5, path=str(tmp_path / "quota"), max_wait=0, clock=slow_clock
+    )
+    results = await asyncio.gather(
+        *(quota.acquire(INTERACTIVE) for _ in range(20)), return_exceptions=True
+    )
+    assert sum(result is None for result in results) == 5
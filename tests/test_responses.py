@@ -0,0 +1,26 @@
+"""Tests for the default JSON response class and API response models."""
+
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse
+
+
+def test_same_bytes_as_json_response():
+    """Test FastJSONResponse renders exactly what JSONResponse would."""
+    content = {
+        "message": "ログイン成功",
+        "user_id": 1,
+        "items": [1.5, None, True],
+        "nested": {"a": "b"},
+    }
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_me_created_at_unchanged(client, test_user):
+    """Test /api/me keeps the isoformat() timestamp format of earlier releases."""
+    client.post(
+        "/api/login", json={"email": test_user.email, "password": "testpassword123"}
+    )
+    data = client.get("/api/me").json()
+    assert data["created_at"] == test_user.created_at.isoformat()
+    assert data["customer_id"] == test_user.customer_id
@@ -0,0 +1,207 @@
+"""Tests for the Omni call priority scheduler."""
+
+import asyncio
+import contextlib
+import contextvars
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.omni.circuit_breaker import CircuitBreaker
+from app.omni.client import OmniClient
+from app.omni.quota import INTERACTIVE, PREFETCH
+from app.omni.scheduler import OmniOverloadedError, OmniScheduler
+
+WAITS = {INTERACTIVE: 5.0, PREFETCH: 1.0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@contextlib.asynccontextmanager
+async def blocked():
+    """A one-worker scheduler whose worker is busy until release is set."""
+    clock = FakeClock()
+    scheduler = OmniScheduler(workers=1, max_queue_wait=WAITS, clock=clock)
+    scheduler.start()
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+        return "blocker"
+
+    first = asyncio.create_task(scheduler.run(PREFETCH, blocker))
+    await settle()
+    yield scheduler, release, clock
+    release.set()
+    await first
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_served_first():
+    """Test queued calls run by class, not arrival order."""
+    async with blocked() as (scheduler, release, _):
+        order = []
+
+        def call(name):
+            async def factory():
+                order.append(name)
+                return name
+
+            return factory
+
+        tasks = [
+            asyncio.create_task(scheduler.run(priority, call(priority)))
+            for priority in (PREFETCH, INTERACTIVE)
+        ]
+        await settle()
+        release.set()
+        assert await asyncio.gather(*tasks) == [PREFETCH, INTERACTIVE]
+        assert order == [INTERACTIVE, PREFETCH]
+
+
+@pytest.mark.asyncio
+async def test_abandoned_call_never_runs():
+    """Test a caller cancelled while queued (client gone) does not reach Omni."""
+    async with blocked() as (scheduler, release, _):
+        called = []
+
+        async def factory():
+            called.append(1)
+
+        waiter = asyncio.create_task(scheduler.run(INTERACTIVE, factory))
+        await settle()
+        waiter.cancel()
+        release.set()
+        await settle()
+        assert called == []
+        assert scheduler.queued() == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_call_dropped():
+    """Test a call that waited longer than its class allows fails without running."""
+    async with blocked() as (scheduler, release, clock):
+        called = []
+
+        async def factory():
+            called.append(1)
+
+        waiter = asyncio.create_task(scheduler.run(PREFETCH, factory))
+        await settle()
+        clock.now += 2
+        release.set()
+        with pytest.raises(OmniOverloadedError):
+            await waiter
+        assert called == []
+
+
+@pytest.mark.asyncio
+async def test_cancelling_caller_cancels_running_call():
+    """Test a caller giving up cancels the Omni call and frees the worker."""
+    scheduler = OmniScheduler(workers=1, max_queue_wait=WAITS)
+    scheduler.start()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fast():
+        return "ok"
+
+    waiter = asyncio.create_task(scheduler.run(INTERACTIVE, slow))
+    await started.wait()
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert await asyncio.wait_for(scheduler.run(INTERACTIVE, fast), 1) == "ok"
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_caller_context_and_errors_propagate():
+    """Test calls see the caller's context variables and raise the caller's errors."""
+    request_id = contextvars.ContextVar("request_id", default=None)
+    scheduler = OmniScheduler(workers=2, max_queue_wait=WAITS)
+    scheduler.start()
+
+    async def read_context():
+        return request_id.get()
+
+    async def failing():
+        raise ValueError("boom")
+
+    request_id.set("req-1")
+    assert await scheduler.run(INTERACTIVE, read_context) == "req-1"
+    with pytest.raises(ValueError):
+        await scheduler.run(INTERACTIVE, failing)
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_inline_when_not_started():
+    """Test calls run directly outside the app lifespan."""
+    scheduler = OmniScheduler(workers=1, max_queue_wait=WAITS)
+
+    async def factory():
+        return asyncio.current_task()
+
+    assert await scheduler.run(PREFETCH, factory) is asyncio.current_task()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_releases_breaker_trial(monkeypatch):
+    """Test cancelling the caller of a running half-open trial call leaves the breaker usable."""
+    clock = FakeClock()
+    scheduler = OmniScheduler(workers=1, max_queue_wait=WAITS)
+    scheduler.start()
+    monkeypatch.setattr("app.omni.client.omni_scheduler", scheduler)
+    client = OmniClient()
+    client.base_url = "https://omni.test"
+    client.circuit_breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    client.circuit_breaker.record_failure()
+    clock.now = 10
+    started = asyncio.Event()
+    responses = []
+
+    async def post(self, url, **kwargs):
+        if not responses:
+            responses.append(url)
+            started.set()
+            await asyncio.sleep(60)
+        return httpx.Response(
+            200, json={"url": "embed"}, request=httpx.Request("POST", url)
+        )
+
+    with patch.object(httpx.AsyncClient, "post", new=post):
+        caller = asyncio.create_task(
+            client.generate_embed_url("/dashboards/test", "c1", "a@example.com")
+        )
+        await started.wait()
+        caller.cancel()
+        await settle()
+        result = await asyncio.wait_for(
+            client.generate_embed_url("/dashboards/test", "c1", "a@example.com"), 1
+        )
+    assert result == {"url": "embed"}
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+    await scheduler.stop()
@@ -0,0 +1,81 @@
+"""Tests for the production server entry point and per-worker resources."""
+
+import os
+
+from app import db
+from app.auth.password import PasswordHashPool
+from app.server import (
+    build_parser,
+    default_workers,
+    prepare_metrics_dir,
+    prepare_quota_file,
+    server_options,
+)
+
+
+def test_default_workers_from_cpu_count(monkeypatch):
+    """Test one worker per CPU unless WEB_CONCURRENCY is set."""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    assert default_workers() == 4
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert default_workers() == 3
+
+
+def test_server_options_tuned_defaults():
+    """Test keep-alive outlives LB idle timeouts and uvicorn's own access log is off."""
+    options = server_options(build_parser().parse_args(["--workers", "2"]))
+    assert options["workers"] == 2
+    assert options["timeout_keep_alive"] > 60
+    assert options["timeout_graceful_shutdown"] > 0
+    assert options["backlog"] >= 1024
+    assert options["access_log"] is False
+    assert options["server_header"] is False
+    assert options["limit_max_requests"] is None
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+
+
+def test_prepare_metrics_dir_clears_stale_files(monkeypatch, tmp_path):
+    """Test multi-worker servers start from an empty Prometheus multiprocess directory."""
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    (directory / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(directory))
+
+    assert prepare_metrics_dir(workers=1) is None
+    assert (directory / "counter_123.db").exists()
+
+    assert prepare_metrics_dir(workers=2) == str(directory)
+    assert list(directory.iterdir()) == []
+
+
+def test_prepare_quota_file_removes_previous_state(monkeypatch, tmp_path):
+    """Test multi-worker servers share a fresh Omni quota file."""
+    path = tmp_path / "quota"
+    path.write_bytes(b"stale")
+    monkeypatch.setenv("OMNI_QUOTA_FILE", str(path))
+
+    assert prepare_quota_file(workers=1) is None
+    assert path.exists()
+
+    assert prepare_quota_file(workers=2) == str(path)
+    assert not path.exists()
+
+
+def test_engine_recreated_after_fork():
+    """Test the after-fork hook makes the child build its own engine."""
+    parent_engine = db.get_engine()
+    db._reset_engine_after_fork()
+    assert db.get_engine() is not parent_engine
+
+
+def test_password_pool_reset():
+    """Test the after-fork reset drops the parent's executor threads."""
+    pool = PasswordHashPool(workers=1)
+    pool._executor = object()
+    pool.in_flight = 2
+    pool.reset()
+    assert pool._executor is None
+    assert pool.in_flight == 0
@@ -0,0 +1,44 @@
+"""Cold-start budget for importing the application."""
+
+import os
+
+import pytest
+
+from benchmarks.startup import profile_import
+
+# Wall-clock budgets depend on the machine: only checked when asked for (RUN_TIMING_TESTS=1),
+# e.g. on a quiet dedicated runner. The deferred-module check below is deterministic and always runs.
+TIMING_TESTS = os.getenv("RUN_TIMING_TESTS") == "1"
+# Time spent in the app's own module bodies (excludes FastAPI, SQLAlchemy, ...)
+APP_IMPORT_BUDGET_MS = 150
+# Whole `import app.main`, generous to absorb slow CI machines
+TOTAL_IMPORT_BUDGET_MS = 3000
+# Heavy or rarely used modules that must only load on first use / when enabled
+DEFERRED_MODULES = (
+    "httpx",
+    "passlib",
+    "argon2",
+    "cProfile",
+    "pstats",
+    "app.routes.profiling",
+)
+
+
+@pytest.mark.skipif(
+    not TIMING_TESTS, reason="wall-clock budget; set RUN_TIMING_TESTS=1"
+)
+def test_import_time_within_budget():
+    """Test importing app.main stays within the cold-start budget."""
+    # Best of three runs to filter out scheduler noise
+    profiles = [profile_import() for _ in range(3)]
+    assert (
+        min(profile.app_self_us for profile in profiles) / 1000 < APP_IMPORT_BUDGET_MS
+    )
+    assert min(profile.total_us for profile in profiles) / 1000 < TOTAL_IMPORT_BUDGET_MS
+
+
+def test_heavy_modules_are_deferred():
+    """Test heavy dependencies are not imported until used."""
+    profile = profile_import()
+    loaded = [name for name in DEFERRED_MODULES if name in profile.modules]
+    assert loaded == []
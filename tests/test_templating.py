@@ -0,0 +1,35 @@
+"""Tests for template precompilation and caching."""
+
+from app.templating import create_environment, warm_up_templates
+
+
+def test_warm_up_compiles_all_templates(tmp_path):
+    """Test warm-up compiles every template into the bytecode cache."""
+    env = create_environment(auto_reload=False, bytecode_cache_dir=str(tmp_path))
+
+    count = warm_up_templates(env)
+
+    assert count == len(env.list_templates(extensions=["html"]))
+    assert count >= 6
+    # One bytecode cache file per compiled template
+    assert len(list(tmp_path.glob("__jinja2_*.cache"))) == count
+
+
+def test_warm_templates_are_served_from_memory(tmp_path):
+    """Test compiled templates are reused without recompiling."""
+    env = create_environment(auto_reload=False, bytecode_cache_dir=str(tmp_path))
+    warm_up_templates(env)
+
+    assert env.get_template("base.html") is env.get_template("base.html")
+
+
+def test_auto_reload_disabled(tmp_path):
+    """Test auto-reload can be disabled (production default)."""
+    env = create_environment(auto_reload=False, bytecode_cache_dir=str(tmp_path))
+    assert env.auto_reload is False
+
+
+def test_bytecode_cache_disabled():
+    """Test an empty cache directory disables the bytecode cache."""
+    env = create_environment(auto_reload=False, bytecode_cache_dir="")
+    assert env.bytecode_cache is None